@@ -0,0 +1 @@
+# Benchmarks (python -m benchmarks.<name> 으로 실행)
@@ -0,0 +1,177 @@
+"""
+비동기 QA 체인 동시 처리 벤치마크: 동기 invoke 순차 처리 vs 이벤트 루프 하나에서 ainvoke 동시 처리
+
+실행 (프로젝트 루트):
+    python -m benchmarks.bench_async_qa                                  # Qdrant 로컬 모드 (:memory:)
+    python -m benchmarks.bench_async_qa --latency 0.5 --concurrency 1 8 32 --requests 64
+    python -m benchmarks.bench_async_qa --url http://localhost:6333      # Qdrant 서버 (임시 컬렉션 생성 후 삭제)
+
+- LLM 은 고정 지연 가짜 모델 (호출마다 --latency 초, 질문 하나에 분류 + 답변 2번 호출), 임베딩은 비용 0 가짜 임베딩
+- async 는 한 이벤트 루프에서 최대 --concurrency 개 질문을 동시에 ainvoke → LLM / Qdrant 응답을 기다리는 동안 다른 질문을 처리
+- 이상적인 처리량: 동기 ≈ 1 / (2 × latency) req/s, async ≈ concurrency / (2 × latency) req/s
+- 로컬 모드는 클라이언트끼리 저장소를 공유하지 못해 같은 포인트를 동기 / 비동기 클라이언트에 각각 적재한다
+  (로컬 모드의 비동기 검색은 내부적으로 동기 연산이라 검색 자체는 겹치지 않음 → 서버 측정은 --url)
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "source"))  # 질문 처리 쪽 모듈은 source/ 기준 import
+
+from benchmarks.synthetic import CLAUSE_TITLES, SENTENCES, FixedCostEmbeddings, FixedLatencyChatModel  # noqa: E402
+from chains.qa_chain import get_qa_chain  # noqa: E402
+from config.settings import ALLOWED_INSURANCE_TYPES, EMBEDDING_DIM  # noqa: E402
+from vectorstore.collection_profile import create_collection  # noqa: E402
+from vectorstore.registry import ResourceRegistry, use_registry  # noqa: E402
+
+COLLECTION_NAME = "bench_async_qa"
+INSURANCE_TYPES = sorted(ALLOWED_INSURANCE_TYPES)
+
+
+def _points(n: int, embeddings: FixedCostEmbeddings, seed: int) -> List[models.PointStruct]:
+    rng = random.Random(seed)
+    texts = [
+        f"제{i + 1}조({rng.choice(CLAUSE_TITLES)}) " + " ".join(rng.choice(SENTENCES) for _ in range(3))
+        for i in range(n)
+    ]
+    return [
+        models.PointStruct(
+            id=i,
+            vector=vector,
+            payload={
+                "page_content": text,
+                "metadata": {
+                    "insurance_type": INSURANCE_TYPES[i % len(INSURANCE_TYPES)],
+                    "source": f"synthetic_{i % 10}.xml",
+                    "level_2": text.split(" ")[0],
+                },
+            },
+        )
+        for i, (text, vector) in enumerate(zip(texts, embeddings.embed_documents(texts)))
+    ]
+
+
+async def _aload(client: AsyncQdrantClient, points: List[models.PointStruct]):
+    await client.create_collection(
+        COLLECTION_NAME,
+        vectors_config=models.VectorParams(size=EMBEDDING_DIM, distance=models.Distance.COSINE),
+    )
+    for i in range(0, len(points), 1024):
+        await client.upsert(collection_name=COLLECTION_NAME, points=points[i:i + 1024], wait=True)
+
+
+def _run_sync(chain, questions: List[str]) -> float:
+    start = time.perf_counter()
+    for question in questions:
+        chain.invoke({"question": question})
+    return time.perf_counter() - start
+
+
+async def _run_async(chain, questions: List[str], concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(question: str):
+        async with semaphore:
+            return await chain.ainvoke({"question": question})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(question) for question in questions))
+    return time.perf_counter() - start
+
+
+def _row(mode: str, concurrency: int, elapsed: float, requests: int) -> Dict[str, Any]:
+    row = {"mode": mode, "concurrency": concurrency, "elapsed_s": elapsed, "req_per_s": requests / elapsed}
+    print(f"{mode:<6} | 동시 {concurrency:>3} | {requests}건 {elapsed:7.2f}s | {row['req_per_s']:7.2f} req/s")
+    return row
+
+
+def run(
+    points: int, requests: int, latency: float, concurrency: List[int], seed: int, url: Optional[str]
+) -> Dict[str, Any]:
+    embeddings = FixedCostEmbeddings(EMBEDDING_DIM)
+    data = _points(points, embeddings, seed)
+    rng = random.Random(seed + 1)
+    questions = [data[rng.randrange(points)].payload["page_content"] for _ in range(requests)]  # type: ignore[index]
+
+    client = QdrantClient(url=url) if url else QdrantClient(location=":memory:")
+    create_collection(client, COLLECTION_NAME, EMBEDDING_DIM)
+    client.upsert(collection_name=COLLECTION_NAME, points=data, wait=True)
+
+    def registry(async_client: Optional[AsyncQdrantClient] = None) -> ResourceRegistry:
+        return ResourceRegistry(
+            lambda: client,
+            lambda: embeddings,
+            COLLECTION_NAME,
+            lexical_index_dir=None,
+            backend="qdrant",
+            async_client_factory=lambda: async_client,  # type: ignore[arg-type,return-value]
+        )
+
+    async def run_async_cases() -> List[Dict[str, Any]]:
+        # 비동기 클라이언트는 이 이벤트 루프 안에서 만들고 닫는다
+        async_client = AsyncQdrantClient(url=url) if url else AsyncQdrantClient(location=":memory:")
+        if not url:
+            await _aload(async_client, data)
+        async_registry = registry(async_client)
+        use_registry(async_registry)
+        rows = []
+        try:
+            for level in concurrency:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    elapsed = await _run_async(chain, questions, level)
+                rows.append(_row("async", level, elapsed, requests))
+        finally:
+            await async_registry.ashutdown()
+        return rows
+
+    previous = use_registry(registry())
+    # 같은 질문 반복 → 답변 / 분류 캐시 없이 측정 (가짜 LLM 응답이 실제 분류 캐시에 남지도 않음)
+    chain = get_qa_chain(
+        FixedLatencyChatModel(latency=latency), use_answer_cache=False, use_classification_cache=False
+    )
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = _run_sync(chain, questions)
+        rows = [_row("sync", 1, elapsed, requests)]
+        rows += asyncio.run(run_async_cases())
+    finally:
+        use_registry(previous)
+        if url:
+            client.delete_collection(COLLECTION_NAME)
+        client.close()
+
+    ideal = 1 / (2 * latency) if latency else float("inf")
+    print(f"※ LLM 지연 {latency}s × 2회 → 동기 이상값 {ideal:.2f} req/s, async 이상값 ≈ 동시 처리 수 × {ideal:.2f} req/s")
+    return {"target": url or "local", "points": points, "requests": requests, "latency": latency, "results": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=2_000)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="가짜 LLM 호출 1번의 지연 (초)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Qdrant 서버 URL (없으면 로컬 모드)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    report = run(args.points, args.requests, args.latency, args.concurrency, args.seed, args.url)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+조항 분할 벤치마크: 단일 패스 토크나이저 vs 기존 split_with_pattern 중첩 분할
+
+실행 (프로젝트 루트):
+    python -m benchmarks.bench_clause_tokenizer
+    python -m benchmarks.bench_clause_tokenizer --sizes 1000 10000 100000 --json result.json
+
+타이밍 전에 두 방식의 Document가 완전히 같은지 먼저 검사하고, 다르면 종료 코드 1로 끝난다.
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+from benchmarks.synthetic import generate_terms_text
+from source.ingest.preprocessing import (
+    LEVEL_PATTERNS,
+    ClauseSpan,
+    build_documents_from_text,
+    clause_spans,
+    resolve_structure_type,
+    split_with_pattern,
+    tokenize_headers,
+)
+
+LAYOUT_INSURANCE_TYPE = {"default": "상해보험", "automobile": "자동차보험"}
+
+
+# ---------- 기준 구현 (토크나이저 도입 전 build_documents_from_xml 의 분할 부분 그대로) ----------
+def legacy_split(text: str, structure_type: str) -> List[Tuple[Tuple[Any, ...], str]]:
+    """split_with_pattern 중첩 분할 → [((level_1, level_2, level_3, level_4), 본문)]"""
+    patterns = LEVEL_PATTERNS[structure_type]
+    clauses: List[Tuple[Tuple[Any, ...], str]] = []
+
+    if structure_type == "automobile":
+        for l1_title, l1_body in split_with_pattern(text, patterns["level_1"]):
+            for l2_title, l2_body in split_with_pattern(l1_body, patterns["level_2"]):
+                for l3_title, l3_body in split_with_pattern(l2_body, patterns["level_3"]):
+                    jo_parts = patterns["level_4"].split(l3_body)
+                    if len(jo_parts) > 1:
+                        for i in range(1, len(jo_parts), 2):
+                            clauses.append(
+                                ((l1_title, l2_title, l3_title, jo_parts[i].strip()), jo_parts[i + 1].strip())
+                            )
+                    else:
+                        content = l3_body.strip()
+                        if content:
+                            clauses.append(((l1_title, l2_title, l3_title, None), content))
+    else:
+        for l1_title, l1_body in split_with_pattern(text, patterns["level_1"]):
+            jo_parts = patterns["level_2"].split(l1_body)
+            if len(jo_parts) > 1:
+                for i in range(1, len(jo_parts), 2):
+                    clauses.append(((l1_title, jo_parts[i].strip(), None, None), jo_parts[i + 1].strip()))
+            else:
+                content = l1_body.strip()
+                if content:
+                    clauses.append(((l1_title, None, None, None), content))
+
+    return clauses
+
+
+def legacy_build_documents(text: str, insurance_type: str, xml_path: str) -> List[Document]:
+    documents = [
+        Document(
+            page_content=content,
+            metadata={
+                "insurance_type": insurance_type,
+                "level_1": levels[0],
+                "level_2": levels[1],
+                "level_3": levels[2],
+                "level_4": levels[3],
+                "source": xml_path,
+            },
+        )
+        for levels, content in legacy_split(text, resolve_structure_type(insurance_type))
+    ]
+    if not documents:
+        documents.append(Document(
+            page_content=text,
+            metadata={
+                "insurance_type": insurance_type,
+                "level_1": None,
+                "level_2": None,
+                "level_3": None,
+                "level_4": None,
+                "source": xml_path,
+            },
+        ))
+    return documents
+
+
+def tokenizer_split(text: str, structure_type: str) -> List[ClauseSpan]:
+    """단일 패스 토크나이저 → 조항 span (Document 생성 제외)"""
+    depth = len(LEVEL_PATTERNS[structure_type])
+    return clause_spans(text, tokenize_headers(text, structure_type), depth, 0, len(text))
+
+
+# ---------- 동등성 검사 ----------
+EDGE_FRAGMENTS = [
+    "제{}관 총칙", "제{}조(목적)", "제{}조 (정의\n계속)", "제\n{}관", "제 {} 조(보상\n하는 손해)",
+    "본문 내용", "① 항목", "제{}조 제목없음", "(괄호)", "제{}관 제목 제{}조(같은 줄)",
+    "제{}편 자동차", "제{}장 장", "제{}절 절", "제{}조(제{}편 참고)", "제{}조(\n제{}장\n)", "제",
+]
+
+
+def _edge_case_texts(count: int, seed: int) -> List[str]:
+    """헤더가 줄을 넘거나 괄호 안에 상위 헤더가 있는 등 까다로운 입력"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts = [
+            rng.choice(EDGE_FRAGMENTS).replace("{}", str(rng.randint(1, 30)))
+            + rng.choice(["\n", " ", ""])
+            for _ in range(rng.randint(0, 120))
+        ]
+        lines = [line.strip() for line in "".join(parts).splitlines()]
+        texts.append("\n".join(line for line in lines if line))
+    return texts
+
+
+def _as_tuples(docs: List[Document]) -> List[Tuple[str, Tuple]]:
+    return [(d.page_content, tuple(sorted(d.metadata.items()))) for d in docs]
+
+
+def check_equivalence(texts: List[Tuple[str, str]]) -> int:
+    """(layout, text) 목록에 대해 두 구현 결과 비교 → 다른 입력 수"""
+    mismatches = 0
+    for layout, text in texts:
+        insurance_type = LAYOUT_INSURANCE_TYPE[layout]
+        expected = _as_tuples(legacy_build_documents(text, insurance_type, "bench.xml"))
+        actual = _as_tuples(build_documents_from_text(text, insurance_type, "bench.xml"))
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"❌ 결과 불일치 ({layout}): 기존 {len(expected)}개 / 토크나이저 {len(actual)}개")
+                print(f"   입력 앞부분: {text[:200]!r}")
+    return mismatches
+
+
+# ---------- 타이밍 ----------
+def _measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def run(sizes: List[int], repeat: int, seed: int) -> Dict[str, Any]:
+    # 1) 동등성: 합성 약관 (두 구조, 여러 크기) + 까다로운 입력
+    cases = [(layout, generate_terms_text(layout, n, seed + n)) for layout in LAYOUT_INSURANCE_TYPE for n in (1, 7, 300)]
+    cases += [(layout, text) for layout in LAYOUT_INSURANCE_TYPE for text in _edge_case_texts(300, seed)]
+    mismatches = check_equivalence(cases)
+    print(f"[동등성] {len(cases)}개 입력 중 불일치 {mismatches}개")
+
+    # 2) 타이밍: 분할만 (span / 제목+본문 튜플) 과 Document 생성까지 (end-to-end)
+    results = []
+    for layout, insurance_type in LAYOUT_INSURANCE_TYPE.items():
+        structure_type = resolve_structure_type(insurance_type)
+        for n in sizes:
+            text = generate_terms_text(layout, n, seed)
+            phases = {
+                "split": (
+                    lambda: legacy_split(text, structure_type),
+                    lambda: tokenizer_split(text, structure_type),
+                ),
+                "documents": (
+                    lambda: legacy_build_documents(text, insurance_type, "bench.xml"),
+                    lambda: build_documents_from_text(text, insurance_type, "bench.xml"),
+                ),
+            }
+            for phase, (legacy_fn, tokenizer_fn) in phases.items():
+                legacy = _measure(legacy_fn, repeat)
+                tokenizer = _measure(tokenizer_fn, repeat)
+                row = {
+                    "layout": layout,
+                    "phase": phase,
+                    "clauses": n,
+                    "text_chars": len(text),
+                    "legacy_seconds": legacy["seconds"],
+                    "tokenizer_seconds": tokenizer["seconds"],
+                    "speedup": legacy["seconds"] / tokenizer["seconds"] if tokenizer["seconds"] else 0.0,
+                    "legacy_peak_bytes": legacy["peak_bytes"],
+                    "tokenizer_peak_bytes": tokenizer["peak_bytes"],
+                }
+                results.append(row)
+                print(
+                    f"{layout:<10} {phase:<9} {n:>8,} 조 | 기존 {row['legacy_seconds'] * 1000:9.1f} ms "
+                    f"| 토크나이저 {row['tokenizer_seconds'] * 1000:9.1f} ms | x{row['speedup']:.2f} "
+                    f"| peak {row['legacy_peak_bytes'] / 2**20:7.1f} MB → {row['tokenizer_peak_bytes'] / 2**20:7.1f} MB"
+                )
+
+    return {"mismatches": mismatches, "cases": len(cases), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeat, args.seed)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    sys.exit(1 if report["mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+벡터 검색 백엔드 벤치마크: Qdrant vs 로컬 FAISS (flat / ivf / hnsw), 보험유형 필터 검색
+
+실행 (프로젝트 루트):
+    python -m benchmarks.bench_faiss_index                              # Qdrant 로컬 모드 QdrantClient(path=...)
+    python -m benchmarks.bench_faiss_index --url http://localhost:6333  # Qdrant 서버 (임시 컬렉션 생성 후 삭제)
+    python -m benchmarks.bench_faiss_index --points 80000 --json result.json
+
+- 같은 Qdrant 컬렉션에서 build_from_collection 으로 FAISS 인덱스를 만들고 같은 질문 벡터로 search_by_vector 를 잰다
+- recall@k 는 FAISS flat(정확 검색) 결과 대비 (ivf / hnsw 는 근사 검색)
+- 벡터는 보험유형별 군집이 있는 합성 벡터 (실제 임베딩과 분포가 다르므로 recall 은 참고값)
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "source"))  # 질문 처리 쪽 모듈은 source/ 기준 import
+
+from benchmarks.synthetic import FixedCostEmbeddings  # noqa: E402
+from config.settings import ALLOWED_INSURANCE_TYPES, EMBEDDING_DIM  # noqa: E402
+from vectorstore import faiss_index  # noqa: E402
+from vectorstore.collection_profile import create_collection  # noqa: E402
+from vectorstore.registry import ResourceRegistry, use_registry  # noqa: E402
+from vectorstore.retriever import search_by_vector  # noqa: E402
+
+COLLECTION_NAME = "bench_faiss"
+INSURANCE_TYPES = sorted(ALLOWED_INSURANCE_TYPES)
+CLUSTERS_PER_TYPE = 20
+
+
+def _vectors(n: int, seed: int) -> np.ndarray:
+    """보험유형 × 군집 중심 주변의 정규화 벡터 (i 번째 벡터의 보험유형 = INSURANCE_TYPES[i % 유형 수])"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((len(INSURANCE_TYPES) * CLUSTERS_PER_TYPE, EMBEDDING_DIM), dtype=np.float32)
+    type_of = np.arange(n) % len(INSURANCE_TYPES)
+    cluster = type_of * CLUSTERS_PER_TYPE + rng.integers(0, CLUSTERS_PER_TYPE, n)
+    vectors = centers[cluster] + 0.6 * rng.standard_normal((n, EMBEDDING_DIM), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _load(client: QdrantClient, vectors: np.ndarray):
+    create_collection(client, COLLECTION_NAME, EMBEDDING_DIM)
+    for i in range(0, len(vectors), 1024):
+        client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=[
+                models.PointStruct(
+                    id=i + j,
+                    vector=v.tolist(),
+                    payload={
+                        "page_content": f"조항 {i + j}",
+                        "metadata": {"insurance_type": INSURANCE_TYPES[(i + j) % len(INSURANCE_TYPES)]},
+                    },
+                )
+                for j, v in enumerate(vectors[i:i + 1024])
+            ],
+            wait=True,
+        )
+
+
+def _measure(queries: List[List[float]], insurance_type: str) -> Dict[str, Any]:
+    search_by_vector(queries[0], insurance_type)  # 벡터스토어 준비
+    latencies, results = [], []
+    for vector in queries:
+        start = time.perf_counter()
+        docs = search_by_vector(vector, insurance_type)
+        latencies.append(time.perf_counter() - start)
+        results.append([d.metadata["_id"] for d in docs])
+    return {
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "results": results,
+    }
+
+
+def run(points: int, queries: int, seed: int, url: Optional[str]) -> Dict[str, Any]:
+    tmp = tempfile.TemporaryDirectory()
+    client = QdrantClient(url=url) if url else QdrantClient(path=str(Path(tmp.name) / "qdrant"))
+    vectors = _vectors(points, seed)
+    _load(client, vectors)
+    rng = np.random.default_rng(seed + 1)
+    query_vectors = [
+        (v + 0.3 * rng.standard_normal(EMBEDDING_DIM, dtype=np.float32)).tolist()
+        for v in vectors[rng.choice(points, queries, replace=False)]
+    ]
+    insurance_type = INSURANCE_TYPES[0]
+
+    rows: List[Dict[str, Any]] = []
+    try:
+        cases = [("qdrant", None)] + [("faiss", kind) for kind in faiss_index.INDEX_KINDS]
+        exact: Optional[List[List[Any]]] = None
+        for backend, kind in cases:
+            build_s = 0.0
+            index_dir = Path(tmp.name) / f"faiss_{kind}"
+            if kind:
+                start = time.perf_counter()
+                faiss_index.build_from_collection(client, COLLECTION_NAME, index_dir, kind)
+                build_s = time.perf_counter() - start
+            registry = ResourceRegistry(
+                lambda: client,
+                lambda: FixedCostEmbeddings(EMBEDDING_DIM),
+                COLLECTION_NAME,
+                lexical_index_dir=None,
+                backend=backend,
+                faiss_index_dir=index_dir,
+            )
+            previous = use_registry(registry)
+            try:
+                result = _measure(query_vectors, insurance_type)
+            finally:
+                use_registry(previous)
+                if kind:
+                    registry.vectorstore.close()  # type: ignore[union-attr]
+            if kind == "flat":
+                exact = result["results"]
+            row = {
+                "backend": backend if not kind else f"faiss-{kind}",
+                "build_s": build_s,
+                "p50_ms": result["p50_ms"],
+                "p95_ms": result["p95_ms"],
+                "results": result["results"],
+            }
+            rows.append(row)
+    finally:
+        if url:
+            client.delete_collection(COLLECTION_NAME)
+        client.close()
+        tmp.cleanup()
+
+    for row in rows:
+        found = row.pop("results")
+        row["recall"] = float(np.mean([
+            len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(found, exact or found)
+        ]))
+        print(
+            f"{row['backend']:<12} | 생성 {row['build_s']:6.2f}s | p50 {row['p50_ms']:7.3f} ms | "
+            f"p95 {row['p95_ms']:7.3f} ms | recall {row['recall']:.3f}"
+        )
+    if not url:
+        print("※ Qdrant 로컬 모드는 서버와 달리 HNSW / 양자화 없이 전수 검색합니다. 서버 비교는 --url 로 측정하세요.")
+    return {"target": url or "local", "points": points, "queries": queries, "results": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Qdrant 서버 URL (없으면 로컬 모드)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    report = run(args.points, args.queries, args.seed, args.url)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
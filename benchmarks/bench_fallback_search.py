@@ -0,0 +1,125 @@
+"""
+fallback 검색 벤치마크: 필터 검색 → (비면) 필터 없는 검색을 순차로 보낼 때 vs query_batch_points 한 번에 보낼 때
+
+실행 (프로젝트 루트):
+    python -m benchmarks.bench_fallback_search                              # 로컬 모드 QdrantClient(path=...)
+    python -m benchmarks.bench_fallback_search --url http://localhost:6333  # 서버 (임시 컬렉션 생성 후 삭제)
+
+- hit  = 분류된 보험유형의 문서가 있음 (필터 검색으로 끝남)
+- miss = 분류된 보험유형의 문서가 없음 (fallback 필요)
+- serial 은 miss 때 왕복이 2번, batch 는 hit / miss 모두 1번 → batch 의 miss p95 가 hit p95 와 비슷해야 한다
+- ⚠️ 로컬 모드는 네트워크 왕복이 없어 차이가 거의 드러나지 않는다 → --url 로 서버에서 측정
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "source"))  # 질문 처리 쪽 모듈은 source/ 기준 import
+
+from benchmarks.synthetic import FixedCostEmbeddings  # noqa: E402
+from config.settings import ALLOWED_INSURANCE_TYPES, EMBEDDING_DIM  # noqa: E402
+from vectorstore.collection_profile import create_collection  # noqa: E402
+from vectorstore.registry import ResourceRegistry, use_registry  # noqa: E402
+from vectorstore.retriever import search_with_fallback  # noqa: E402
+
+COLLECTION_NAME = "bench_fallback"
+INSURANCE_TYPES = sorted(ALLOWED_INSURANCE_TYPES)
+MISSING_TYPE = INSURANCE_TYPES[-1]  # 적재하지 않는 보험유형 → 항상 fallback
+
+
+def _vectors(n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, EMBEDDING_DIM), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _load(client: QdrantClient, points: int, seed: int):
+    create_collection(client, COLLECTION_NAME, EMBEDDING_DIM)
+    present = INSURANCE_TYPES[:-1]
+    vectors = _vectors(points, seed)
+    for i in range(0, points, 1024):
+        client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=[
+                models.PointStruct(
+                    id=i + j,
+                    vector=v.tolist(),
+                    payload={
+                        "page_content": f"조항 {i + j}",
+                        "metadata": {"insurance_type": present[(i + j) % len(present)]},
+                    },
+                )
+                for j, v in enumerate(vectors[i:i + 1024])
+            ],
+            wait=True,
+        )
+
+
+def run(points: int, queries: int, seed: int, url: Optional[str]) -> Dict[str, Any]:
+    tmp = None if url else tempfile.TemporaryDirectory()
+    client = QdrantClient(url=url) if url else QdrantClient(path=tmp.name)  # type: ignore
+    _load(client, points, seed)
+    previous = use_registry(
+        ResourceRegistry(lambda: client, lambda: FixedCostEmbeddings(EMBEDDING_DIM), COLLECTION_NAME)
+    )
+
+    results: List[Dict[str, Any]] = []
+    try:
+        query_vectors = [v.tolist() for v in _vectors(queries, seed + 1)]
+        search_with_fallback(query_vectors[0], INSURANCE_TYPES[0])  # 연결 / 벡터스토어 준비
+        for path, insurance_type in (("hit", INSURANCE_TYPES[0]), ("miss", MISSING_TYPE)):
+            for mode in ("serial", "batch"):
+                latencies = []
+                for vector in query_vectors:
+                    start = time.perf_counter()
+                    docs, unfiltered = search_with_fallback(vector, insurance_type, batch=mode == "batch")
+                    latencies.append(time.perf_counter() - start)
+                    if path == "miss" and not unfiltered:
+                        raise RuntimeError("miss 경로에서 fallback 결과가 비었습니다")
+                row = {
+                    "path": path,
+                    "mode": mode,
+                    "p50_ms": float(np.percentile(latencies, 50) * 1000),
+                    "p95_ms": float(np.percentile(latencies, 95) * 1000),
+                }
+                results.append(row)
+                print(f"{path:<4} {mode:<6} | p50 {row['p50_ms']:8.2f} ms | p95 {row['p95_ms']:8.2f} ms")
+    finally:
+        use_registry(previous)
+        if url:
+            client.delete_collection(COLLECTION_NAME)
+        client.close()
+        if tmp is not None:
+            tmp.cleanup()
+
+    if not url:
+        print("※ 로컬 모드는 네트워크 왕복이 없습니다. 왕복 절감 효과는 --url 로 측정하세요.")
+    return {"target": url or "local", "points": points, "queries": queries, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Qdrant 서버 URL (없으면 로컬 모드)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    report = run(args.points, args.queries, args.seed, args.url)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+적재 처리량 벤치마크: 합성 약관으로 단계별 시간 / docs/s / peak RSS
+
+실행 (프로젝트 루트):
+    python -m benchmarks.bench_ingest                                   # 10³, 10⁴ 조 x 두 구조
+    python -m benchmarks.bench_ingest --sizes 1000 10000 100000 1000000 --json result.json
+    python -m benchmarks.bench_ingest --embed-cost-ms 2 --pipeline      # 임베딩 비용 가정 + 파이프라인 end-to-end
+
+단계 (파일마다 차례로 실행하고 단계별 시간을 합산):
+    load       load_xml_text
+    normalize  normalize_text
+    split      build_clauses_from_text (조항 레코드)
+    chunk      포인트 ID + 토큰 예산 분할 (pipeline._parse_file 과 같은 처리)
+    embed      FixedCostEmbeddings (모델 없이 텍스트당 고정 비용)
+    upsert     QdrantClient(":memory:")
+
+- 구조(관/조, 편/장/절/조) x 크기마다 새 프로세스에서 측정하므로 peak RSS가 서로 섞이지 않는다
+- --pipeline: 같은 파일을 run_ingest_pipeline 으로도 적재해서 IngestReport 를 함께 기록
+- JSON 결과에는 커밋 해시가 들어가므로 변경 전후 비교에 그대로 쓸 수 있다
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from benchmarks.synthetic import FixedCostEmbeddings, write_synthetic_corpus
+from source.config.settings import (
+    CHUNK_MAX_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+    EMBEDDING_DIM,
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_UPSERT_BATCH_SIZE,
+)
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+LAYOUTS = ("default", "automobile")
+STAGES = ("load", "normalize", "split", "chunk", "embed", "upsert")
+COLLECTION_NAME = "bench_ingest"
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux: KB, macOS: bytes
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+# ---------- 측정 프로세스 ----------
+def _stage_timings(files: List[Path], embeddings: FixedCostEmbeddings) -> Dict[str, Any]:
+    from source.ingest.chunking import chunk_clause
+    from source.ingest.manifest import chunk_point_id, clause_point_id, content_hash, level_path
+    from source.ingest.preprocessing import (
+        build_clauses_from_text,
+        extract_insurance_type,
+        load_xml_text,
+        normalize_text,
+    )
+    from source.vectorstore.collection_profile import create_collection
+
+    client = QdrantClient(":memory:")
+    create_collection(client, COLLECTION_NAME, EMBEDDING_DIM)
+    seconds = dict.fromkeys(STAGES, 0.0)
+    items = dict.fromkeys(STAGES, 0)
+
+    def timed(stage: str, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        seconds[stage] += time.perf_counter() - start
+        return result
+
+    def chunk_all(clauses, xml_path):
+        ids, records = [], []
+        for clause in clauses:
+            point_id = clause_point_id(xml_path, level_path(clause.levels), content_hash(clause.text))
+            pieces = chunk_clause(clause, point_id, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS)
+            if len(pieces) == 1:
+                ids.append(point_id)
+            else:
+                ids.extend(chunk_point_id(point_id, i, content_hash(p.text)) for i, p in enumerate(pieces))
+            records.extend(pieces)
+        return ids, records
+
+    for path in files:
+        xml_path = str(path)
+        raw_text = timed("load", load_xml_text, xml_path)
+        items["load"] += 1
+        text = timed("normalize", normalize_text, raw_text)
+        items["normalize"] += 1
+        clauses = timed("split", build_clauses_from_text, text, extract_insurance_type(xml_path), xml_path)
+        items["split"] += len(clauses)
+        ids, records = timed("chunk", chunk_all, clauses, xml_path)
+        items["chunk"] += len(records)
+        del raw_text, text, clauses
+
+        points: List[PointStruct] = []
+        for i in range(0, len(records), INGEST_EMBED_BATCH_SIZE):
+            batch = records[i:i + INGEST_EMBED_BATCH_SIZE]
+            vectors = timed("embed", embeddings.embed_documents, [r.text for r in batch])
+            items["embed"] += len(batch)
+            points.extend(
+                PointStruct(
+                    id=point_id,
+                    vector=vector,
+                    payload={"page_content": record.text, "metadata": record.to_metadata()},
+                )
+                for point_id, record, vector in zip(ids[i:i + INGEST_EMBED_BATCH_SIZE], batch, vectors)
+            )
+        for i in range(0, len(points), INGEST_UPSERT_BATCH_SIZE):
+            batch = points[i:i + INGEST_UPSERT_BATCH_SIZE]
+            timed("upsert", lambda b: client.upsert(collection_name=COLLECTION_NAME, points=b, wait=True), batch)
+            items["upsert"] += len(batch)
+
+    units = {"load": "files", "normalize": "files", "split": "docs", "chunk": "points", "embed": "points", "upsert": "points"}
+    stages = [
+        {
+            "stage": stage,
+            "unit": units[stage],
+            "items": items[stage],
+            "seconds": seconds[stage],
+            "throughput": items[stage] / seconds[stage] if seconds[stage] else 0.0,
+            # 단위가 파일인 단계도 조항 기준 처리량을 같이 본다
+            "docs_per_s": items["split"] / seconds[stage] if seconds[stage] else 0.0,
+        }
+        for stage in STAGES
+    ]
+    points_count = client.count(COLLECTION_NAME).count
+    client.close()
+    return {
+        "docs": items["split"],
+        "points": points_count,
+        "seconds": sum(seconds.values()),
+        "docs_per_s": items["split"] / sum(seconds.values()) if any(seconds.values()) else 0.0,
+        "stages": stages,
+    }
+
+
+def _pipeline_report(files: List[Path], embeddings: FixedCostEmbeddings) -> Dict[str, Any]:
+    from source.ingest.pipeline import run_ingest_pipeline
+    from source.vectorstore.collection_profile import create_collection
+
+    client = QdrantClient(":memory:")
+    create_collection(client, COLLECTION_NAME, EMBEDDING_DIM)
+    # 로컬 모드 클라이언트는 동시 upsert 를 지원하지 않으므로 upsert 스레드 1개
+    report = run_ingest_pipeline(files, client, embeddings, COLLECTION_NAME, upsert_workers=1, dedup=False)
+    client.close()
+    return report.to_dict()
+
+
+def _worker(data_dir: Path, embed_cost: float, pipeline: bool) -> Dict[str, Any]:
+    files = sorted(data_dir.glob("*.xml"))
+    embeddings = FixedCostEmbeddings(EMBEDDING_DIM, cost_per_text=embed_cost)
+    baseline = _peak_rss_bytes()
+    result = _stage_timings(files, embeddings)
+    result["baseline_rss_bytes"] = baseline
+    result["peak_rss_bytes"] = _peak_rss_bytes()
+    if pipeline:
+        result["pipeline"] = _pipeline_report(files, embeddings)
+    return result
+
+
+# ---------- 실행 ----------
+def _run_case(layout: str, size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        files = write_synthetic_corpus(Path(tmp), layout, size, args.clauses_per_file, seed=args.seed)
+        generate_seconds = time.perf_counter() - start
+        cmd = [
+            sys.executable, "-m", "benchmarks.bench_ingest", "--worker",
+            "--data-dir", tmp, "--embed-cost-ms", str(args.embed_cost_ms),
+        ]
+        if args.pipeline:
+            cmd.append("--pipeline")
+        out = subprocess.run(cmd, cwd=PROJECT_DIR, check=True, capture_output=True, text=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        xml_bytes = sum(p.stat().st_size for p in files)
+
+    result.update(
+        layout=layout,
+        clauses=size,
+        files=len(files),
+        xml_bytes=xml_bytes,
+        generate_seconds=generate_seconds,
+    )
+    return result
+
+
+def _print_case(r: Dict[str, Any]):
+    held = r["peak_rss_bytes"] - r["baseline_rss_bytes"]
+    print(
+        f"{r['layout']:<10} {r['clauses']:>9,} 조 ({r['files']:,} files, {r['xml_bytes'] / 2**20:.1f} MB) | "
+        f"{r['docs']:>9,} docs → {r['points']:>9,} points | {r['seconds']:7.1f}s | {r['docs_per_s']:9.1f} docs/s | "
+        f"peak RSS {r['peak_rss_bytes'] / 2**20:8.1f} MB (import 이후 증가분 {held / 2**20:8.1f} MB)"
+    )
+    for s in r["stages"]:
+        print(
+            f"    {s['stage']:<9} {s['items']:>9,} {s['unit']:<6} | {s['seconds']:7.2f}s | "
+            f"{s['throughput']:11.1f} {s['unit']}/s | {s['docs_per_s']:11.1f} docs/s"
+        )
+    if "pipeline" in r:
+        p = r["pipeline"]
+        print(
+            f"    pipeline  {p['total_docs']:>9,} points | {p['wall_time']:7.2f}s | "
+            f"{p['total_docs'] / p['wall_time'] if p['wall_time'] else 0.0:11.1f} points/s (wall)"
+        )
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = []
+    for size in args.sizes:
+        for layout in args.layouts:
+            r = _run_case(layout, size, args)
+            _print_case(r)
+            results.append(r)
+    return {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "embed_cost_ms": args.embed_cost_ms,
+        "embed_batch_size": INGEST_EMBED_BATCH_SIZE,
+        "upsert_batch_size": INGEST_UPSERT_BATCH_SIZE,
+        "chunk_max_tokens": CHUNK_MAX_TOKENS,
+        "clauses_per_file": args.clauses_per_file,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000], help="조 개수 (10³ ~ 10⁶)")
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=list(LAYOUTS))
+    parser.add_argument("--clauses-per-file", type=int, default=1_000)
+    parser.add_argument("--embed-cost-ms", type=float, default=0.0, help="가짜 임베딩의 텍스트당 비용 (ms)")
+    parser.add_argument("--pipeline", action="store_true", help="run_ingest_pipeline end-to-end 도 측정")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_worker(args.data_dir, args.embed_cost_ms / 1000, args.pipeline)))
+        return
+
+    report = run(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
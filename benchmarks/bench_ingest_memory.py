@@ -0,0 +1,251 @@
+"""
+적재 메모리 벤치마크: 조항 전체를 Document 로 들고 있을 때 vs ClauseRecord 로 들고 있을 때 peak RSS
+
+documents 는 ClauseRecord 도입 전 iter_documents_from_xml 그대로 (제목 문자열을 intern 하지 않고 조항마다 metadata dict)
+records 는 지금의 iter_clauses_from_xml (slotted 레코드 + intern 한 제목 / 보험유형 / source)
+
+실행 (프로젝트 루트):
+    python -m benchmarks.bench_ingest_memory                      # source/data_selected 전체
+    python -m benchmarks.bench_ingest_memory --data-dir /path/to/xmls --json result.json
+
+data_selected 가 없으면 합성 약관 (--synthetic-files x --synthetic-clauses 조) 으로 측정한다.
+모드마다 새 프로세스에서 측정하므로 서로의 peak RSS 에 영향을 주지 않는다.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+from benchmarks.synthetic import write_synthetic_xml
+from source.ingest.preprocessing import (
+    LEVEL_KEYS,
+    LEVEL_PATTERNS,
+    STREAM_SCAN_LINES,
+    _HEADER_RESCAN,
+    clause_spans,
+    extract_insurance_type,
+    iter_clauses_from_xml,
+    iter_xml_lines,
+    load_xml_text,
+    normalize_text,
+    resolve_structure_type,
+    tokenize_headers,
+)
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_DIR / "source" / "data_selected"
+MODES = ("documents", "records")
+
+
+# ---------- 기준 구현 (ClauseRecord 도입 전 iter_documents_from_xml 그대로) ----------
+def legacy_region_documents(
+    text: str,
+    structure_type: str,
+    insurance_type: str,
+    xml_path: str,
+    pos: int = 0,
+    endpos: Optional[int] = None,
+) -> List[Document]:
+    """text[pos:endpos] → 조항 Document 목록 (조항마다 제목 문자열 + metadata dict)"""
+    endpos = len(text) if endpos is None else endpos
+    depth = len(LEVEL_PATTERNS[structure_type])
+    tokens = tokenize_headers(text, structure_type, pos, endpos)
+
+    padding = (None,) * (len(LEVEL_KEYS) - depth)
+
+    documents: List[Document] = []
+    for titles, body_start, body_end, has_leaf_header in clause_spans(text, tokens, depth, pos, endpos):
+        content = text[body_start:body_end].strip()
+        if not has_leaf_header and not content:
+            continue
+
+        levels = titles + padding
+        metadata = {
+            "insurance_type": insurance_type,
+            "level_1": levels[0],
+            "level_2": levels[1],
+            "level_3": levels[2],
+            "level_4": levels[3],
+            "source": xml_path,
+        }
+        documents.append(Document(page_content=content, metadata=metadata))
+
+    return documents
+
+
+def legacy_iter_documents_from_xml(xml_path: str) -> Iterator[Document]:
+    """최상위 구간(관 / 편)이 닫힐 때마다 그 구간의 Document 를 반환하는 스트리밍 파서"""
+    insurance_type = extract_insurance_type(xml_path)
+    structure_type = resolve_structure_type(insurance_type)
+    top_pattern = LEVEL_PATTERNS[structure_type]["level_1"]
+
+    buffer = ""
+    header_end = 0
+    in_section = False
+    pending: List[str] = []
+    emitted = False
+
+    def close_sections() -> Iterator[Document]:
+        nonlocal buffer, header_end, in_section
+        scan_from = max(header_end, len(buffer) - _HEADER_RESCAN)
+        pending_text = "\n".join(pending)
+        pending.clear()
+        buffer = f"{buffer}\n{pending_text}" if buffer else pending_text
+
+        while True:
+            match = top_pattern.search(buffer, scan_from)
+            if match is None:
+                return
+            if in_section:
+                yield from legacy_region_documents(buffer, structure_type, insurance_type, xml_path, 0, match.start())
+            buffer = buffer[match.start():]
+            header_end = match.end() - match.start()
+            in_section = True
+            scan_from = header_end
+
+    for line in iter_xml_lines(xml_path):
+        pending.append(line)
+        if len(pending) >= STREAM_SCAN_LINES:
+            for doc in close_sections():
+                emitted = True
+                yield doc
+
+    if pending:
+        for doc in close_sections():
+            emitted = True
+            yield doc
+
+    for doc in legacy_region_documents(buffer, structure_type, insurance_type, xml_path):
+        emitted = True
+        yield doc
+
+    if not emitted:
+        text = normalize_text(load_xml_text(xml_path))
+        yield Document(
+            page_content=text,
+            metadata={
+                "insurance_type": insurance_type,
+                "level_1": None,
+                "level_2": None,
+                "level_3": None,
+                "level_4": None,
+                "source": xml_path,
+            },
+        )
+
+
+# ---------- 측정 ----------
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux: KB, macOS: bytes
+
+
+def _worker(mode: str, data_dir: Path) -> Dict[str, Any]:
+    """측정 프로세스: 모든 XML의 조항을 메모리에 들고 있는 상태의 peak RSS"""
+    files = sorted(str(p) for p in data_dir.glob("*.xml"))
+    baseline = _peak_rss_bytes()
+    start = time.perf_counter()
+
+    held: List[Any] = []
+    for path in files:
+        if mode == "documents":
+            held.extend(legacy_iter_documents_from_xml(path))
+        else:
+            held.extend(iter_clauses_from_xml(path))
+
+    return {
+        "mode": mode,
+        "files": len(files),
+        "clauses": len(held),
+        "seconds": time.perf_counter() - start,
+        "baseline_rss_bytes": baseline,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def _run_mode(mode: str, data_dir: Path) -> Dict[str, Any]:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_ingest_memory", "--worker", mode, "--data-dir", str(data_dir)],
+        cwd=PROJECT_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check_equivalence(data_dir: Path) -> int:
+    """기준 구현 Document == ClauseRecord.to_document() 인지 파일마다 비교 → 다른 파일 수"""
+    mismatches = 0
+    for path in sorted(str(p) for p in data_dir.glob("*.xml")):
+        expected = [(d.page_content, d.metadata) for d in legacy_iter_documents_from_xml(path)]
+        actual = [(d.page_content, d.metadata) for d in (c.to_document() for c in iter_clauses_from_xml(path))]
+        if expected != actual:
+            mismatches += 1
+            print(f"❌ 결과 불일치: {path} (기준 {len(expected)}개 / 레코드 {len(actual)}개)")
+    return mismatches
+
+
+def run(data_dir: Path) -> Dict[str, Any]:
+    mismatches = check_equivalence(data_dir)
+    print(f"[동등성] 불일치 파일 {mismatches}개")
+    results = {mode: _run_mode(mode, data_dir) for mode in MODES}
+    for r in results.values():
+        held = r["peak_rss_bytes"] - r["baseline_rss_bytes"]
+        print(
+            f"{r['mode']:<10} {r['files']:>4} files {r['clauses']:>8,} 조항 | {r['seconds']:6.1f}s | "
+            f"peak RSS {r['peak_rss_bytes'] / 2**20:8.1f} MB (import 이후 증가분 {held / 2**20:8.1f} MB)"
+        )
+
+    docs, records = results["documents"], results["records"]
+    if docs["clauses"] != records["clauses"]:
+        print(f"❌ 조항 수 불일치: documents {docs['clauses']} / records {records['clauses']}")
+    reduction = 1 - records["peak_rss_bytes"] / docs["peak_rss_bytes"] if docs["peak_rss_bytes"] else 0.0
+    print(f"peak RSS 감소: {reduction * 100:.1f}%")
+    return {
+        "data_dir": str(data_dir),
+        "mismatches": mismatches,
+        "results": list(results.values()),
+        "peak_rss_reduction": reduction,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--synthetic-files", type=int, default=40)
+    parser.add_argument("--synthetic-clauses", type=int, default=2_000)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_worker(args.worker, args.data_dir)))
+        return
+
+    if args.data_dir.is_dir() and any(args.data_dir.glob("*.xml")):
+        report = run(args.data_dir)
+    else:
+        print(f"[bench] {args.data_dir} 에 XML이 없어 합성 약관으로 측정합니다")
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(args.synthetic_files):
+                layout = "automobile" if i % 4 == 0 else "default"
+                write_synthetic_xml(Path(tmp), layout, args.synthetic_clauses, seed=i, index=i, n_cn=20)
+            report = run(Path(tmp))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    sys.exit(1 if report["mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+보험유형 분류 비교: LLM 분류 (질문마다 호출) vs 중심 벡터 분류 (1·2위 점수 차가 작을 때만 LLM)
+
+실행 (프로젝트 루트, 적재된 컬렉션의 중심 벡터 파일 + UPSTAGE_API_KEY 필요, INSURANCE_CLASSIFIER 설정과 무관):
+    python -m benchmarks.bench_insurance_classifier questions.txt
+    python -m benchmarks.bench_insurance_classifier labeled.jsonl --margins 0 0.02 0.05 0.1 --json report.json
+
+입력: 한 줄에 질문 하나, 또는 JSONL {"question", ("insurance_type": 정답)}
+- 질문마다 LLM 분류와 중심 벡터 분류(1위 보험유형 + 점수 차)를 모두 구한 뒤 margin 별로
+  중심 벡터로 끝나는 비율 / 그때 LLM 과 같은 비율 / (정답이 있으면) 정확도 / 질문당 분류 지연을 계산한다
+- 질문 임베딩은 검색에 어차피 필요하므로 지연 비교에서 뺀다 (중심 벡터 분류 비용 = 행렬 곱 한 번)
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "source"))  # 질문 처리 쪽 모듈은 source/ 기준 import
+
+from chains.insurance_classifier import local_classification, rank_insurance_types  # noqa: E402
+from config.settings import CLASSIFIER_MARGIN  # noqa: E402
+from llm.llm import get_llm  # noqa: E402
+from vectorstore.registry import get_registry  # noqa: E402
+
+
+def _read(path: Path) -> List[Dict[str, Optional[str]]]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line) if line.startswith("{") else {"question": line}
+            rows.append({"question": record["question"], "label": record.get("insurance_type")})
+    return rows
+
+
+def _measure(rows: List[Dict[str, Optional[str]]], llm) -> List[Dict[str, Any]]:
+    """질문마다 LLM 분류 / 중심 벡터 분류 결과와 걸린 시간"""
+    registry = get_registry()
+    results = []
+    for i, row in enumerate(rows):
+        vector = registry.embeddings.embed_query(row["question"])  # type: ignore[arg-type]
+        start = time.perf_counter()
+        local = local_classification(vector)
+        local_time = time.perf_counter() - start
+        if local is None:
+            raise SystemExit("중심 벡터 파일이 없습니다 (ingest_all --build-type-centroids 로 먼저 생성)")
+        start = time.perf_counter()
+        # 분류 캐시를 거치지 않은 실제 LLM 분류 시간
+        llm_type = rank_insurance_types(row["question"], llm, use_cache=False)[0][0][0]  # type: ignore[arg-type]
+        llm_time = time.perf_counter() - start
+        results.append({
+            **row,
+            "llm": llm_type,
+            "centroid": local[0],
+            "margin": local[1],
+            "llm_time": llm_time,
+            "centroid_time": local_time,
+        })
+        if (i + 1) % 50 == 0:
+            print(f"  {i + 1}/{len(rows)}", file=sys.stderr)
+    return results
+
+
+def _summary(results: List[Dict[str, Any]], margin: float) -> Dict[str, Any]:
+    """margin 기준 중심 벡터 + LLM 조합 분류의 적용률 / LLM 일치율 / 정확도 / 질문당 분류 지연"""
+    confident = [r for r in results if r["margin"] >= margin]
+    chosen = [r["centroid"] if r["margin"] >= margin else r["llm"] for r in results]
+    llm_time = float(np.mean([r["llm_time"] for r in results]))
+    mean_time = float(np.mean([
+        r["centroid_time"] + (0.0 if r["margin"] >= margin else r["llm_time"]) for r in results
+    ]))
+    summary = {
+        "margin": margin,
+        "coverage": len(confident) / len(results),
+        "agreement_when_confident": (
+            sum(r["centroid"] == r["llm"] for r in confident) / len(confident) if confident else None
+        ),
+        "agreement": sum(choice == r["llm"] for choice, r in zip(chosen, results)) / len(results),
+        "mean_time_s": mean_time,
+        "saved_s": llm_time - mean_time,
+    }
+    labeled = [(choice, r) for choice, r in zip(chosen, results) if r["label"]]
+    if labeled:
+        summary["accuracy"] = sum(choice == r["label"] for choice, r in labeled) / len(labeled)
+    return summary
+
+
+def run(path: Path, margins: List[float]) -> Dict[str, Any]:
+    rows = _read(path)
+    results = _measure(rows, get_llm())
+    llm_time = float(np.mean([r["llm_time"] for r in results]))
+    labeled = [r for r in results if r["label"]]
+
+    print(f"\n질문 {len(results)}개 (정답 {len(labeled)}개), LLM 분류 평균 {llm_time * 1000:.0f}ms")
+    if labeled:
+        llm_accuracy = sum(r["llm"] == r["label"] for r in labeled) / len(labeled)
+        centroid_accuracy = sum(r["centroid"] == r["label"] for r in labeled) / len(labeled)
+        print(f"정확도: LLM {llm_accuracy:.1%} | 중심 벡터만 {centroid_accuracy:.1%}")
+    print(f"{'margin':>7} | {'중심 벡터':>8} | {'확신 시 LLM 일치':>14} | {'LLM 일치':>8} | {'정확도':>7} | {'분류 지연':>9} | {'절약':>8}")
+    summaries = []
+    for margin in margins:
+        summary = _summary(results, margin)
+        summaries.append(summary)
+        agreement = summary["agreement_when_confident"]
+        agreement_text = "-" if agreement is None else f"{agreement:.1%}"
+        accuracy_text = f"{summary['accuracy']:.1%}" if "accuracy" in summary else "-"
+        print(
+            f"{margin:>7.3f} | {summary['coverage']:>8.1%} | {agreement_text:>14} | {summary['agreement']:>8.1%} | "
+            f"{accuracy_text:>7} | {summary['mean_time_s'] * 1000:>7.0f}ms | {summary['saved_s'] * 1000:>6.0f}ms"
+        )
+    print(f"※ 현재 CLASSIFIER_MARGIN = {CLASSIFIER_MARGIN}")
+    return {"questions": len(results), "llm_mean_time_s": llm_time, "summaries": summaries, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", type=Path, help="질문 파일 (텍스트 / JSONL)")
+    parser.add_argument("--margins", type=float, nargs="+", default=[0.0, 0.02, 0.05, 0.1, 0.2])
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장 (질문별 결과 포함)")
+    args = parser.parse_args()
+
+    report = run(args.input, args.margins)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+어휘(BM25) 색인 벤치마크: 합성 약관 조항으로 색인 생성 시간 / 디스크 크기 / 질문당 검색 지연
+
+실행 (프로젝트 루트):
+    python -m benchmarks.bench_lexical_index
+    python -m benchmarks.bench_lexical_index --sizes 1000 10000 100000 --json result.json
+
+- 색인은 build_from_collection 과 같은 텍스트(가장 하위 level 제목 + 본문)로 만든다 (Qdrant 없이 Document 에서 바로)
+- 질문은 각 조항 제목(제N조(...))에서 뽑으므로, top1 은 "제목으로 물었을 때 그 조항이 1위인 비율" 참고값
+  (합성 약관은 조 제목이 몇 가지 문구로 반복되므로 조항 수가 늘수록 낮아지는 것이 정상)
+- ⚠️ 실제 recall@3~5 비교(dense vs hybrid)는 실데이터 + 실제 임베딩 모델 + 정답 세트로 따로 측정해야 한다
+"""
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.synthetic import generate_terms_text
+from source.ingest.preprocessing import build_documents_from_text
+from source.vectorstore.lexical_index import LexicalIndex, LexicalIndexBuilder, _index_text
+
+
+def _documents(n_clauses: int, seed: int):
+    text = generate_terms_text("default", n_clauses, seed)
+    return build_documents_from_text(text, "상해보험", f"synthetic_{n_clauses}.xml")
+
+
+def run_case(n_clauses: int, queries: int, k: int, seed: int) -> Dict[str, Any]:
+    docs = _documents(n_clauses, seed)
+    payloads = [{"page_content": d.page_content, "metadata": d.metadata} for d in docs]
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        start = time.perf_counter()
+        builder = LexicalIndexBuilder()
+        for i, payload in enumerate(payloads):
+            text, insurance_type = _index_text(payload, "page_content", "metadata")
+            builder.add(i, text, insurance_type)
+        builder.write(tmp / "index")
+        build_s = time.perf_counter() - start
+        size_mb = sum(f.stat().st_size for f in (tmp / "index").iterdir()) / 1e6
+
+        index = LexicalIndex(tmp / "index")
+        rng = random.Random(seed + 1)
+        targets = rng.sample(range(len(docs)), min(queries, len(docs)))
+        latencies: List[float] = []
+        top1 = 0
+        for target in targets:
+            question = docs[target].metadata.get("level_2") or docs[target].page_content[:20]
+            begin = time.perf_counter()
+            hits = index.search(question, k)
+            latencies.append(time.perf_counter() - begin)
+            top1 += bool(hits) and hits[0][0] == target
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    row = {
+        "clauses": len(docs),
+        "build_s": build_s,
+        "size_mb": size_mb,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "title_top1": top1 / len(targets),
+    }
+    print(
+        f"{row['clauses']:>8} 조항 | 생성 {row['build_s']:7.2f}s | {row['size_mb']:7.2f} MB | "
+        f"p50 {row['p50_ms']:7.2f} ms | p95 {row['p95_ms']:7.2f} ms | 제목 top1 {row['title_top1']:.2f}"
+    )
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    results = [run_case(n, args.queries, args.k, args.seed) for n in args.sizes]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
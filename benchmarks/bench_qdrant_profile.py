@@ -0,0 +1,166 @@
+"""
+Qdrant 컬렉션 프로필 벤치마크: 보험유형 필터 검색 지연 시간 / RAM (프로필 off vs on)
+
+실행 (프로젝트 루트):
+    python -m benchmarks.bench_qdrant_profile                          # 로컬 모드 QdrantClient(path=...)
+    python -m benchmarks.bench_qdrant_profile --points 200000 --json result.json
+    python -m benchmarks.bench_qdrant_profile --url http://localhost:6333   # 서버 (임시 컬렉션 생성 후 삭제)
+
+- off = 프로필 도입 전 설정 (인덱스/양자화 없음), on = settings.QDRANT_COLLECTION_PROFILE
+- 모드마다 새 프로세스에서 측정하므로 RAM(peak RSS)이 서로 섞이지 않는다
+- ⚠️ 로컬 모드는 payload 인덱스 / 양자화 / HNSW / on_disk 를 무시하고 항상 전체 탐색한다.
+  로컬 결과는 "프로필이 로컬 모드 동작을 바꾸지 않는다"는 확인용이고,
+  실제 효과(필터 검색 지연, 서버 RAM)는 --url 로 서버에서 측정해야 한다.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from source.config.settings import ALLOWED_INSURANCE_TYPES, EMBEDDING_DIM, QDRANT_COLLECTION_PROFILE, TOP_K
+from source.vectorstore.collection_profile import create_collection, search_params
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+MODES = ("off", "on")
+INSURANCE_TYPES = sorted(ALLOWED_INSURANCE_TYPES)
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux: KB, macOS: bytes
+
+
+def _vectors(n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, EMBEDDING_DIM), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _type_filter(insurance_type: str) -> models.Filter:
+    return models.Filter(
+        must=[models.FieldCondition(key="metadata.insurance_type", match=models.MatchValue(value=insurance_type))]
+    )
+
+
+def _worker(mode: str, points: int, queries: int, seed: int, url: Optional[str], path: Optional[str]) -> Dict[str, Any]:
+    profile = QDRANT_COLLECTION_PROFILE if mode == "on" else None
+    client = QdrantClient(url=url) if url else QdrantClient(path=path)
+    collection_name = f"bench_profile_{mode}"
+    baseline = _peak_rss_bytes()
+
+    create_collection(client, collection_name, EMBEDDING_DIM, profile)
+    vectors = _vectors(points, seed)
+    start = time.perf_counter()
+    for i in range(0, points, 1024):
+        batch = vectors[i:i + 1024]
+        client.upsert(
+            collection_name=collection_name,
+            points=[
+                models.PointStruct(
+                    id=i + j,
+                    vector=v.tolist(),
+                    payload={
+                        "page_content": "",
+                        "metadata": {
+                            "insurance_type": INSURANCE_TYPES[(i + j) % len(INSURANCE_TYPES)],
+                            "source": f"{(i + j) % 500:03d}.xml",
+                        },
+                    },
+                )
+                for j, v in enumerate(batch)
+            ],
+            wait=True,
+        )
+    load_seconds = time.perf_counter() - start
+    del vectors
+
+    params = search_params(profile)
+    query_vectors = _vectors(queries, seed + 1)
+    latencies: List[float] = []
+    for q, vector in enumerate(query_vectors):
+        start = time.perf_counter()
+        client.query_points(
+            collection_name=collection_name,
+            query=vector.tolist(),
+            query_filter=_type_filter(INSURANCE_TYPES[q % len(INSURANCE_TYPES)]),
+            search_params=params,
+            limit=TOP_K,
+        )
+        latencies.append(time.perf_counter() - start)
+
+    result = {
+        "mode": mode,
+        "points": points,
+        "queries": queries,
+        "load_seconds": load_seconds,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "baseline_rss_bytes": baseline,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+    if url:
+        client.delete_collection(collection_name)
+    client.close()
+    return result
+
+
+def _run_mode(mode: str, args: argparse.Namespace, path: Optional[str]) -> Dict[str, Any]:
+    cmd = [
+        sys.executable, "-m", "benchmarks.bench_qdrant_profile", "--worker", mode,
+        "--points", str(args.points), "--queries", str(args.queries), "--seed", str(args.seed),
+    ]
+    cmd += ["--url", args.url] if args.url else ["--path", str(path)]
+    out = subprocess.run(cmd, cwd=PROJECT_DIR, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = []
+    for mode in MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            r = _run_mode(mode, args, None if args.url else Path(tmp) / mode)
+        results.append(r)
+        print(
+            f"profile {r['mode']:<3} | {r['points']:>8,} points | 적재 {r['load_seconds']:6.1f}s | "
+            f"필터 검색 p50 {r['p50_ms']:7.2f} ms / p95 {r['p95_ms']:7.2f} ms | "
+            f"클라이언트 프로세스 peak RSS {r['peak_rss_bytes'] / 2**20:8.1f} MB"
+        )
+    if not args.url:
+        print("※ 로컬 모드는 프로필(인덱스/양자화/HNSW/on_disk)을 무시합니다. 서버 효과는 --url 로 측정하세요.")
+    else:
+        print("※ 서버 RAM은 Qdrant 프로세스 쪽에서 확인하세요 (위 RSS는 벤치마크 클라이언트 프로세스).")
+    return {"target": args.url or "local", "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Qdrant 서버 URL (없으면 로컬 모드)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_worker(args.worker, args.points, args.queries, args.seed, args.url, args.path)))
+        return
+
+    report = run(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
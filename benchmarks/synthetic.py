@@ -0,0 +1,183 @@
+"""
+합성 약관 XML 생성기 + 고정 비용 가짜 임베딩 / 고정 지연 가짜 채팅 모델
+실제 데이터와 같은 <cn> 형식으로 관/조 (일반) 또는 편/장/절/조 (자동차) 구조의 약관을 만든다
+"""
+import asyncio
+import random
+import time
+import zlib
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+CLAUSE_TITLES = [
+    "목적", "용어의 정의", "보험금의 지급사유", "보험금을 지급하지 않는 사유",
+    "계약의 무효", "계약의 해지", "보험료의 납입", "분쟁의 조정", "소멸시효",
+    "보험금의 청구", "보험금의 지급절차", "손해방지의무", "약관의 해석",
+]
+SENTENCES = [
+    "회사는 피보험자가 보험기간 중에 상해를 입은 경우 보험금을 지급합니다.",
+    "계약자는 청약할 때 청약서에서 질문한 사항에 대하여 사실대로 알려야 합니다.",
+    "피보험자의 고의로 인한 손해는 보상하지 않습니다.",
+    "보험금 청구권은 3년간 행사하지 않으면 소멸시효가 완성됩니다.",
+    "회사는 보험금 청구서류를 접수한 날부터 3영업일 이내에 보험금을 지급합니다.",
+    "전쟁, 혁명, 내란, 사변, 폭동으로 생긴 손해는 보상하지 않습니다.",
+    "계약자는 보험료를 납입기일까지 납입하여야 합니다.",
+    "이 약관에서 정하지 않은 사항은 대한민국 법령에 따릅니다.",
+]
+CIRCLED = "①②③④⑤⑥⑦⑧⑨⑩"
+
+
+def _clause_body(rng: random.Random) -> List[str]:
+    lines = []
+    for i in range(rng.randint(1, 4)):
+        sentences = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 3)))
+        lines.append(f"{CIRCLED[i]} {sentences}")
+        for j in range(rng.randint(0, 3)):
+            lines.append(f"  {j + 1}. {rng.choice(SENTENCES)}")
+    return lines
+
+
+def generate_terms_text(layout: str, n_clauses: int, seed: int = 0) -> str:
+    """
+    layout: "default" (관/조) 또는 "automobile" (편/장/절/조)
+    n_clauses: 생성할 조 개수 (대략)
+    """
+    rng = random.Random(seed)
+    lines = ["보통약관", "", "목차는 별도로 제공됩니다."]
+    jo = 0
+
+    def clauses(count: int):
+        nonlocal jo
+        for _ in range(count):
+            jo += 1
+            lines.append(f"제{jo}조({rng.choice(CLAUSE_TITLES)})")
+            lines.extend(_clause_body(rng))
+
+    if layout == "automobile":
+        # 편 → 장 → 절 → 조 (절 하나당 조 5개 안팎)
+        per_section = 5
+        n_sections = max(1, n_clauses // per_section)
+        pyeon = jang = jeol = 0
+        while jeol < n_sections:
+            pyeon += 1
+            lines.append(f"제{pyeon}편 {rng.choice(['배상책임', '자기신체사고', '자기차량손해'])}")
+            for _ in range(3):
+                jang += 1
+                lines.append(f"제{jang}장 {rng.choice(['보상하는 손해', '보상하지 않는 손해', '일반사항'])}")
+                for _ in range(3):
+                    jeol += 1
+                    lines.append(f"제{jeol}절 {rng.choice(['총칙', '지급기준', '청구절차'])}")
+                    clauses(min(per_section, n_clauses - jo))
+                    if jeol >= n_sections:
+                        break
+                if jeol >= n_sections:
+                    break
+    else:
+        # 관 → 조 (관 하나당 조 10개 안팎)
+        per_gwan = 10
+        gwan = 0
+        while jo < n_clauses:
+            gwan += 1
+            lines.append(f"제{gwan}관 {rng.choice(['목적 및 용어의 정의', '보험금의 지급', '계약자의 의무', '분쟁의 조정 등'])}")
+            clauses(min(per_gwan, n_clauses - jo))
+
+    return "\n".join(lines)
+
+
+def synthetic_file_name(layout: str, index: int = 0) -> str:
+    insurance_type = "자동차보험" if layout == "automobile" else "상해보험"
+    return f"{index:03d}_{insurance_type}_가공.xml"
+
+
+def write_synthetic_xml(
+    directory: Path, layout: str, n_clauses: int, seed: int = 0, index: int = 0, n_cn: int = 1
+) -> Path:
+    """
+    합성 약관 XML 파일 1개 작성
+    n_cn: 본문을 몇 개의 <cn> 노드로 나눌지
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = synthetic_file_name(layout, index)
+    lines = generate_terms_text(layout, n_clauses, seed).split("\n")
+    step = max(1, -(-len(lines) // n_cn))
+    cn_nodes = "".join(
+        f"<cn><![CDATA[{chr(10).join(lines[i:i + step])}]]></cn>"
+        for i in range(0, len(lines), step)
+    )
+    path = directory / name
+    category = "자동차보험" if layout == "automobile" else "상해보험"
+    path.write_text(
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f"<document><category>{category}</category><name>{name}</name>{cn_nodes}</document>",
+        encoding="utf-8",
+    )
+    return path
+
+
+def write_synthetic_corpus(
+    directory: Path, layout: str, n_clauses: int, clauses_per_file: int = 1_000, seed: int = 0, n_cn: int = 20
+) -> List[Path]:
+    """조 n_clauses 개를 clauses_per_file 개씩 여러 파일로 나눠 작성"""
+    paths = []
+    for index, start in enumerate(range(0, n_clauses, clauses_per_file)):
+        count = min(clauses_per_file, n_clauses - start)
+        paths.append(write_synthetic_xml(directory, layout, count, seed=seed + index, index=index, n_cn=n_cn))
+    return paths
+
+
+class FixedCostEmbeddings(Embeddings):
+    """
+    모델 없이 쓰는 가짜 임베딩 (벤치마크용)
+    텍스트 1개당 cost_per_text 초를 기다리고, 텍스트 해시로 고른 단위 벡터를 돌려준다 (같은 텍스트 → 같은 벡터)
+    """
+
+    def __init__(self, dim: int, cost_per_text: float = 0.0, pool_size: int = 4096, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        pool = rng.standard_normal((pool_size, dim), dtype=np.float32)
+        self._pool = pool / np.linalg.norm(pool, axis=1, keepdims=True)
+        self.cost_per_text = cost_per_text
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.cost_per_text:
+            time.sleep(self.cost_per_text * len(texts))
+        rows = [zlib.crc32(text.encode("utf-8")) % len(self._pool) for text in texts]
+        return self._pool[rows].tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class FixedLatencyChatModel(BaseChatModel):
+    """
+    API 없이 쓰는 가짜 채팅 모델 (벤치마크용)
+    호출마다 latency 초 뒤에 response 를 돌려준다 (invoke 는 time.sleep, ainvoke 는 asyncio.sleep)
+    """
+
+    latency: float = 0.0
+    response: str = "질병보험"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fixed-latency"
+
+    def _result(self) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.response))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._result()
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._result()
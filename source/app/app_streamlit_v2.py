@@ -8,7 +8,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from chains.qa_chain_with_metrics import get_qa_chain_with_metrics
-from vectorstore.retriever import get_retriever
+from vectorstore.registry import warm_up
 from evaluation.judge import LLMJudge
 from evaluation.store import EvaluationStore
 
@@ -202,10 +202,41 @@ with st.sidebar:
         with col1:
             st.metric(response_time_label, f"{response_time:.2f}초")
             st.caption(f"검색: {metrics.get('retrieval_time', 0):.2f}초 | 생성: {metrics.get('generation_time', 0):.2f}초")
+            if metrics.get('classification_method'):
+                method_label = {
+                    "centroid": "중심 벡터", "cache": "캐시", "llm": "LLM", "keyword": "키워드", "default": "기본값"
+                }.get(metrics['classification_method'], metrics['classification_method'])
+                st.caption(f"보험유형 분류: {metrics.get('classification_time', 0):.2f}초 ({method_label})")
+                if metrics.get('classification_cache_hit_rate') is not None:
+                    st.caption(
+                        f"분류 캐시 적중률: {metrics['classification_cache_hit_rate']:.0%} "
+                        f"(누적 {metrics.get('classification_cache_hits', 0)}/"
+                        f"{metrics.get('classification_cache_hits', 0) + metrics.get('classification_cache_misses', 0)})"
+                    )
+                search_types = metrics.get('search_types')
+                st.caption(f"검색 필터: {', '.join(search_types) if search_types else '전체 (신뢰도 분산)'}")
+            if metrics.get('speculative_retrieval'):
+                speculative_label = {"hit": "후보로 충분", "miss": "필터 검색 다시 보냄"}.get(
+                    metrics['speculative_retrieval'], metrics['speculative_retrieval']
+                )
+                st.caption(f"추측 검색 (분류와 동시): {speculative_label}")
+            if metrics.get('query_cache_hit') is not None:
+                st.caption(
+                    f"질문 임베딩: {metrics.get('query_embedding_time', 0):.2f}초 "
+                    f"(캐시 {'히트' if metrics['query_cache_hit'] else '미스'}, "
+                    f"누적 {metrics.get('query_cache_hits', 0)}/{metrics.get('query_cache_hits', 0) + metrics.get('query_cache_misses', 0)})"
+                )
         with col2:
             st.metric("토큰 사용", f"{metrics.get('total_tokens', 0):,}")
             st.caption(f"검색 문서: {metrics.get('retrieved_docs_count', 0)}개")
         
+        if metrics.get('answer_cache'):
+            cache_info = metrics['answer_cache']
+            if cache_info['kind'] == "exact":
+                st.info("♻️ 답변 캐시: 같은 질문의 답변 재사용")
+            else:
+                st.info(f"♻️ 답변 캐시: 비슷한 질문의 답변 재사용 ('{cache_info['question']}', 유사도 {cache_info['similarity']:.2f})")
+        
         if metrics.get('fallback_activated'):
             st.warning("⚠️ 필터 실패 → 전체 검색")
         
@@ -367,8 +398,8 @@ with col1:
         st.session_state.init_attempted = True
         with st.spinner("🔄 시스템 초기화 중..."):
             try:
-                # Qdrant 연결 테스트
-                retriever = get_retriever()
+                # Qdrant 연결 + 임베딩 모델 로딩 (프로세스 공용, 첫 질문에서 기다리지 않도록 미리)
+                warm_up()
                 st.session_state.qdrant_ready = True
                 st.session_state.qa_chain = get_qa_chain_with_metrics(enable_metrics=True)
             except ConnectionRefusedError as e:
@@ -0,0 +1,102 @@
+"""
+일괄 QA CLI: 질문 파일(또는 stdin) → 답변 JSONL (답변이 끝나는 대로 한 줄씩 기록)
+
+실행 (source/ 에서):
+    python -m app.run_batch_qa questions.txt -o answers.jsonl
+    cat questions.jsonl | python -m app.run_batch_qa - > answers.jsonl
+
+입력: 한 줄에 질문 하나 (빈 줄은 건너뜀). 줄이 "{" 로 시작하면 JSON 으로 읽어 "question" (+ 있으면 "id") 을 쓴다.
+출력: 한 줄에 결과 하나 {"index", ("id"), "question", "insurance_type", "search_types", "level_1"~"level_4", "answer", "sources", ("error")}
+      줄 순서는 답변이 끝난 순서 → 입력 순서는 "index" 로 맞춘다. 진행 로그는 stderr 로 나간다.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from chains.batch_qa import aanswer_questions
+from config.settings import QA_BATCH_CONCURRENCY, QA_BATCH_SIZE
+from vectorstore.registry import ashutdown, shutdown, warm_up
+
+
+def read_questions(lines: TextIO, ids: List[Optional[Any]]) -> Iterator[str]:
+    """입력 줄 → 질문 (JSON 줄의 "id" 는 ids 에 입력 순서대로 모음)"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            record = json.loads(line)
+            ids.append(record.get("id"))
+            yield record["question"]
+        else:
+            ids.append(None)
+            yield line
+
+
+def to_record(result: Dict[str, Any], ids: List[Optional[Any]]) -> Dict[str, Any]:
+    """체인 결과 → JSON 으로 쓸 수 있는 기록 (문서 대신 출처 목록)"""
+    record: Dict[str, Any] = {"index": result["index"]}
+    if ids[result["index"]] is not None:
+        record["id"] = ids[result["index"]]
+    for key in ("question", "insurance_type", "search_types", "level_1", "level_2", "level_3", "level_4", "answer"):
+        record[key] = result.get(key)
+    record["sources"] = [
+        {"source": d.metadata.get("source"), "level_2": d.metadata.get("level_2"), "id": d.metadata.get("_id")}
+        for d in result.get("docs", [])
+    ]
+    if "error" in result:
+        record["error"] = result["error"]
+    return record
+
+
+async def run(lines: TextIO, out: TextIO, batch_size: int, concurrency: int) -> Dict[str, int]:
+    ids: List[Optional[Any]] = []
+    written = failed = 0
+    try:
+        async for result in aanswer_questions(read_questions(lines, ids), batch_size=batch_size, concurrency=concurrency):
+            record = to_record(result, ids)
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            written += 1
+            failed += "error" in record
+    finally:
+        await ashutdown()  # 비동기 클라이언트는 이 이벤트 루프와 함께 닫음
+    return {"written": written, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="질문 파일 (텍스트 / JSONL), - 면 stdin")
+    parser.add_argument("-o", "--output", help="결과 JSONL 파일 (없으면 stdout)")
+    parser.add_argument("--batch-size", type=int, default=QA_BATCH_SIZE, help="한 번에 임베딩 / 검색할 질문 수")
+    parser.add_argument("--concurrency", type=int, default=QA_BATCH_CONCURRENCY, help="동시 LLM 호출 수")
+    args = parser.parse_args()
+
+    lines = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        # 진행 로그(print)는 stderr 로 → stdout 으로 JSONL 을 내보내도 섞이지 않음
+        with contextlib.redirect_stdout(sys.stderr):
+            warm_up()
+            stats = asyncio.run(run(lines, out, args.batch_size, args.concurrency))
+    finally:
+        shutdown()
+        if lines is not sys.stdin:
+            lines.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ {stats['written']}개 질문 완료 (실패 {stats['failed']}개), {elapsed:.1f}s "
+        f"({stats['written'] / max(elapsed, 1e-9):.2f} 질문/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
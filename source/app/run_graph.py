@@ -1,10 +1,15 @@
 from graph.graph import build_graph
+from vectorstore.registry import shutdown, warm_up
 
 def main():
     graph = build_graph()
+    warm_up()
 
-    while True:
-        q = input("\n질문: ")
-        result = graph.invoke({"question": q}) # type: ignore
-        print("\n📌 답변:")
-        print(result["answer"])
+    try:
+        while True:
+            q = input("\n질문: ")
+            result = graph.invoke({"question": q}) # type: ignore
+            print("\n📌 답변:")
+            print(result["answer"])
+    finally:
+        shutdown()
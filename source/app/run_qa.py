@@ -1,4 +1,5 @@
 from chains.qa_chain import get_qa_chain
+from vectorstore.registry import shutdown, warm_up
 
 def safe_input(prompt: str) -> str:
     try:
@@ -9,15 +10,19 @@ def safe_input(prompt: str) -> str:
     
 def main():
     chain = get_qa_chain()
+    warm_up()
 
-    while True:
-        q = input("\n질문 (exit 입력 시 종료): ")
-        if q == "exit":
-            break
+    try:
+        while True:
+            q = input("\n질문 (exit 입력 시 종료): ")
+            if q == "exit":
+                break
 
-        answer = chain.invoke(q)
-        print("\n📌 답변:")
-        print(answer)
+            answer = chain.invoke(q)
+            print("\n📌 답변:")
+            print(answer)
+    finally:
+        shutdown()
 
 if __name__ == "__main__":
     main()
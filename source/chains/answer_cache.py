@@ -0,0 +1,294 @@
+# source/chains/answer_cache.py
+"""
+의미 기반 답변 캐시 (QA 체인 앞단)
+
+같은 질문을 표현만 바꿔 묻는 경우가 많아서 (음주운전 사고 보장 / 음주운전 사고 나면 보장되나요)
+질문마다 분류 LLM + 검색 + 답변 LLM 을 다시 돌리지 않도록 결과를 캐시한다.
+1) 정확 일치: 정규화한 질문 문자열 (분류 전에 확인 → 히트면 LLM 호출 없음)
+2) 의미 일치: 분류된 보험유형 안에서 질문 벡터 코사인 유사도 similarity 이상인 가장 가까운 질문 (검색 + 답변 생략)
+
+- maxsize 를 넘으면 가장 오래 안 쓴 질문부터, ttl 초가 지난 답변은 조회 시점에 버린다
+- 인덱스 버전 (컬렉션 + 임베딩 모델 + 적재 매니페스트) 이 바뀌면 이전 버전 답변은 모두 버린다
+- 답변은 답변기 버전 (답변 프롬프트 + 실제로 부른 LLM 의 클래스 / 모델 / temperature) 별로 따로 둔다
+  → 프롬프트나 모델을 바꾸면 이전 답변이 나가지 않고, 다른 LLM 을 쓰는 체인끼리 서로의 답변을 지우지도 않음
+- SQLite 파일에 기록해 두고 시작할 때 현재 버전 답변만 메모리로 읽는다 (프로세스 재시작 후에도 유지)
+  다른 프로세스가 추가한 답변은 다음 시작 때 보인다
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from config.settings import (
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_SIZE,
+    ANSWER_CACHE_TTL,
+    COLLECTION_NAME,
+    EMBEDDING_MODEL,
+    INGEST_MANIFEST_PATH,
+)
+from llm.prompt import INSURANCE_PROMPT
+from chains.classification_cache import llm_identity
+from vectorstore.query_cache import normalize_question
+
+# answers (답변기 구분 없던 이전 형식) 는 어느 프롬프트 / 모델의 답변인지 알 수 없어서 버린다
+_SCHEMA = """
+DROP TABLE IF EXISTS answers;
+CREATE TABLE IF NOT EXISTS answer_entries (
+    question TEXT NOT NULL,
+    answerer TEXT NOT NULL,
+    insurance_type TEXT,
+    vector BLOB NOT NULL,
+    result TEXT NOT NULL,
+    version TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (question, answerer)
+);
+"""
+# 결과 dict 중 캐시에 넣는 값 (docs 는 page_content + metadata 로)
+_RESULT_KEYS = ("answer", "insurance_type", "search_types", "level_1", "level_2", "level_3", "level_4", "context")
+
+
+def index_version(
+    collection_name: str = COLLECTION_NAME,
+    embedding_model: str = EMBEDDING_MODEL,
+    manifest_path: Path = INGEST_MANIFEST_PATH,
+) -> str:
+    """검색 인덱스 버전: 적재할 때마다 매니페스트 파일이 바뀐다 (크기 + 수정 시각, 조회마다 stat 1번)"""
+    try:
+        stat = Path(manifest_path).stat()
+        manifest = f"{stat.st_size}:{stat.st_mtime_ns}"
+    except FileNotFoundError:
+        manifest = "-"
+    return f"{collection_name}|{embedding_model}|{manifest}"
+
+
+def answerer_version(llm, prompt: str = INSURANCE_PROMPT.template) -> str:
+    """답변 프롬프트 + LLM 식별자 → 짧은 해시 (분류 캐시의 classifier_version 과 같은 방식)"""
+    source = "\n".join([prompt, llm_identity(llm)])
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+class _Entry:
+    __slots__ = ("insurance_type", "vector", "result", "created")
+
+    def __init__(self, insurance_type: Optional[str], vector: np.ndarray, result: Dict[str, Any], created: float):
+        self.insurance_type = insurance_type
+        self.vector = vector
+        self.result = result
+        self.created = created
+
+
+class AnswerCache:
+    """
+    질문 → QA 결과 (answer / 보험유형 / 조항 분류 / context / docs)
+    answerer: 답변기 버전 (answerer_version), 같은 파일에서 이 답변기의 답변만 읽고 쓴다
+    여러 스레드에서 동시에 써도 된다 (SQLite 쓰기도 잠금 안에서)
+    SQLite 를 건드리므로 비동기 체인은 asyncio.to_thread 로 부른다
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        maxsize: int,
+        ttl: float,
+        similarity: float,
+        version: Callable[[], str] = index_version,
+        answerer: str = "",
+    ):
+        self.path = Path(path)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.similarity = similarity
+        self._version_fn = version
+        self.answerer = answerer
+        self._version = version()
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # 보험유형별 (질문 목록, 정규화 벡터 행렬) → 답변이 바뀌면 다음 조회 때 다시 만든다
+        self._matrices: Dict[Optional[str], Tuple[List[str], np.ndarray]] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._load()
+
+    # ---------- 조회 ----------
+    def get_exact(self, question: str) -> Optional[Dict[str, Any]]:
+        """정규화한 질문이 같은 답변 (없으면 None)"""
+        key = normalize_question(question)
+        with self._lock:
+            self._check_version()
+            entry = self._live(key)
+            if entry is None:
+                return None
+            self._touch(key)
+            self.hits["exact"] += 1
+            return _hit(entry, "exact", 1.0, key)
+
+    def get_similar(self, vector: List[float], insurance_type: Optional[str]) -> Optional[Dict[str, Any]]:
+        """같은 보험유형 답변 중 질문 벡터가 가장 가깝고 유사도가 similarity 이상인 답변 (없으면 None)"""
+        query = np.asarray(vector, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        with self._lock:
+            self._check_version()
+            keys, matrix = self._matrix(insurance_type)
+            if not keys:
+                self.misses += 1
+                return None
+            scores = matrix @ query
+            for row in np.argsort(-scores):
+                if scores[row] < self.similarity:
+                    break
+                entry = self._live(keys[row])
+                if entry is None:  # 만료 → 다음으로 가까운 질문
+                    continue
+                self._touch(keys[row])
+                self.hits["semantic"] += 1
+                return _hit(entry, "semantic", float(scores[row]), keys[row])
+            self.misses += 1
+            return None
+
+    # ---------- 저장 ----------
+    def put(self, question: str, vector: List[float], insurance_type: Optional[str], result: Dict[str, Any]):
+        key = normalize_question(question)
+        record = {k: result.get(k) for k in _RESULT_KEYS}
+        record["docs"] = [{"page_content": d.page_content, "metadata": d.metadata} for d in result.get("docs", [])]
+        array = np.asarray(vector, dtype=np.float32)
+        array /= max(float(np.linalg.norm(array)), 1e-12)
+        now = time.time()
+        with self._lock:
+            self._check_version()
+            if self.maxsize <= 0:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO answer_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, self.answerer, insurance_type, array.tobytes(), json.dumps(record, ensure_ascii=False, default=str),
+                 self._version, now, now),
+            )
+            self._entries[key] = _Entry(insurance_type, array, _from_record(record), now)
+            self._entries.move_to_end(key)
+            self._matrices.pop(insurance_type, None)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._entries), **{f"{k}_hits": v for k, v in self.hits.items()}, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+            self._db.execute("DELETE FROM answer_entries WHERE answerer = ?", (self.answerer,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # ---------- 내부 (잠금 안에서 호출) ----------
+    def _load(self):
+        """
+        이 답변기의 현재 버전 + 만료 전 답변을 최근 사용 순으로 maxsize개까지 (나머지는 파일에서도 지움)
+        만료된 답변은 답변기와 상관없이 지운다 (안 쓰게 된 답변기의 답변도 결국 사라짐)
+        """
+        self._db.execute("DELETE FROM answer_entries WHERE created < ?", (time.time() - self.ttl,))
+        self._db.execute(
+            "DELETE FROM answer_entries WHERE answerer = ? AND version != ?", (self.answerer, self._version)
+        )
+        rows = self._db.execute(
+            "SELECT question, insurance_type, vector, result, created FROM answer_entries WHERE answerer = ? "
+            "ORDER BY last_used DESC LIMIT ?",
+            (self.answerer, max(self.maxsize, 0)),
+        ).fetchall()
+        for question, insurance_type, vector, result, created in reversed(rows):
+            array = np.frombuffer(vector, dtype=np.float32)
+            self._entries[question] = _Entry(insurance_type, array, _from_record(json.loads(result)), created)
+        self._db.execute(
+            "DELETE FROM answer_entries WHERE answerer = ? AND question NOT IN "
+            "(SELECT question FROM answer_entries WHERE answerer = ? ORDER BY last_used DESC LIMIT ?)",
+            (self.answerer, self.answerer, max(self.maxsize, 0)),
+        )
+        if self._entries:
+            print(f"[answer_cache] 답변 {len(self._entries)}개 불러옴 ({self.path})")
+
+    def _check_version(self):
+        version = self._version_fn()
+        if version == self._version:
+            return
+        print(f"[answer_cache] 인덱스 버전 변경 → 캐시된 답변 {len(self._entries)}개 무효화")
+        self._version = version
+        self._entries.clear()
+        self._matrices.clear()
+        self._db.execute(
+            "DELETE FROM answer_entries WHERE answerer = ? AND version != ?", (self.answerer, version)
+        )
+
+    def _live(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry.created >= self.ttl:
+            self._remove(key)
+            return None
+        return entry
+
+    def _touch(self, key: str):
+        self._entries.move_to_end(key)
+        self._db.execute(
+            "UPDATE answer_entries SET last_used = ? WHERE question = ? AND answerer = ?",
+            (time.time(), key, self.answerer),
+        )
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._matrices.pop(entry.insurance_type, None)
+        self._db.execute("DELETE FROM answer_entries WHERE question = ? AND answerer = ?", (key, self.answerer))
+
+    def _matrix(self, insurance_type: Optional[str]) -> Tuple[List[str], np.ndarray]:
+        if insurance_type not in self._matrices:
+            keys = [key for key, entry in self._entries.items() if entry.insurance_type == insurance_type]
+            matrix = np.stack([self._entries[key].vector for key in keys]) if keys else np.zeros((0, 0), np.float32)
+            self._matrices[insurance_type] = (keys, matrix)
+        return self._matrices[insurance_type]
+
+
+def _hit(entry: _Entry, kind: str, similarity: float, question: str) -> Dict[str, Any]:
+    """캐시된 결과 사본 + answer_cache = {kind: exact / semantic, similarity, question: 캐시된 질문}"""
+    result = {**entry.result, "docs": list(entry.result["docs"])}
+    result["answer_cache"] = {"kind": kind, "similarity": similarity, "question": question}
+    return result
+
+
+def _from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """캐시 기록 → QA 결과 dict (docs 는 Document 로)"""
+    result = {k: record.get(k) for k in _RESULT_KEYS}
+    result["docs"] = [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in record.get("docs", [])]
+    return result
+
+
+_caches: Dict[str, AnswerCache] = {}
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache(llm) -> AnswerCache:
+    """
+    답변기 (INSURANCE_PROMPT + llm) 별 프로세스 공용 답변 캐시 (파일은 ANSWER_CACHE_PATH 하나)
+    켤지 말지는 체인이 정한다 (use_answer_cache, 기본값 ANSWER_CACHE_ENABLED)
+    """
+    answerer = answerer_version(llm)
+    with _cache_lock:
+        if answerer not in _caches:
+            _caches[answerer] = AnswerCache(
+                ANSWER_CACHE_PATH, ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_SIMILARITY, answerer=answerer
+            )
+        return _caches[answerer]
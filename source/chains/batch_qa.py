@@ -0,0 +1,100 @@
+# source/chains/batch_qa.py
+"""
+여러 질문 일괄 QA (오프라인 평가 / 대량 질문용)
+
+질문을 QA_BATCH_SIZE개씩 묶어서
+1) 임베딩: 질문 벡터 캐시에 없는 질문만 모델 호출 1번
+2) 분류: 중심 벡터로 확신이 없는 질문만 LLM 호출 (묶음 안에서 동시에) → 보험유형 순위 + 신뢰도
+3) 검색: 보험유형(신뢰도 상위 보험유형들)별로 모은 필터 검색 + 필터 없는 검색을 query_batch_points 1번, 조각 조회도 scroll 1번
+4) 답변: LLM 호출을 동시에 보내고 끝나는 대로 결과를 내보낸다 (다음 묶음의 분류 / 검색과 겹쳐서 진행)
+동시 LLM 호출 수(분류 + 답변)는 concurrency 개로 제한한다.
+
+결과 dict 는 QA 체인 결과와 같은 형태 + "index" (입력 순서). 답변 생성이 실패한 질문은 answer=None, "error" 에 사유.
+"""
+import asyncio
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, List, Set
+
+from config.settings import QA_BATCH_CONCURRENCY, QA_BATCH_SIZE
+from llm.llm import get_llm
+from vectorstore.async_retriever import aexpand_parent_clauses_many, asearch_many
+from vectorstore.registry import get_registry
+from vectorstore.retriever import embed_questions
+from chains.insurance_classifier import arank_insurance_types, filter_types
+from chains.utils import build_answer_prompt, select_final_docs
+
+
+async def aanswer_questions(
+    questions: Iterable[str],
+    llm=None,
+    batch_size: int = QA_BATCH_SIZE,
+    concurrency: int = QA_BATCH_CONCURRENCY,
+) -> AsyncIterator[Dict[str, Any]]:
+    """질문들 → 답변이 끝나는 순서대로 결과 dict (questions 는 한 묶음씩만 읽으므로 파일 / stdin 스트림도 됨)"""
+    llm = llm or get_llm()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def classify(question: str, vector: List[float]):
+        # 중심 벡터로 확신이 없을 때만 LLM 호출 → 그때만 동시 호출 수에 포함
+        ranking, _ = await arank_insurance_types(question, llm, vector, llm_semaphore=semaphore)
+        return ranking
+
+    async def generate(index: int, question: str, insurance_type: str, search_types, docs) -> Dict[str, Any]:
+        prompt_text, result = build_answer_prompt(question, insurance_type, docs)
+        result["search_types"] = search_types
+        try:
+            async with semaphore:
+                answer = (await llm.ainvoke(prompt_text)).content
+        except Exception as e:
+            print(f"[WARN] 답변 생성 실패 (#{index}): {e}")
+            return {"index": index, "answer": None, **result, "error": str(e)}
+        return {"index": index, "answer": answer, **result}
+
+    pending: Set["asyncio.Task[Dict[str, Any]]"] = set()
+    iterator = iter(questions)
+    start = 0
+    while True:
+        batch: List[str] = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        vectors = [vector for vector, _ in await asyncio.to_thread(embed_questions, batch)]
+        rankings = await asyncio.gather(*(classify(question, vector) for question, vector in zip(batch, vectors)))
+        search_types = [filter_types(ranking) for ranking in rankings]
+        searched = await asearch_many(vectors, search_types, batch)
+        docs_list = await aexpand_parent_clauses_many(
+            [select_final_docs(docs, unfiltered_docs)[0] for docs, unfiltered_docs in searched]
+        )
+        pending.update(
+            asyncio.create_task(generate(start + offset, question, ranking[0][0], types, docs))
+            for offset, (question, ranking, types, docs) in enumerate(zip(batch, rankings, search_types, docs_list))
+        )
+        start += len(batch)
+
+        # 끝난 답변은 바로 내보내고, 밀린 답변이 두 묶음을 넘으면 다음 묶음 전에 기다린다
+        done = {task for task in pending if task.done()}
+        while len(pending) - len(done) > 2 * batch_size:
+            finished, _ = await asyncio.wait(pending - done, return_when=asyncio.FIRST_COMPLETED)
+            done |= finished
+        pending -= done
+        for task in sorted(done, key=lambda task: task.result()["index"]):
+            yield task.result()
+
+    for task in asyncio.as_completed(pending):
+        yield await task
+
+
+def answer_questions(
+    questions: Iterable[str],
+    llm=None,
+    batch_size: int = QA_BATCH_SIZE,
+    concurrency: int = QA_BATCH_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """aanswer_questions 의 동기 버전 → 입력 순서대로 결과 목록 (이벤트 루프를 새로 만들어 실행)"""
+
+    async def run() -> List[Dict[str, Any]]:
+        try:
+            return [result async for result in aanswer_questions(questions, llm, batch_size, concurrency)]
+        finally:
+            await get_registry().ashutdown()  # 비동기 클라이언트는 이 이벤트 루프와 함께 닫음
+
+    return sorted(asyncio.run(run()), key=lambda result: result["index"])
@@ -0,0 +1,137 @@
+# source/chains/classification_cache.py
+"""
+보험유형 분류 LLM 응답 캐시
+
+중심 벡터로 확신이 없는 질문은 분류 LLM 을 부르는데, 같은 질문이 띄어쓰기 / 문장부호만 바꿔서 반복해 들어온다.
+정규화한 질문(NFC + 공백 / 문장부호 제거)으로 LLM 응답(첫 줄)을 캐시해서 다시 부르지 않는다.
+
+- LLM 응답만 캐시하고 보험유형 순위는 조회할 때마다 현재 중심 벡터 / 키워드 규칙으로 다시 계산한다
+  → 키워드 표나 중심 벡터가 바뀌어도 캐시를 버릴 필요가 없음
+- 응답은 분류기 버전 (분류 프롬프트 + 실제로 부른 LLM 의 클래스 / 모델 / temperature + 보험유형 목록) 별로 따로 둔다
+  → 다른 모델 (벤치마크의 가짜 LLM 등) 의 응답이 실제 모델의 답으로 쓰이지 않음
+- maxsize 를 넘으면 가장 오래 안 쓴 응답부터 버린다 (메모리 LRU, 지금 안 쓰는 버전의 응답도 결국 밀려남)
+- SQLite 파일에 기록해 두고 시작할 때 최근 사용 순으로 읽는다 (프로세스 재시작 후에도 유지)
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import ALLOWED_INSURANCE_TYPES
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_answers (
+    question TEXT NOT NULL,
+    version TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (question, version)
+)
+"""
+
+
+def classification_key(question: str) -> str:
+    """NFC + 공백 / 문장부호 제거 ("보험금 청구 방법?" 과 "보험금청구 방법" 은 같은 질문)"""
+    text = unicodedata.normalize("NFC", question)
+    return "".join(ch for ch in text if not ch.isspace() and not unicodedata.category(ch).startswith("P"))
+
+
+def llm_identity(llm) -> str:
+    """실제로 부르는 LLM 객체 → "클래스:모델:temperature" (설정값이 아니라 넘겨받은 llm 기준)"""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or ""
+    return f"{type(llm).__name__}:{model}:{getattr(llm, 'temperature', None)}"
+
+
+def classifier_version(prompt: str, llm) -> str:
+    """분류 프롬프트 + LLM 식별자 + 보험유형 목록 → 짧은 해시"""
+    source = "\n".join([prompt, llm_identity(llm), *sorted(ALLOWED_INSURANCE_TYPES)])
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+class ClassificationCache:
+    """
+    (분류기 버전, 정규화한 질문) → 분류 LLM 응답 (첫 줄)
+    여러 스레드에서 동시에 써도 된다 (SQLite 쓰기도 잠금 안에서)
+    """
+
+    def __init__(self, path: Path, maxsize: int):
+        self.path = Path(path)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._load()
+
+    def get(self, question: str, version: str) -> Optional[str]:
+        """캐시된 LLM 응답 (없으면 None, 히트 / 미스를 센다)"""
+        key = (version, classification_key(question))
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._db.execute(
+                "UPDATE llm_answers SET last_used = ? WHERE version = ? AND question = ?", (time.time(), *key)
+            )
+            self.hits += 1
+            return answer
+
+    def contains(self, question: str, version: str) -> bool:
+        """히트 / 미스를 세지 않는 확인 (추측 검색을 보낼지 정할 때)"""
+        with self._lock:
+            return (version, classification_key(question)) in self._entries
+
+    def put(self, question: str, answer: str, version: str):
+        key = (version, classification_key(question))
+        if not key[1] or not answer or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_answers VALUES (?, ?, ?, ?)", (key[1], version, answer, time.time())
+            )
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                (old_version, oldest), _ = self._entries.popitem(last=False)
+                self._db.execute("DELETE FROM llm_answers WHERE version = ? AND question = ?", (old_version, oldest))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._db.execute("DELETE FROM llm_answers")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _load(self):
+        """최근 사용 순으로 maxsize개까지 (넘치는 응답은 파일에서도 지움)"""
+        self._db.execute(
+            "DELETE FROM llm_answers WHERE rowid NOT IN "
+            "(SELECT rowid FROM llm_answers ORDER BY last_used DESC LIMIT ?)",
+            (max(self.maxsize, 0),),
+        )
+        rows = self._db.execute("SELECT version, question, answer FROM llm_answers ORDER BY last_used").fetchall()
+        self._entries.update(((version, question), answer) for version, question, answer in rows)
+        if self._entries:
+            print(f"[classification_cache] 분류 응답 {len(self._entries)}개 불러옴 ({self.path})")
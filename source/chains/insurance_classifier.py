@@ -1,7 +1,27 @@
+import asyncio
+import contextlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 from langchain_core.prompts import PromptTemplate
 
 from llm.llm import get_llm
-from config.settings import ALLOWED_INSURANCE_TYPES
+from config.settings import (
+    ALLOWED_INSURANCE_TYPES,
+    CLASSIFICATION_CACHE_ENABLED,
+    CLASSIFICATION_CACHE_PATH,
+    CLASSIFICATION_CACHE_SIZE,
+    CLASSIFIER_LLM_CONFIDENCE,
+    CLASSIFIER_MARGIN,
+    CLASSIFIER_TEMPERATURE,
+    INSURANCE_CLASSIFIER,
+    TYPE_FILTER_CONFIDENCE,
+    TYPE_FILTER_MAX_TYPES,
+)
+from vectorstore.registry import get_registry
+from chains.classification_cache import ClassificationCache, classifier_version
+from chains.keyword_rules import get_keyword_rules
 
 INSURANCE_CLASSIFY_PROMPT = PromptTemplate.from_template("""
 다음 질문이 어떤 보험유형에 해당하는지 하나만 골라라.
@@ -24,72 +44,268 @@ INSURANCE_CLASSIFY_PROMPT = PromptTemplate.from_template("""
 """)
 
 
-def classify_insurance_type(question: str) -> str:
+TypeRanking = List[Tuple[str, float]]  # [(보험유형, 신뢰도)] 신뢰도 내림차순, 합 1
+
+_cache: Optional[ClassificationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_classification_cache() -> Optional[ClassificationCache]:
+    """프로세스 공용 분류 LLM 응답 캐시 (CLASSIFICATION_CACHE_ENABLED=False 면 None)"""
+    global _cache
+    if not CLASSIFICATION_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ClassificationCache(CLASSIFICATION_CACHE_PATH, CLASSIFICATION_CACHE_SIZE)
+    return _cache
+
+
+def _cache_version(llm) -> str:
+    """실제로 부를 llm 기준 분류기 버전 (다른 모델이 남긴 응답은 쓰지 않음)"""
+    return classifier_version(INSURANCE_CLASSIFY_PROMPT.template, llm)
+
+
+def _raw_classification(response) -> str:
+    return response.content.strip().splitlines()[0] if response.content else ""  # type: ignore
+
+
+def _centroid_scores(vector: Optional[List[float]]) -> Optional[Dict[str, float]]:
+    """
+    질문 벡터 ↔ 보험유형 중심 벡터 점수 (허용된 보험유형만)
+    INSURANCE_CLASSIFIER 가 "centroid" 가 아니거나 벡터 / 중심 벡터 파일이 없으면 None
+    """
+    if INSURANCE_CLASSIFIER != "centroid":
+        return None
+    return _type_centroid_scores(vector)
+
+
+def _type_centroid_scores(vector: Optional[List[float]]) -> Optional[Dict[str, float]]:
+    """INSURANCE_CLASSIFIER 와 상관없이 중심 벡터 점수 (벡터 / 중심 벡터 파일이 없으면 None)"""
+    if vector is None:
+        return None
+    centroids = get_registry().type_centroids
+    if centroids is None:
+        return None
+    scores = centroids.scores([vector])[0]
+    return {t: float(score) for t, score in zip(centroids.types, scores) if t in ALLOWED_INSURANCE_TYPES} or None
+
+
+def _top(scores: Dict[str, float]) -> Tuple[str, float]:
+    """점수 → (1위 보험유형, 1위 - 2위 점수 차)"""
+    ranked = sorted(scores.items(), key=lambda item: -item[1])
+    return ranked[0][0], (ranked[0][1] - ranked[1][1] if len(ranked) > 1 else 1.0)
+
+
+def _confident_type(scores: Optional[Dict[str, float]], margin: float) -> Optional[str]:
+    if scores is None:
+        return None
+    insurance_type, local_margin = _top(scores)
+    if local_margin < margin:
+        return None
+    print(f"[DEBUG] centroid classification: {insurance_type} (margin {local_margin:.3f})")
+    return insurance_type
+
+
+def local_classification(vector: Optional[List[float]]) -> Optional[Tuple[str, float]]:
+    """
+    질문 벡터 ↔ 보험유형 중심 벡터 → (1위 보험유형, 1위 - 2위 점수 차), 중심 벡터 파일이 없으면 None
+    INSURANCE_CLASSIFIER="llm" 이어도 계산한다 (bench_insurance_classifier 로 "centroid" 로 바꿀지 정할 때)
+    """
+    scores = _type_centroid_scores(vector)
+    return None if scores is None else _top(scores)
+
+
+def centroid_classification(vector: Optional[List[float]], margin: float = CLASSIFIER_MARGIN) -> Optional[str]:
+    """중심 벡터 분류를 믿을 만하면 (1·2위 점수 차 >= margin) 그 보험유형, 아니면 None (→ LLM)"""
+    return _confident_type(_centroid_scores(vector), margin)
+
+
+def needs_llm_classification(
+    question: str,
+    vector: Optional[List[float]] = None,
+    margin: float = CLASSIFIER_MARGIN,
+    llm=None,
+    use_cache: bool = True,
+) -> bool:
+    """rank_insurance_types 가 LLM 을 부를지 (중심 벡터로 확신이 없고 캐시된 응답도 없음) → 체인이 그동안 추측 검색을 보낸다"""
     if not question or not question.strip():
-        return "질병보험"  # 기본값 반환
-    
-    llm = get_llm()
+        return False
+    scores = _centroid_scores(vector)
+    if scores is not None and _top(scores)[1] >= margin:
+        return False
+    cache = get_classification_cache() if use_cache else None
+    return cache is None or not cache.contains(question, _cache_version(llm or get_llm()))
+
+
+def _softmax(scores: Dict[str, float]) -> Dict[str, float]:
+    """중심 벡터 점수 → 신뢰도 (CLASSIFIER_TEMPERATURE 가 작을수록 1위에 몰림)"""
+    values = np.array(list(scores.values()))
+    weights = np.exp((values - values.max()) / CLASSIFIER_TEMPERATURE)
+    return dict(zip(scores, (weights / weights.sum()).tolist()))
+
+
+def _with_pick(pick: Dict[str, float], prior: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """LLM / 키워드 규칙 신뢰도(합 1)에 CLASSIFIER_LLM_CONFIDENCE, 나머지는 중심 벡터 신뢰도대로 (없으면 pick 그대로)"""
+    if prior is None:
+        return pick
+    return {
+        t: CLASSIFIER_LLM_CONFIDENCE * pick.get(t, 0.0) + (1 - CLASSIFIER_LLM_CONFIDENCE) * prior.get(t, 0.0)
+        for t in {**pick, **prior}
+    }
+
+
+def _ranking(confidences: Dict[str, float]) -> TypeRanking:
+    return sorted(confidences.items(), key=lambda item: -item[1])
+
+
+def _rank_with_answer(question: str, raw: str, prior: Optional[Dict[str, float]]) -> Tuple[TypeRanking, str]:
+    """LLM 분류 결과(첫 줄) + 키워드 규칙 + 중심 벡터 신뢰도 → (보험유형 순위, 분류 방법)"""
+    print(f"[DEBUG] raw classification: {raw}")
+
+    # 1️⃣ LLM이 목록 안의 보험유형을 고른 경우
+    if raw in ALLOWED_INSURANCE_TYPES:
+        return _ranking(_with_pick({raw: 1.0}, prior)), "llm"
+
+    # 2️⃣ 키워드 규칙 (config/insurance_keywords.json, 점수 비율 = 신뢰도)
+    rules = get_keyword_rules()
+    keyword_scores = {t: score for t, score in rules.scores(question) if score > 0}
+    print(f"[DEBUG] keyword scores: {list(keyword_scores.items())}")
+    if keyword_scores:
+        total = sum(keyword_scores.values())
+        return _ranking(_with_pick({t: score / total for t, score in keyword_scores.items()}, prior)), "keyword"
+
+    # 3️⃣ 근거 없음 → 중심 벡터 신뢰도, 그것도 없으면 균등 (기본값이 1위) → 검색은 필터 없이
+    if prior is not None:
+        return _ranking(prior), "default"
+    others = sorted(ALLOWED_INSURANCE_TYPES - {rules.default})
+    uniform = 1.0 / (len(others) + 1)
+    return [(t, uniform) for t in [rules.default, *others]], "default"
+
+
+def rank_insurance_types(
+    question: str,
+    llm=None,
+    vector: Optional[List[float]] = None,
+    margin: float = CLASSIFIER_MARGIN,
+    use_cache: bool = True,
+) -> Tuple[TypeRanking, str]:
+    """
+    질문 → ([(보험유형, 신뢰도)] 신뢰도 내림차순 (합 1), 분류 방법 "centroid" / "cache" / "llm" / "keyword" / "default")
+    - vector(질문 임베딩)의 중심 벡터 1·2위 점수 차가 margin 이상: 중심 벡터 점수의 softmax (LLM 호출 없음)
+    - 아니면 LLM 호출: 고른 보험유형에 CLASSIFIER_LLM_CONFIDENCE, 나머지는 중심 벡터 신뢰도대로
+      (LLM 답이 목록 밖이면 키워드 규칙 점수 비율로)
+    - 같은 llm 이 같은 질문(정규화 후)에 낸 응답이 분류 캐시에 있으면 LLM 호출 없이 그 응답으로 ("cache", use_cache=False 면 안 봄)
+    1위 보험유형 = classify_insurance_type 결과, 검색 필터는 filter_types(순위)
+    """
+    if not question or not question.strip():
+        return [("질병보험", 1.0)], "default"  # 기본값 반환
+
+    scores = _centroid_scores(vector)
+    prior = _softmax(scores) if scores else None
+    if _confident_type(scores, margin) is not None:
+        return _ranking(prior), "centroid"  # type: ignore[arg-type]
+
+    llm = llm or get_llm()
+    cache = get_classification_cache() if use_cache else None
+    version = _cache_version(llm) if cache is not None else ""
+    raw = cache.get(question, version) if cache is not None else None
+    if raw is not None:
+        return _rank_with_answer(question, raw, prior)[0], "cache"
+
     try:
         response = llm.invoke(
             INSURANCE_CLASSIFY_PROMPT.format(question=question)
         )
-        raw = response.content.strip().splitlines()[0] if response.content else ""  # type: ignore
+        raw = _raw_classification(response)
+        if cache is not None:
+            cache.put(question, raw, version)
     except Exception as e:
         print(f"[WARN] LLM classification failed: {e}")
         raw = ""
-    
-    print(f"[DEBUG] raw classification: {raw}")
 
-    q = question.replace(" ", "")
+    return _rank_with_answer(question, raw, prior)
 
-    # 1️⃣ LLM이 정확히 맞춘 경우
-    if raw in ALLOWED_INSURANCE_TYPES:
-        return raw
-
-    # 2️⃣ 사고 / 상해
-    if any(k in q for k in [
-        "사고", "다쳤", "부상", "골절", "상해", "넘어", "충돌", "추락"
-    ]):
-        return "상해보험"
-
-    # 3️⃣ 질병 / 진단 / 의료
-    if any(k in q for k in [
-        "질병", "진단", "암", "뇌출혈", "뇌경색",
-        "입원", "수술", "치료", "병원", "의사"
-    ]):
-        return "질병보험"
-
-    # 4️⃣ 자동차
-    if any(k in q for k in [
-        "자동차", "차량", "교통사고", "운전", "추돌", "렌트카"
-    ]):
-        return "자동차보험"
-
-    # 5️⃣ 화재
-    if any(k in q for k in [
-        "화재", "불", "전소", "연기", "폭발", "누전"
-    ]):
-        return "화재보험"
-
-    # 6️⃣ 책임보험 (손해배상 성격)
-    if any(k in q for k in [
-        "배상", "손해배상", "책임", "과실", "법적책임", "배상책임"
-    ]):
-        return "책임보험"
-
-    # 7️⃣ 손해보험 (재산 피해)
-    if any(k in q for k in [
-        "도난", "침수", "파손", "망가", "훼손",
-        "재산", "시설", "기계", "건물", "누수"
-    ]):
-        return "손해보험"
-
-    # 8️⃣ 연금보험
-    if any(k in q for k in [
-        "연금", "노후", "은퇴", "퇴직", "연금수령",
-        "연금개시", "연금액", "노령"
-    ]):
-        return "연금보험"
-
-    # 9️⃣ 최후 기본값 (가장 많이 쓰이는 영역)
-    return "질병보험"
\ No newline at end of file
+
+async def arank_insurance_types(
+    question: str,
+    llm=None,
+    vector: Optional[List[float]] = None,
+    margin: float = CLASSIFIER_MARGIN,
+    llm_semaphore: Optional[asyncio.Semaphore] = None,
+    use_cache: bool = True,
+) -> Tuple[TypeRanking, str]:
+    """
+    rank_insurance_types 의 비동기 버전 (LLM 호출을 await, 규칙은 같음)
+    llm_semaphore: LLM 을 부를 때만 잡는 동시 호출 제한 (일괄 QA)
+    """
+    if not question or not question.strip():
+        return [("질병보험", 1.0)], "default"  # 기본값 반환
+
+    scores = _centroid_scores(vector)
+    prior = _softmax(scores) if scores else None
+    if _confident_type(scores, margin) is not None:
+        return _ranking(prior), "centroid"  # type: ignore[arg-type]
+
+    llm = llm or get_llm()
+    cache = get_classification_cache() if use_cache else None
+    version = _cache_version(llm) if cache is not None else ""
+    raw = cache.get(question, version) if cache is not None else None
+    if raw is not None:
+        return _rank_with_answer(question, raw, prior)[0], "cache"
+
+    try:
+        async with llm_semaphore or contextlib.nullcontext():
+            response = await llm.ainvoke(
+                INSURANCE_CLASSIFY_PROMPT.format(question=question)
+            )
+        raw = _raw_classification(response)
+        if cache is not None:
+            cache.put(question, raw, version)
+    except Exception as e:
+        print(f"[WARN] LLM classification failed: {e}")
+        raw = ""
+
+    return _rank_with_answer(question, raw, prior)
+
+
+def filter_types(
+    ranking: TypeRanking,
+    confidence: float = TYPE_FILTER_CONFIDENCE,
+    max_types: int = TYPE_FILTER_MAX_TYPES,
+) -> Optional[List[str]]:
+    """
+    보험유형 순위 → 검색 필터에 넣을 보험유형 (신뢰도 순으로 누적 confidence 이상이 될 때까지)
+    max_types 개로도 안 되면 (신뢰도가 고르게 퍼짐) None → 필터 없이 전체 검색
+    """
+    picked, total = [], 0.0
+    for insurance_type, value in ranking[:max_types]:
+        picked.append(insurance_type)
+        total += value
+        if total >= confidence - 1e-9:
+            return picked
+    return None
+
+
+def classify_insurance_type_with_method(
+    question: str, llm=None, vector: Optional[List[float]] = None, margin: float = CLASSIFIER_MARGIN
+) -> Tuple[str, str]:
+    """→ (1위 보험유형, 분류 방법)"""
+    ranking, method = rank_insurance_types(question, llm, vector, margin)
+    return ranking[0][0], method
+
+
+async def aclassify_insurance_type_with_method(
+    question: str, llm=None, vector: Optional[List[float]] = None, margin: float = CLASSIFIER_MARGIN
+) -> Tuple[str, str]:
+    ranking, method = await arank_insurance_types(question, llm, vector, margin)
+    return ranking[0][0], method
+
+
+def classify_insurance_type(question: str, llm=None, vector: Optional[List[float]] = None) -> str:
+    return classify_insurance_type_with_method(question, llm, vector)[0]
+
+
+async def aclassify_insurance_type(question: str, llm=None, vector: Optional[List[float]] = None) -> str:
+    return (await aclassify_insurance_type_with_method(question, llm, vector))[0]
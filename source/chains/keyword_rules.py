@@ -0,0 +1,77 @@
+# source/chains/keyword_rules.py
+"""
+보험유형 키워드 규칙 (LLM 분류가 목록 밖의 답을 줄 때의 fallback)
+
+키워드 표는 config/insurance_keywords.json: {"default": 보험유형, "types": {보험유형: {키워드: 가중치}}}
+- 모든 키워드를 정규식 하나(긴 키워드 우선 alternation)로 묶어 질문을 한 번만 훑는다
+- 보험유형 점수 = 질문에 나온 키워드(같은 키워드는 한 번)의 가중치 합 → 모든 보험유형의 순위를 돌려준다
+- 긴 키워드가 먼저 잡히므로 "교통사고" 는 "사고" 로 다시 세지 않는다
+- 점수가 같으면 표에 먼저 나온 보험유형, 모두 0점이면 default
+"""
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import ALLOWED_INSURANCE_TYPES, CLASSIFIER_KEYWORDS_PATH
+
+
+class KeywordRules:
+    def __init__(self, tables: Dict[str, Dict[str, float]], default: str):
+        unknown = (set(tables) | {default}) - ALLOWED_INSURANCE_TYPES
+        if unknown:
+            raise ValueError(f"허용되지 않은 보험유형: {sorted(unknown)}")
+        self.types: List[str] = list(tables)  # 표 순서 = 동점일 때 우선순위
+        self.default = default
+        # 키워드 → [(보험유형 번호, 가중치)] (같은 키워드가 여러 보험유형에 있을 수 있음)
+        self._weights: Dict[str, List[Tuple[int, float]]] = {}
+        for i, insurance_type in enumerate(self.types):
+            for keyword, weight in tables[insurance_type].items():
+                self._weights.setdefault(_normalize(keyword), []).append((i, float(weight)))
+        keywords = sorted((k for k in self._weights if k), key=len, reverse=True)
+        self._pattern = re.compile("|".join(map(re.escape, keywords))) if keywords else None
+
+    @classmethod
+    def from_file(cls, path: Path) -> "KeywordRules":
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config["types"], config["default"])
+
+    def matches(self, question: str) -> List[str]:
+        """질문에 나온 키워드 (나온 순서, 중복 없이)"""
+        if self._pattern is None:
+            return []
+        return list(dict.fromkeys(m.group() for m in self._pattern.finditer(_normalize(question))))
+
+    def scores(self, question: str) -> List[Tuple[str, float]]:
+        """모든 보험유형의 (보험유형, 점수) → 점수 내림차순 (동점이면 표 순서)"""
+        totals = [0.0] * len(self.types)
+        for keyword in self.matches(question):
+            for i, weight in self._weights[keyword]:
+                totals[i] += weight
+        order = sorted(range(len(self.types)), key=lambda i: (-totals[i], i))
+        return [(self.types[i], totals[i]) for i in order]
+
+    def classify(self, question: str) -> str:
+        """가장 점수가 높은 보험유형 (키워드가 하나도 없으면 default)"""
+        insurance_type, score = self.scores(question)[0] if self.types else (self.default, 0.0)
+        return insurance_type if score > 0 else self.default
+
+
+def _normalize(text: str) -> str:
+    return text.replace(" ", "")
+
+
+_rules: Optional[KeywordRules] = None
+_rules_lock = threading.Lock()
+
+
+def get_keyword_rules() -> KeywordRules:
+    """프로세스 공용 키워드 규칙 (CLASSIFIER_KEYWORDS_PATH, 처음 쓸 때 한 번 읽음)"""
+    global _rules
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                _rules = KeywordRules.from_file(CLASSIFIER_KEYWORDS_PATH)
+    return _rules
@@ -1,111 +1,155 @@
 # source/chains/qa_chain.py
+import asyncio
 from typing import Dict, Any, Optional
 from langchain_core.runnables import RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
 
+from config.settings import ANSWER_CACHE_ENABLED, CLASSIFICATION_CACHE_ENABLED, SPECULATIVE_RETRIEVAL
 from llm.llm import get_llm
-from llm.prompt import INSURANCE_PROMPT
-from vectorstore.retriever import get_retriever
-from chains.insurance_classifier import classify_insurance_type
-from chains.utils import format_insurance_docs
-
-
-def get_qa_chain() -> RunnableLambda:
-    llm = get_llm()
+from vectorstore.async_retriever import aexpand_parent_clauses, asearch_after_speculation, aspeculative_search
+from vectorstore.retriever import (
+    count_documents,
+    embed_question,
+    expand_parent_clauses,
+    search_after_speculation,
+    submit_speculative_search,
+)
+from chains.answer_cache import get_answer_cache
+from chains.insurance_classifier import arank_insurance_types, filter_types, needs_llm_classification, rank_insurance_types
+from chains.utils import build_answer_prompt, log_answer_cache_hit, log_filter_miss, log_type_ranking, select_final_docs
+
+
+def get_qa_chain(
+    llm=None,
+    use_answer_cache: bool = ANSWER_CACHE_ENABLED,
+    speculative: bool = SPECULATIVE_RETRIEVAL,
+    use_classification_cache: bool = CLASSIFICATION_CACHE_ENABLED,
+) -> RunnableLambda:
+    """
+    QA 체인: invoke 는 동기, ainvoke 는 비동기 경로 (AsyncQdrantClient + llm.ainvoke)
+    두 경로는 같은 단계 함수를 쓰고 Qdrant / LLM 호출만 다르다 → 결과가 같다
+    use_answer_cache: 같은 / 비슷한 질문의 답변 재사용 (chains.answer_cache, 히트면 결과에 "answer_cache" 추가)
+    speculative: 분류에 LLM 이 필요한 질문은 LLM 을 기다리는 동안 필터 없는 검색을 먼저 보낸다 (추측 검색)
+    use_classification_cache: 같은 질문의 분류 LLM 응답 재사용 (chains.classification_cache, 벤치마크처럼 반복 질문은 끔)
+    """
+    llm = llm or get_llm()
+    answer_cache = get_answer_cache(llm) if use_answer_cache else None
+
+    def cached_answer(question: str, vector=None, insurance_type=None):
+        """정확 일치 (vector 없이) 또는 의미 일치 답변 → 결과 dict, 없으면 None"""
+        if answer_cache is None:
+            return None
+        cached = answer_cache.get_exact(question) if vector is None else answer_cache.get_similar(vector, insurance_type)
+        if cached is None:
+            return None
+        log_answer_cache_hit(cached)
+        return {**cached, "question": question}
+
+    async def acached_answer(question: str, vector=None, insurance_type=None):
+        """cached_answer 를 스레드에서 (SQLite 가 이벤트 루프를 막지 않게)"""
+        if answer_cache is None:
+            return None
+        return await asyncio.to_thread(cached_answer, question, vector, insurance_type)
 
     def retrieve_with_classification(inputs: Dict[str, Any]) -> Dict[str, Any]:
         question = inputs.get("question", "")
-        insurance_type = classify_insurance_type(question)
-        print(f"\n[STEP 1] 분류된 보험유형: {insurance_type}")
-
-        # 보험유형 필터 검색
-        print(f"[STEP 2] '{insurance_type}' 필터로 검색 시도...")
-        retriever = get_retriever(insurance_type)
-        docs = retriever.invoke(question)
+        cached = cached_answer(question)
+        if cached is not None:
+            return cached
+        # 질문 임베딩은 한 번만 (보험유형 분류 / 필터 / 디버깅 / fallback 검색이 같은 벡터를 씀)
+        question_vector, cache_hit = embed_question(question)
+        print(f"\n[STEP 1] 질문 벡터 캐시 {'히트' if cache_hit else '미스'}")
+        # 분류에 LLM 이 필요하면 응답을 기다리는 동안 필터 없는 후보 검색 (보험유형이 정해지면 로컬에서 거름)
+        speculation = (
+            submit_speculative_search(question_vector)
+            if speculative
+            and needs_llm_classification(question, question_vector, llm=llm, use_cache=use_classification_cache)
+            else None
+        )
+        # 중심 벡터로 확신이 있으면 LLM 호출 없이 분류 → 보험유형 순위 + 신뢰도
+        ranking, _ = rank_insurance_types(question, llm, question_vector, use_cache=use_classification_cache)
+        insurance_type = ranking[0][0]
+        print(f"[STEP 1] 분류된 보험유형: {insurance_type}")
+
+        # 누적 신뢰도가 TYPE_FILTER_CONFIDENCE 를 넘는 상위 보험유형들로 필터 검색 (MatchAny 한 번)
+        search_types = filter_types(ranking)
+        log_type_ranking(ranking, search_types)
+        cached = cached_answer(question, question_vector, insurance_type)
+        if cached is not None:
+            if speculation is not None:
+                speculation.cancel()
+            return cached
+        # 필터 검색과 필터 없는 검색을 한 번에 (RETRIEVAL_BATCH_FALLBACK) → fallback 해도 추가 왕복 없음
+        # 추측 검색이 있으면 그 후보를 거르고, 모자랄 때만 필터 검색을 보냄
+        docs, unfiltered_docs, _ = search_after_speculation(speculation, question_vector, search_types, question)
         print(f"[STEP 2 결과] 필터 검색 결과: {len(docs)}개 문서 발견")
         
         # 디버깅: 실제 저장된 insurance_type 값 확인
-        if not docs:
-            print(f"[디버깅] 필터 검색 실패 - 실제 DB에 저장된 insurance_type 값 확인 중...")
-            debug_retriever = get_retriever(None)  # 필터 없이 전체 검색
-            debug_docs = debug_retriever.invoke(question)
-            if debug_docs:
-                unique_types = set(doc.metadata.get("insurance_type") for doc in debug_docs[:20])
-                print(f"[디버깅] 전체 검색 상위 20개 문서의 insurance_type 값들: {unique_types}")
-                print(f"[디버깅] 찾고 있는 값: '{insurance_type}' (repr: {repr(insurance_type)})")
-                print(f"[디버깅] 값 일치 여부: {insurance_type in unique_types}")
-                
-                # 각 insurance_type별로 실제 몇 개가 있는지 확인
-                from qdrant_client import QdrantClient
-                from qdrant_client.http import models
-                from config.settings import QDRANT_HOST, QDRANT_PORT, COLLECTION_NAME
-                
-                try:
-                    debug_client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
-                    filter_condition = models.Filter(
-                        must=[
-                            models.FieldCondition(
-                                key="metadata.insurance_type",  # 수정: metadata. 경로 추가
-                                match=models.MatchValue(value=insurance_type),
-                            )
-                        ]
-                    )
-                    # count를 사용하여 필터 조건에 맞는 포인트 개수만 확인
-                    result = debug_client.count(
-                        collection_name=COLLECTION_NAME,
-                        count_filter=filter_condition
-                    )
-                    print(f"[디버깅] Qdrant count API로 확인한 '{insurance_type}' 문서 수: {result.count:,}개")
-                except Exception as e:
-                    print(f"[디버깅] Qdrant count 확인 실패: {e}")
+        if not docs and unfiltered_docs:
+            log_filter_miss(search_types, unfiltered_docs, count_documents)
 
         # fallback 검색
-        if not docs:
-            print(f"[STEP 3] 필터 검색 결과가 0개 → 필터 없이 전체 검색으로 fallback")
-            retriever = get_retriever(None)  # None = 필터 없음
-            docs = retriever.invoke(question)
-            print(f"[STEP 3 결과] 전체 검색 결과: {len(docs)}개 문서 발견")
-        else:
-            print(f"[STEP 3] 건너뜀 (이미 {len(docs)}개 문서 찾음)")
+        docs, _ = select_final_docs(docs, unfiltered_docs)
 
-        print(f"[최종 결과] 총 {len(docs)}개 문서를 사용합니다\n")
+        # 긴 조항의 조각으로 검색된 문서 → 원래 조항 전체로 복원
+        docs = expand_parent_clauses(docs)
 
-        # format context
-        context = format_insurance_docs(docs)
-        first_doc = docs[0] if docs else None
-        md = first_doc.metadata if first_doc else {}
+        print(f"[최종 결과] 총 {len(docs)}개 문서를 사용합니다\n")
 
-        # 메타데이터 추출
-        insurance_type_from_doc = md.get("insurance_type", insurance_type)
-        level_1 = md.get("level_1", "")
-        level_2 = md.get("level_2", "")
-        level_3 = md.get("level_3", "")
-        level_4 = md.get("level_4", "")
+        # format context + 메타데이터 추출
+        prompt_text, result = build_answer_prompt(question, insurance_type, docs)
 
         # LLM 호출
-        answer = llm.invoke(INSURANCE_PROMPT.format(
-            question=question,
-            context=context,
-            insurance_type=insurance_type_from_doc,
-            level_1=level_1,
-            level_2=level_2,
-            level_3=level_3,
-            level_4=level_4
-        )).content
-
-        return {
-            "answer": answer,
-            "question": question,
-            "insurance_type": insurance_type_from_doc,
-            "level_1": level_1,
-            "level_2": level_2,
-            "level_3": level_3,
-            "level_4": level_4,
-            "context": context,
-            "docs": docs,  # Streamlit 참고용
-        }
-
-    chain = RunnableLambda(retrieve_with_classification)
+        answer = llm.invoke(prompt_text).content
+        result = {"answer": answer, **result, "search_types": search_types}
+        if answer_cache is not None:
+            answer_cache.put(question, question_vector, insurance_type, result)
+        return result
+
+    async def aretrieve_with_classification(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        question = inputs.get("question", "")
+        cached = await acached_answer(question)
+        if cached is not None:
+            return cached
+        # 임베딩 모델은 CPU 연산 → 이벤트 루프를 막지 않게 스레드에서
+        question_vector, cache_hit = await asyncio.to_thread(embed_question, question)
+        print(f"\n[STEP 1] 질문 벡터 캐시 {'히트' if cache_hit else '미스'}")
+        speculation = (
+            asyncio.create_task(aspeculative_search(question_vector))
+            if speculative
+            and needs_llm_classification(question, question_vector, llm=llm, use_cache=use_classification_cache)
+            else None
+        )
+        ranking, _ = await arank_insurance_types(question, llm, question_vector, use_cache=use_classification_cache)
+        insurance_type = ranking[0][0]
+        print(f"[STEP 1] 분류된 보험유형: {insurance_type}")
+
+        search_types = filter_types(ranking)
+        log_type_ranking(ranking, search_types)
+        cached = await acached_answer(question, question_vector, insurance_type)
+        if cached is not None:
+            if speculation is not None:
+                speculation.cancel()
+            return cached
+        docs, unfiltered_docs, _ = await asearch_after_speculation(speculation, question_vector, search_types, question)
+        print(f"[STEP 2 결과] 필터 검색 결과: {len(docs)}개 문서 발견")
+
+        if not docs and unfiltered_docs:
+            await asyncio.to_thread(log_filter_miss, search_types, unfiltered_docs, count_documents)
+
+        docs, _ = select_final_docs(docs, unfiltered_docs)
+        docs = await aexpand_parent_clauses(docs)
+
+        print(f"[최종 결과] 총 {len(docs)}개 문서를 사용합니다\n")
+
+        prompt_text, result = build_answer_prompt(question, insurance_type, docs)
+        answer = (await llm.ainvoke(prompt_text)).content
+        result = {"answer": answer, **result, "search_types": search_types}
+        if answer_cache is not None:
+            await asyncio.to_thread(answer_cache.put, question, question_vector, insurance_type, result)
+        return result
+
+    chain = RunnableLambda(retrieve_with_classification, afunc=aretrieve_with_classification)
     
     return chain
 
@@ -1,154 +1,267 @@
 """
 메트릭 수집 기능이 통합된 QA Chain
 기존 qa_chain.py를 기반으로 메트릭 수집 기능 추가
+invoke 는 동기, ainvoke 는 비동기 경로 (AsyncQdrantClient + llm.ainvoke, 요청마다 수집기가 따로라 동시 실행 가능)
 """
+import asyncio
 from typing import Dict, Any, Optional
 from langchain_core.runnables import RunnableLambda
 
+from config.settings import ANSWER_CACHE_ENABLED, CLASSIFICATION_CACHE_ENABLED, SPECULATIVE_RETRIEVAL
 from llm.llm import get_llm
-from llm.prompt import INSURANCE_PROMPT
-from vectorstore.retriever import get_retriever
-from chains.insurance_classifier import classify_insurance_type
-from chains.utils import format_insurance_docs
+from vectorstore.async_retriever import aexpand_parent_clauses, asearch_after_speculation, aspeculative_search
+from vectorstore.registry import get_registry
+from vectorstore.retriever import (
+    embed_question,
+    expand_parent_clauses,
+    search_after_speculation,
+    submit_speculative_search,
+)
+from chains.answer_cache import get_answer_cache
+from chains.insurance_classifier import (
+    arank_insurance_types,
+    filter_types,
+    get_classification_cache,
+    needs_llm_classification,
+    rank_insurance_types,
+)
+from chains.utils import build_answer_prompt, log_answer_cache_hit, log_type_ranking, select_final_docs
 from evaluation.metrics import MetricsCollector
 
 
-def get_qa_chain_with_metrics(enable_metrics: bool = True) -> RunnableLambda:
+def get_qa_chain_with_metrics(
+    enable_metrics: bool = True,
+    llm=None,
+    use_answer_cache: bool = ANSWER_CACHE_ENABLED,
+    speculative: bool = SPECULATIVE_RETRIEVAL,
+    use_classification_cache: bool = CLASSIFICATION_CACHE_ENABLED,
+) -> RunnableLambda:
     """
     메트릭 수집 기능이 통합된 QA Chain
     
     Args:
         enable_metrics: 메트릭 수집 활성화 여부
+        llm: 답변 / 분류에 쓸 채팅 모델 (없으면 get_llm())
+        use_answer_cache: 같은 / 비슷한 질문의 답변 재사용 (chains.answer_cache)
+        speculative: 분류 LLM 을 기다리는 동안 필터 없는 검색을 먼저 보냄 (추측 검색, retrieval_time 은 분류 이후 남은 검색 시간)
+        use_classification_cache: 같은 질문의 분류 LLM 응답 재사용 (chains.classification_cache)
         
     Returns:
         QA Chain with metrics in result dict
     """
-    llm = get_llm()
+    llm = llm or get_llm()
+    answer_cache = get_answer_cache(llm) if use_answer_cache else None
 
-    def retrieve_with_classification(inputs: Dict[str, Any]) -> Dict[str, Any]:
-        question = inputs.get("question", "")
-        enable_eval = inputs.get("enable_metrics", enable_metrics)
-        
-        # 메트릭 수집기 초기화
-        collector = MetricsCollector() if enable_eval else None
-        
-        # total_time은 실제 사용자 체감 시간과 다를 수 있으므로
-        # Streamlit 레벨에서 측정하는 것이 더 정확함
-        # 여기서는 내부 처리 시간만 측정
+    def finish_metrics(collector: Optional[MetricsCollector], result: Dict[str, Any]) -> Dict[str, Any]:
         if collector:
-            collector.start_timer("classification")
-        
-        # STEP 1: 보험유형 분류
-        insurance_type = classify_insurance_type(question)
-        
+            # total_time 계산 (내부 처리 시간 합산)
+            collector.metrics["total_time"] = (
+                collector.metrics.get("classification_time", 0) +
+                collector.metrics.get("retrieval_time", 0) +
+                collector.metrics.get("generation_time", 0)
+            )
+            result["metrics"] = collector.get_metrics()
+        return result
+
+    def lookup_answer(question: str, vector=None, insurance_type=None):
+        """답변 캐시 조회 (정확 일치: vector 없이 / 의미 일치), 없으면 None"""
+        if answer_cache is None:
+            return None
+        return answer_cache.get_exact(question) if vector is None else answer_cache.get_similar(vector, insurance_type)
+
+    async def alookup_answer(question: str, vector=None, insurance_type=None):
+        """lookup_answer 를 스레드에서 (SQLite 가 이벤트 루프를 막지 않게)"""
+        if answer_cache is None:
+            return None
+        return await asyncio.to_thread(lookup_answer, question, vector, insurance_type)
+
+    def cached_answer(collector: Optional[MetricsCollector], question: str, cached):
+        """답변 캐시 히트면 결과 dict (진행 중이던 단계 마감 + 메트릭), 아니면 None"""
+        if cached is None:
+            return None
+        log_answer_cache_hit(cached)
+        if collector:
+            for stage in list(collector.start_times):  # 진행 중이던 단계 (분류 / 검색) 마감
+                collector.end_timer(stage)
+            collector.record_answer_cache(cached["answer_cache"])
+        return finish_metrics(collector, {**cached, "question": question})
+
+    def after_embedding(collector: Optional[MetricsCollector], cache_hit: bool):
+        if collector:
+            collector.end_timer("query_embedding")
+            collector.record_query_cache(cache_hit, get_registry().query_cache.stats())
+
+    def after_classification(collector: Optional[MetricsCollector], question: str, ranking, method: str):
+        """보험유형 순위 → (1위 보험유형, 검색 필터 보험유형 목록 또는 None)"""
+        insurance_type = ranking[0][0]
+        search_types = filter_types(ranking)
         if collector:
             collector.end_timer("classification")
-            # 분류 응답 토큰 추정 (실제로는 LLM 호출 결과 필요하지만 추정)
-            collector.record_classification_tokens(question, insurance_type)
+            collector.record_classification(method, ranking, search_types)
+            classification_cache = get_classification_cache() if use_classification_cache else None
+            if classification_cache is not None:
+                collector.record_classification_cache(classification_cache.stats())
+            if method not in ("centroid", "cache") and question.strip():  # 분류 LLM 을 부른 경우 (keyword / default 도 LLM 답이 목록 밖)
+                # 분류 응답 토큰 추정 (실제로는 LLM 호출 결과 필요하지만 추정)
+                collector.record_classification_tokens(question, insurance_type)
             collector.record_search_stats(0, False, False, insurance_type)
         
-        print(f"\n[STEP 1] 분류된 보험유형: {insurance_type}")
+        print(f"\n[STEP 1] 분류된 보험유형: {insurance_type} ({method})")
 
-        # STEP 2: 보험유형 필터 검색
-        print(f"[STEP 2] '{insurance_type}' 필터로 검색 시도...")
+        # STEP 2: 누적 신뢰도가 TYPE_FILTER_CONFIDENCE 를 넘는 상위 보험유형들로 필터 검색 (MatchAny 한 번)
+        log_type_ranking(ranking, search_types)
         
         if collector:
             collector.start_timer("retrieval")
-        
-        retriever = get_retriever(insurance_type)
-        docs = retriever.invoke(question)
-        
+        return insurance_type, search_types
+
+    def after_retrieval(collector: Optional[MetricsCollector], docs, unfiltered_docs, speculation_status=None):
         if collector:
             collector.end_timer("retrieval")
+            collector.record_speculative_retrieval(speculation_status)
         
         print(f"[STEP 2 결과] 필터 검색 결과: {len(docs)}개 문서 발견")
 
         # STEP 3: Fallback 검색
-        fallback_activated = False
-        if not docs:
-            print(f"[STEP 3] 필터 검색 결과가 0개 → 필터 없이 전체 검색으로 fallback")
-            fallback_activated = True
-            
-            if collector:
-                collector.start_timer("retrieval")
-            
-            retriever = get_retriever(None)
-            docs = retriever.invoke(question)
-            
-            if collector:
-                collector.end_timer("retrieval")
-            
-            print(f"[STEP 3 결과] 전체 검색 결과: {len(docs)}개 문서 발견")
-        else:
-            print(f"[STEP 3] 건너뜀 (이미 {len(docs)}개 문서 찾음)")
+        return select_final_docs(docs, unfiltered_docs)
 
+    def before_generation(
+        collector: Optional[MetricsCollector],
+        question: str,
+        insurance_type: str,
+        search_types,
+        docs,
+        fallback_activated: bool,
+    ):
         print(f"[최종 결과] 총 {len(docs)}개 문서를 사용합니다\n")
 
         # 메트릭 기록
         if collector:
             collector.record_search_stats(
                 len(docs),
-                insurance_type is not None,
+                search_types is not None,
                 fallback_activated,
                 insurance_type
             )
 
-        # STEP 4: 컨텍스트 포맷팅
-        context = format_insurance_docs(docs)
-        first_doc = docs[0] if docs else None
-        md = first_doc.metadata if first_doc else {}
-
-        # 메타데이터 추출
-        insurance_type_from_doc = md.get("insurance_type", insurance_type)
-        level_1 = md.get("level_1", "")
-        level_2 = md.get("level_2", "")
-        level_3 = md.get("level_3", "")
-        level_4 = md.get("level_4", "")
+        # STEP 4: 컨텍스트 포맷팅 + 메타데이터 추출
+        prompt_text, result = build_answer_prompt(question, insurance_type, docs)
+        result["search_types"] = search_types
 
         # STEP 5: LLM 답변 생성
         if collector:
             collector.start_timer("generation")
-        
-        prompt_text = INSURANCE_PROMPT.format(
-            question=question,
-            context=context,
-            insurance_type=insurance_type_from_doc,
-            level_1=level_1,
-            level_2=level_2,
-            level_3=level_3,
-            level_4=level_4
-        )
-        
-        answer = llm.invoke(prompt_text).content
-        
+        return prompt_text, result
+
+    def after_generation(
+        collector: Optional[MetricsCollector],
+        prompt_text: str,
+        answer,
+        result: Dict[str, Any],
+    ) -> Dict[str, Any]:
         if collector:
             collector.end_timer("generation")
             collector.record_generation_tokens(prompt_text, str(answer))
-            # total_time 계산 (내부 처리 시간 합산)
-            collector.metrics["total_time"] = (
-                collector.metrics.get("classification_time", 0) +
-                collector.metrics.get("retrieval_time", 0) +
-                collector.metrics.get("generation_time", 0)
-            )
 
-        result = {
-            "answer": answer,
-            "question": question,
-            "insurance_type": insurance_type_from_doc,
-            "level_1": level_1,
-            "level_2": level_2,
-            "level_3": level_3,
-            "level_4": level_4,
-            "context": context,
-            "docs": docs,
-        }
+        result = {"answer": answer, **result}
         
         # 메트릭 추가
+        return finish_metrics(collector, result)
+
+    def start(inputs: Dict[str, Any]):
+        question = inputs.get("question", "")
+        enable_eval = inputs.get("enable_metrics", enable_metrics)
+        
+        # 메트릭 수집기 초기화
+        collector = MetricsCollector() if enable_eval else None
+        
+        # total_time은 실제 사용자 체감 시간과 다를 수 있으므로
+        # Streamlit 레벨에서 측정하는 것이 더 정확함
+        # 여기서는 내부 처리 시간만 측정
+        # 분류 시간에는 질문 임베딩이 들어간다 (중심 벡터 분류가 질문 벡터를 씀)
         if collector:
-            result["metrics"] = collector.get_metrics()
+            collector.start_timer("classification")
+            collector.start_timer("query_embedding")
+        return question, collector
+
+    def retrieve_with_classification(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        question, collector = start(inputs)
+        cached = cached_answer(collector, question, lookup_answer(question))
+        if cached is not None:
+            return cached
         
+        # 질문 임베딩은 한 번만 (보험유형 분류 / 필터 검색 / fallback 검색이 같은 벡터를 씀)
+        question_vector, cache_hit = embed_question(question)
+        after_embedding(collector, cache_hit)
+
+        # LLM 분류를 기다리는 동안 필터 없는 후보 검색 (추측 검색)
+        speculation = (
+            submit_speculative_search(question_vector)
+            if speculative
+            and needs_llm_classification(question, question_vector, llm=llm, use_cache=use_classification_cache)
+            else None
+        )
+        # STEP 1: 보험유형 순위 + 신뢰도 (중심 벡터로 확신이 없을 때만 LLM)
+        ranking, method = rank_insurance_types(question, llm, question_vector, use_cache=use_classification_cache)
+        insurance_type, search_types = after_classification(collector, question, ranking, method)
+        cached = cached_answer(collector, question, lookup_answer(question, question_vector, insurance_type))
+        if cached is not None:
+            if speculation is not None:
+                speculation.cancel()
+            return cached
+        
+        # 필터 검색과 필터 없는 검색을 한 번에 (RETRIEVAL_BATCH_FALLBACK) → fallback 해도 추가 왕복 없음
+        # 추측 검색이 있으면 그 후보를 거르고, 모자랄 때만 필터 검색을 보냄
+        docs, unfiltered_docs, status = search_after_speculation(speculation, question_vector, search_types, question)
+        docs, fallback_activated = after_retrieval(collector, docs, unfiltered_docs, status)
+
+        # 긴 조항의 조각으로 검색된 문서 → 원래 조항 전체로 복원
+        docs = expand_parent_clauses(docs)
+
+        prompt_text, result = before_generation(collector, question, insurance_type, search_types, docs, fallback_activated)
+        answer = llm.invoke(prompt_text).content
+        result = after_generation(collector, prompt_text, answer, result)
+        if answer_cache is not None:
+            answer_cache.put(question, question_vector, insurance_type, result)
+        return result
+
+    async def aretrieve_with_classification(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        question, collector = start(inputs)
+        cached = cached_answer(collector, question, await alookup_answer(question))
+        if cached is not None:
+            return cached
+
+        # 임베딩 모델은 CPU 연산 → 이벤트 루프를 막지 않게 스레드에서
+        question_vector, cache_hit = await asyncio.to_thread(embed_question, question)
+        after_embedding(collector, cache_hit)
+
+        speculation = (
+            asyncio.create_task(aspeculative_search(question_vector))
+            if speculative
+            and needs_llm_classification(question, question_vector, llm=llm, use_cache=use_classification_cache)
+            else None
+        )
+        ranking, method = await arank_insurance_types(question, llm, question_vector, use_cache=use_classification_cache)
+        insurance_type, search_types = after_classification(collector, question, ranking, method)
+        cached = cached_answer(collector, question, await alookup_answer(question, question_vector, insurance_type))
+        if cached is not None:
+            if speculation is not None:
+                speculation.cancel()
+            return cached
+
+        docs, unfiltered_docs, status = await asearch_after_speculation(
+            speculation, question_vector, search_types, question
+        )
+        docs, fallback_activated = after_retrieval(collector, docs, unfiltered_docs, status)
+        docs = await aexpand_parent_clauses(docs)
+
+        prompt_text, result = before_generation(collector, question, insurance_type, search_types, docs, fallback_activated)
+        answer = (await llm.ainvoke(prompt_text)).content
+        result = after_generation(collector, prompt_text, answer, result)
+        if answer_cache is not None:
+            await asyncio.to_thread(answer_cache.put, question, question_vector, insurance_type, result)
         return result
 
-    chain = RunnableLambda(retrieve_with_classification)
+    chain = RunnableLambda(retrieve_with_classification, afunc=aretrieve_with_classification)
     
     return chain
@@ -1,5 +1,8 @@
 import os
 
+from llm.prompt import INSURANCE_PROMPT
+from vectorstore.lexical_index import type_names
+
 def format_insurance_docs(docs):
     if not docs:
         return "관련 약관 문서를 찾을 수 없습니다."
@@ -26,6 +29,89 @@ def format_insurance_docs(docs):
     return "\n\n".join(blocks)
 
 
+def log_type_ranking(ranking, search_types):
+    """보험유형 신뢰도 순위 + 검색 필터 (search_types 가 None 이면 필터 없이 전체 검색)"""
+    print("[STEP 1] 보험유형 신뢰도: " + ", ".join(f"{t} {confidence:.2f}" for t, confidence in ranking[:4]))
+    if search_types is None:
+        print("[STEP 2] 신뢰도가 고르게 퍼짐 → 필터 없이 전체 검색")
+    else:
+        print(f"[STEP 2] {search_types} 필터로 검색 시도...")
+
+
+def log_filter_miss(insurance_type, unfiltered_docs, count_documents):
+    """
+    디버깅: 필터 검색이 비었을 때 실제 저장된 insurance_type 값 확인
+    insurance_type: 필터에 넣은 보험유형 하나 또는 목록
+    count_documents: 보험유형 → 문서 수 (동기 Qdrant 요청이 나갈 수 있음 → 비동기 체인은 스레드에서 호출)
+    """
+    print(f"[디버깅] 필터 검색 실패 - 실제 DB에 저장된 insurance_type 값 확인 중...")
+    unique_types = set(doc.metadata.get("insurance_type") for doc in unfiltered_docs[:20])
+    print(f"[디버깅] 전체 검색 상위 20개 문서의 insurance_type 값들: {unique_types}")
+    print(f"[디버깅] 찾고 있는 값: '{insurance_type}' (repr: {repr(insurance_type)})")
+    print(f"[디버깅] 값 일치 여부: {bool(set(type_names(insurance_type)) & unique_types)}")
+
+    # 각 insurance_type별로 실제 몇 개가 있는지 확인 (캐시된 통계, 요청마다 count 를 보내지 않음)
+    try:
+        count = count_documents(insurance_type)
+        print(f"[디버깅] '{insurance_type}' 문서 수 (캐시된 count 통계): {count:,}개")
+    except Exception as e:
+        print(f"[디버깅] Qdrant count 확인 실패: {e}")
+
+
+def select_final_docs(docs, unfiltered_docs):
+    """필터 검색 결과가 없으면 필터 없는 검색 결과로 fallback → (사용할 문서, fallback 여부)"""
+    if not docs:
+        print(f"[STEP 3] 필터 검색 결과가 0개 → 필터 없이 전체 검색으로 fallback")
+        docs = unfiltered_docs or []
+        print(f"[STEP 3 결과] 전체 검색 결과: {len(docs)}개 문서 발견")
+        return docs, True
+
+    print(f"[STEP 3] 건너뜀 (이미 {len(docs)}개 문서 찾음)")
+    return docs, False
+
+
+def log_answer_cache_hit(cached):
+    """답변 캐시 히트 출력 (cached["answer_cache"] = {kind, similarity, question})"""
+    info = cached["answer_cache"]
+    if info["kind"] == "exact":
+        print(f"[답변 캐시] 같은 질문의 답변 재사용 → 분류 / 검색 / 답변 생성 생략")
+    else:
+        print(
+            f"[답변 캐시] 비슷한 질문('{info['question']}', 유사도 {info['similarity']:.3f})의 답변 재사용 "
+            f"→ 검색 / 답변 생성 생략"
+        )
+
+
+def build_answer_prompt(question, insurance_type, docs):
+    """
+    최종 문서 → (LLM 프롬프트, answer 를 뺀 결과 dict)
+    첫 문서의 보험유형 / 조항 분류를 프롬프트와 결과에 함께 넣는다 (동기 / 비동기 QA 체인 공용)
+    """
+    context = format_insurance_docs(docs)
+    md = docs[0].metadata if docs else {}
+
+    result = {
+        "question": question,
+        "insurance_type": md.get("insurance_type", insurance_type),
+        "level_1": md.get("level_1", ""),
+        "level_2": md.get("level_2", ""),
+        "level_3": md.get("level_3", ""),
+        "level_4": md.get("level_4", ""),
+        "context": context,
+        "docs": docs,  # Streamlit 참고용
+    }
+    prompt_text = INSURANCE_PROMPT.format(
+        question=question,
+        context=context,
+        insurance_type=result["insurance_type"],
+        level_1=result["level_1"],
+        level_2=result["level_2"],
+        level_3=result["level_3"],
+        level_4=result["level_4"],
+    )
+    return prompt_text, result
+
+
 
 
 # def format_insurance_docs(docs):
@@ -11,16 +11,139 @@ TEMPERATURE = 0.0
 
 # ===== Embedding (적재 시 사용한 것과 동일해야 함) =====
 EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+EMBEDDING_DIM = 384  # 임베딩 차원 수
+# 임베딩 디스크 캐시 (모델명 + 텍스트 해시 → 벡터). 적재/재적재/질문 임베딩이 함께 사용
+EMBEDDING_CACHE_DIR = Path(__file__).resolve().parent.parent / "embedding_cache"
 
 # ===== Qdrant =====
 QDRANT_HOST = "localhost"
 QDRANT_PORT = 6333
+QDRANT_GRPC_PORT = 6334
+QDRANT_PREFER_GRPC = False  # True 면 gRPC 채널 풀 사용 (Qdrant 서버의 6334 포트가 열려 있어야 함)
+QDRANT_POOL_SIZE = 8        # 프로세스 공용 클라이언트의 keep-alive HTTP 연결 / gRPC 채널 수
+QDRANT_TIMEOUT = 10         # 요청 타임아웃 (초)
 COLLECTION_NAME = "insurance_docs"
 
+# 컬렉션 프로필 (컬렉션 생성 / 기존 컬렉션 마이그레이션 시 적용)
+# 필터에 쓰는 payload 필드는 keyword 인덱스, 벡터는 int8 양자화본만 RAM에 두고 원본은 디스크 (rescore로 정확도 보정)
+QDRANT_COLLECTION_PROFILE = {
+    "payload_indexes": {
+        "metadata.insurance_type": "keyword",
+        "metadata.source": "keyword",
+        "metadata.sources": "keyword",    # 중복 제거된 대표 조항의 출처 파일들 (2단계 검색의 섹션 필터)
+        "metadata.level_1": "keyword",    # 2단계 검색의 섹션 필터 (source + level_1)
+        "metadata.parent_id": "keyword",  # 긴 조항 조각 → 부모 조항 복원
+    },
+    "quantization": {"type": "int8", "quantile": 0.99, "always_ram": True},
+    "rescore": True,
+    "oversampling": 2.0,
+    "on_disk": True,          # 원본 벡터
+    "on_disk_payload": True,
+    "hnsw": {"m": 16, "ef_construct": 128},
+}
+
+# ===== 벡터 검색 백엔드 =====
+# "qdrant": Qdrant 서버에서 검색
+# "faiss": 적재 후 Qdrant 컬렉션으로 만든 로컬 FAISS 인덱스 (memory-mapped, 질문 처리 시 Qdrant 접속 없음)
+#          → 단일 노드 배포 / 테스트 / 벤치마크용. 적재는 여전히 Qdrant 로 하고, 인덱스를 다시 만들면 앱 재시작
+VECTOR_BACKEND = "qdrant"
+FAISS_INDEX_DIR = Path(__file__).resolve().parent.parent / f"faiss_index_{COLLECTION_NAME}"
+FAISS_INDEX_KIND = "flat"    # "flat" (정확) / "ivf" / "hnsw" (근사, 큰 컬렉션)
+FAISS_IVF_NPROBE = 16        # ivf: 검색할 리스트 수
+FAISS_HNSW_M = 32            # hnsw: 노드당 이웃 수 (생성 시)
+FAISS_HNSW_EF_SEARCH = 128   # hnsw: 검색 후보 수
+
 # ===== Retriever =====
 TOP_K = 10
 SCORE_THRESHOLD = 0.3
+# 질문 → 임베딩 벡터 메모리 캐시 (LRU + TTL, 자주 들어오는 질문은 모델을 다시 돌리지 않음)
+QUERY_VECTOR_CACHE_SIZE = 1024
+QUERY_VECTOR_CACHE_TTL = 3600  # 초
+# 보험유형 필터 검색 + fallback(필터 없는) 검색을 요청 하나(query_batch_points)로 보냄 → fallback 해도 왕복 1번
+RETRIEVAL_BATCH_FALLBACK = True
+POINT_COUNT_CACHE_TTL = 600  # 디버깅용 보험유형별 포인트 수 캐시 (초)
+# "dense": Qdrant 임베딩 검색만 (TOP_K개)
+# "hybrid": 임베딩 검색 + 문자 2-gram BM25 어휘 검색을 RRF로 합쳐 HYBRID_TOP_K개 (어휘 색인이 없으면 dense로 동작)
+RETRIEVAL_MODE = "hybrid"
+HYBRID_TOP_K = 5
+HYBRID_CANDIDATES = 20  # 각 검색에서 가져올 후보 수 (하이브리드 / 다양화)
+RRF_K = 60              # reciprocal rank fusion 상수 (1 / (RRF_K + 순위))
+# 어휘 색인 (적재가 끝나면 컬렉션 전체로 다시 만듦, 검색 시 memory-mapped)
+LEXICAL_INDEX_DIR = Path(__file__).resolve().parent.parent / f"lexical_index_{COLLECTION_NAME}"
+# 검색 후 다양화: 후보(HYBRID_CANDIDATES개)에서 근접 중복(다른 보험사 파일의 같은 표준 조항)을 접고 MMR 로 최종 개수만큼
+DIVERSIFY = True
+MMR_LAMBDA = 0.7             # 1 에 가까울수록 질문 관련도, 0 에 가까울수록 서로 다른 조항 우선
+DUPLICATE_SIMILARITY = 0.95  # 코사인 유사도가 이 이상이면 같은 조항의 사본으로 보고 앞 순위 하나만 남김
+# 2단계 검색: 섹션(약관 파일별 level_1 = 관 / 편) 중심 벡터로 가까운 섹션을 먼저 고르고 그 안의 조항만 검색
+# 섹션 인덱스(`<COLLECTION_NAME>_sections` 컬렉션)는 켜져 있으면 적재가 끝날 때 다시 만든다
+# 컬렉션이 커져서 조항 전체 검색이 느려질 때 켬 (고른 섹션 밖의 조항은 못 찾으므로 SECTION_TOP_K 는 넉넉히)
+HIERARCHICAL_RETRIEVAL = False
+SECTION_TOP_K = 8
+# 추측 검색: 분류에 LLM 이 필요한 질문은 LLM 응답을 기다리는 동안 필터 없는 검색(SPECULATIVE_CANDIDATES개)을 먼저 보내고
+# 보험유형이 정해지면 후보를 로컬에서 거른다. 거른 후보로 필터 검색 결과를 확정할 수 없을 때만 필터 검색을 한 번 더 보냄
+# (2단계 검색이 켜져 있으면 섹션 선택이 보험유형마다 달라서 필터 검색은 항상 다시 보내고, 필터 없는 검색만 아낀다)
+SPECULATIVE_RETRIEVAL = True
+SPECULATIVE_CANDIDATES = 50  # HYBRID_CANDIDATES / TOP_K 보다 커야 로컬 필터가 의미 있음
+SPECULATIVE_WORKERS = 8      # 동기 체인에서 추측 검색을 돌리는 스레드 수 (프로세스 공용)
+
+# ===== 일괄 QA (오프라인 대량 질문, chains/batch_qa.py / app/run_batch_qa.py) =====
+QA_BATCH_SIZE = 64         # 한 번에 임베딩 / 검색할 질문 수 (Qdrant 요청 1번에 질문당 검색 최대 2개)
+QA_BATCH_CONCURRENCY = 8   # 동시에 보내는 LLM 호출 수 (분류 + 답변 합계, API 속도 제한에 맞춤)
+
+# ===== 보험유형 분류 =====
+# "llm": 질문마다 LLM 호출
+# "centroid": ⚠️ 실험적. 질문 벡터 ↔ 보험유형 중심 벡터(적재가 끝날 때 생성)로 먼저 고르고, 1·2위 점수 차가 작을 때만 LLM 호출
+#             (중심 벡터 파일이 없으면 LLM 으로 동작). 실제 질문으로 잰 적용률 / 일치율이 아직 없음
+# 중심 벡터는 조항 텍스트로 만들어서 질문과 글의 종류가 다르다 → 실제 질문으로 LLM 분류와의 일치율을 재기 전까지는 "llm"
+# (benchmarks/bench_insurance_classifier.py 로 CLASSIFIER_MARGIN 별 적용률 / 일치율 확인 후 "centroid" 로)
+INSURANCE_CLASSIFIER = "llm"
+TYPE_CENTROIDS_PATH = Path(__file__).resolve().parent.parent / f"type_centroids_{COLLECTION_NAME}.npz"
+# 1위 - 2위 점수 차가 이보다 작으면 LLM 분류 (측정 전 임시값). 높이면 정확도 ↑ / LLM 호출 ↑
+# → benchmarks/bench_insurance_classifier.py 로 실제 질문에 맞춰 조정
+CLASSIFIER_MARGIN = 0.05
+# 보험유형 신뢰도 → 검색 필터
+# 분류기는 보험유형 순위 + 신뢰도(합 1)를 내고, 신뢰도 순으로 누적 TYPE_FILTER_CONFIDENCE 를 넘을 때까지의 보험유형을
+# MatchAny 필터 하나로 검색한다 (요청 1번). TYPE_FILTER_MAX_TYPES 개로도 못 넘으면 (신뢰도가 고르게 퍼짐) 필터 없이 전체 검색
+CLASSIFIER_TEMPERATURE = 0.05     # 중심 벡터 점수 → 신뢰도 softmax 온도 (작을수록 1위에 몰림)
+CLASSIFIER_LLM_CONFIDENCE = 0.6   # LLM(또는 키워드 규칙)이 고른 보험유형의 몫, 나머지는 중심 벡터 신뢰도대로 (중심 벡터가 없으면 1)
+TYPE_FILTER_CONFIDENCE = 0.8
+TYPE_FILTER_MAX_TYPES = 3
+# LLM 분류가 목록 밖의 답을 줄 때 쓰는 키워드 규칙 (보험유형별 키워드 → 가중치, 점수 합이 가장 큰 유형)
+CLASSIFIER_KEYWORDS_PATH = Path(__file__).resolve().parent / "insurance_keywords.json"
+# 분류 LLM 응답 캐시: 정규화한 질문(NFC + 공백 / 문장부호 제거) → LLM 응답, SQLite 에 남겨서 재시작 후에도 재사용
+# 분류 프롬프트 / LLM 모델이 바뀌면 이전 응답은 버린다 (순위는 조회할 때마다 현재 중심 벡터 / 키워드 규칙으로 계산)
+CLASSIFICATION_CACHE_ENABLED = True
+CLASSIFICATION_CACHE_PATH = Path(__file__).resolve().parent.parent / "classification_cache.sqlite3"
+CLASSIFICATION_CACHE_SIZE = 20000
+
+# ===== 답변 캐시 (의미 기반, QA 체인 앞단) =====
+# 정규화한 질문이 같으면 바로, 아니면 분류된 보험유형 안에서 질문 벡터가 가까운 이전 질문의 답변을 재사용
+# 컬렉션 / 임베딩 모델 / 적재 매니페스트가 바뀌면 이전 답변은 버린다, 답변 프롬프트 / LLM 별로 따로 둔다
+# 기본은 꺼 둔다: ANSWER_CACHE_SIMILARITY 를 실제 질문 쌍으로 측정하기 전까지는 다른 질문에 같은 답이 나갈 수 있음
+# (체인마다 get_qa_chain(use_answer_cache=True) 로 켤 수 있음)
+ANSWER_CACHE_ENABLED = False
+ANSWER_CACHE_PATH = Path(__file__).resolve().parent.parent / f"answer_cache_{COLLECTION_NAME}.sqlite3"
+ANSWER_CACHE_SIZE = 5000
+ANSWER_CACHE_TTL = 7 * 24 * 3600  # 초 (약관이 그대로여도 프롬프트 / 모델 변경이 반영되도록)
+# 질문 벡터 코사인 유사도 기준 (아직 측정 안 한 값). 낮추면 히트는 늘지만 다른 질문(뇌출혈 ↔ 뇌경색)에 같은 답이 나갈 수 있음
+ANSWER_CACHE_SIMILARITY = 0.93
 
+# ===== Ingest (대용량 적재 파이프라인) =====
+INGEST_PARSE_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # XML 파싱 프로세스 수
+INGEST_EMBED_BATCH_SIZE = 256    # 임베딩 1회 호출당 문서 수
+INGEST_UPSERT_BATCH_SIZE = 1024  # Qdrant upsert 1회당 포인트 수
+INGEST_UPSERT_WORKERS = 4        # 동시 upsert 스레드 수
+INGEST_QUEUE_SIZE = 8            # 단계 사이 큐 크기 (backpressure)
+# 조항 중복 제거: 같은 보험유형 안에서 동일/거의 동일한 조항은 대표 1개만 임베딩 (바꾸면 다음 --incremental 은 전체 적재)
+INGEST_DEDUP = True
+INGEST_DEDUP_THRESHOLD = 0.9   # near-duplicate 판정 MinHash 유사도 (문자 5-gram Jaccard 추정치)
+INGEST_DEDUP_MIN_CHARS = 80    # 이보다 짧은 조항은 완전 일치만 묶음
+# 긴 조항 분할: 임베딩 모델 최대 길이(128 토큰) 안에 들어가도록 항/호 경계로 나눔 (0이면 분할 안 함)
+# ⚠️ 값을 바꾸면 --incremental 도 전체 적재로 바뀐다 (매니페스트 헤더의 적재 설정과 비교)
+CHUNK_MAX_TOKENS = 120
+CHUNK_OVERLAP_TOKENS = 16
+# 증분 적재 매니페스트 (파일/조항 내용 해시 기록)
+INGEST_MANIFEST_PATH = Path(__file__).resolve().parent.parent / f"ingest_manifest_{COLLECTION_NAME}.jsonl"
 
 
 # ===== Path =====
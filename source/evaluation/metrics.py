@@ -16,7 +16,11 @@ class MetricsCollector:
             "total_time": 0.0,
             "classification_time": 0.0,
             "retrieval_time": 0.0,
+            "query_embedding_time": 0.0,
             "generation_time": 0.0,
+            "classification_method": None,  # "centroid" / "cache" (LLM 호출 없음) / "llm" / "keyword" / "default"
+            "type_confidences": None,  # [(보험유형, 신뢰도)] 신뢰도 내림차순
+            "search_types": None,  # 검색 필터에 넣은 보험유형 목록 (None 이면 필터 없이 전체 검색)
             "classification_tokens": 0,
             "generation_input_tokens": 0,
             "generation_output_tokens": 0,
@@ -24,7 +28,15 @@ class MetricsCollector:
             "retrieved_docs_count": 0,
             "used_filter": False,
             "fallback_activated": False,
+            "speculative_retrieval": None,  # "hit" (추측 검색 후보로 끝남) / "miss" (필터 검색 다시 보냄) / None (추측 안 함)
             "classified_insurance_type": None,
+            "query_cache_hit": None,
+            "query_cache_hits": 0,
+            "query_cache_misses": 0,
+            "classification_cache_hits": 0,
+            "classification_cache_misses": 0,
+            "classification_cache_hit_rate": None,
+            "answer_cache": None,
             "timestamp": None,
         }
     
@@ -47,6 +59,8 @@ class MetricsCollector:
             self.metrics["classification_time"] = elapsed
         elif stage == "retrieval":
             self.metrics["retrieval_time"] = elapsed
+        elif stage == "query_embedding":
+            self.metrics["query_embedding_time"] = elapsed
         elif stage == "generation":
             self.metrics["generation_time"] = elapsed
         
@@ -70,6 +84,12 @@ class MetricsCollector:
         
         return estimated_tokens
     
+    def record_classification(self, method: str, ranking=None, search_types=None):
+        """보험유형 분류 방법 (centroid 면 분류 LLM 호출 없음) + 신뢰도 순위 + 검색 필터 보험유형 기록"""
+        self.metrics["classification_method"] = method
+        self.metrics["type_confidences"] = [(t, round(confidence, 4)) for t, confidence in ranking or []]
+        self.metrics["search_types"] = search_types
+    
     def record_classification_tokens(self, question: str, response: str):
         """분류 단계 토큰 기록"""
         input_tokens = self.count_tokens(question)
@@ -102,6 +122,26 @@ class MetricsCollector:
         if insurance_type:
             self.metrics["classified_insurance_type"] = insurance_type
     
+    def record_speculative_retrieval(self, status: Optional[str]):
+        """추측 검색 결과 기록 (분류 LLM 을 기다리는 동안 보낸 필터 없는 검색으로 끝났는지)"""
+        self.metrics["speculative_retrieval"] = status
+    
+    def record_query_cache(self, hit: bool, stats: Dict[str, int]):
+        """질문 벡터 캐시 기록 (이번 요청 히트 여부 + 프로세스 누적 히트/미스)"""
+        self.metrics["query_cache_hit"] = hit
+        self.metrics["query_cache_hits"] = stats.get("hits", 0)
+        self.metrics["query_cache_misses"] = stats.get("misses", 0)
+    
+    def record_classification_cache(self, stats: Dict[str, Any]):
+        """분류 LLM 응답 캐시 기록 (프로세스 누적 히트/미스, 적중률)"""
+        self.metrics["classification_cache_hits"] = stats.get("hits", 0)
+        self.metrics["classification_cache_misses"] = stats.get("misses", 0)
+        self.metrics["classification_cache_hit_rate"] = stats.get("hit_rate")
+    
+    def record_answer_cache(self, info: Dict[str, Any]):
+        """답변 캐시 히트 기록 ({kind: exact / semantic, similarity, question: 캐시된 질문})"""
+        self.metrics["answer_cache"] = info
+    
     def get_metrics(self) -> Dict[str, Any]:
         """수집된 메트릭 반환"""
         self.metrics["timestamp"] = datetime.now().isoformat()
@@ -1,6 +1,6 @@
-from vectorstore.retriever import get_retriever
+from vectorstore.retriever import embed_question, expand_parent_clauses, search_with_fallback
 
 def retrieve(state):
-    retriever = get_retriever()
-    docs = retriever.get_relevant_documents(state["question"]) # type: ignore
-    return {"documents": docs}
+    question_vector, _ = embed_question(state["question"])
+    docs, _ = search_with_fallback(question_vector, None, question=state["question"])
+    return {"documents": expand_parent_clauses(docs)}
@@ -0,0 +1,192 @@
+# chunking.py
+"""
+긴 조항 분할 (sub-chunking)
+
+임베딩 모델(paraphrase-multilingual-MiniLM-L12-v2)은 128 토큰까지만 보고 나머지는 잘라 버린다.
+토큰 예산을 넘는 조항(과 파일 전체가 1개가 된 fallback 조항)을
+
+    항(①②...) → 호(1. 2. ...) → 줄 → 문장 → 토큰 단위 강제 분할
+
+순서로 경계를 찾아 예산 안에서 최대한 크게 묶고, 조각 사이에는 overlap 만큼 앞 조각의 끝을 겹친다.
+각 조각은 부모 조항 ID / 조각 번호 / 부모 본문 내 시작 위치를 가진다 (ClauseRecord.chunk)
+→ 검색은 작은 조각으로, 답변 생성 때는 vectorstore.retriever.expand_parent_clauses 로 원래 조항 복원
+"""
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from .preprocessing import ClauseRecord
+from source.config.settings import CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, EMBEDDING_MODEL
+
+Span = Tuple[int, int]  # 본문 안의 [start, end)
+
+_HANG = re.compile(r"[ \t]*[①-⑳]")   # 항 시작
+_HO = re.compile(r"[ \t]*\d+\.\s")     # 호 시작
+_SENTENCE_END = re.compile(r"(?<=[다요음함임]\.)\s+|(?<=[.!?])\s+")
+
+
+# ---------- Token Count ----------
+@lru_cache(maxsize=None)
+def _load_tokenizer(model_name: str):
+    """임베딩 모델 토크나이저 (transformers가 없거나 받을 수 없으면 None → 추정치 사용)"""
+    try:
+        from transformers import AutoTokenizer
+    except ImportError:
+        return None
+    try:
+        return AutoTokenizer.from_pretrained(model_name)
+    except OSError:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 보수적인 추정치 (한글 약관은 대략 1.5자당 1토큰)"""
+    return int(len("".join(text.split())) / 1.5) + 1
+
+
+def tokenizer_name(model_name: str = EMBEDDING_MODEL) -> str:
+    """count_tokens 가 실제로 쓰는 토크나이저 (모델 이름, 없으면 "estimate") → 적재 설정으로 매니페스트에 기록"""
+    return model_name if _load_tokenizer(model_name) is not None else "estimate"
+
+
+def count_tokens(text: str, model_name: str = EMBEDDING_MODEL) -> int:
+    tokenizer = _load_tokenizer(model_name)
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+# ---------- Split ----------
+def _line_spans(text: str, start: int, end: int) -> List[Span]:
+    spans, pos = [], start
+    while pos < end:
+        nl = text.find("\n", pos, end)
+        line_end = end if nl == -1 else nl
+        if line_end > pos:
+            spans.append((pos, line_end))
+        pos = line_end + 1
+    return spans
+
+
+def _group_lines(text: str, lines: List[Span], starts_unit: Callable[[str, int], bool]) -> List[Span]:
+    """줄 목록 → 새 단위가 시작되는 줄에서 끊은 단위 목록"""
+    units: List[Span] = []
+    for start, end in lines:
+        if units and not starts_unit(text, start):
+            units[-1] = (units[-1][0], end)
+        else:
+            units.append((start, end))
+    return units
+
+
+def _sentence_spans(text: str, start: int, end: int) -> List[Span]:
+    spans, pos = [], start
+    for match in _SENTENCE_END.finditer(text, start, end):
+        spans.append((pos, match.start()))
+        pos = match.end()
+    spans.append((pos, end))
+    return [s for s in spans if s[1] > s[0]]
+
+
+def _hard_split(text: str, span: Span, max_tokens: int, count: Callable[[str], int]) -> List[Span]:
+    """경계를 찾을 수 없는 긴 문장 → 예산에 맞는 가장 긴 앞부분을 이분 탐색으로 잘라 나감"""
+    pieces, pos, end = [], span[0], span[1]
+    while pos < end:
+        lo, hi = pos + 1, end
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if count(text[pos:mid]) <= max_tokens:
+                lo = mid
+            else:
+                hi = mid - 1
+        pieces.append((pos, lo))
+        pos = lo
+    return pieces
+
+
+def _pieces(text: str, span: Span, level: int, max_tokens: int, count: Callable[[str], int]) -> List[Tuple[Span, int]]:
+    """span → 예산 안에 들어가는 (조각, 토큰 수) 목록. level: 0=항, 1=호, 2=줄, 3=문장"""
+    tokens = count(text[span[0]:span[1]])
+    if tokens <= max_tokens:
+        return [(span, tokens)]
+
+    lines = _line_spans(text, *span)
+    if level == 0:
+        units = _group_lines(text, lines, lambda t, i: _HANG.match(t, i) is not None)
+    elif level == 1:
+        units = _group_lines(text, lines, lambda t, i: _HANG.match(t, i) is not None or _HO.match(t, i) is not None)
+    elif level == 2:
+        units = lines
+    elif level == 3:
+        units = _sentence_spans(text, *span)
+    else:
+        return [(piece, count(text[piece[0]:piece[1]])) for piece in _hard_split(text, span, max_tokens, count)]
+
+    if len(units) <= 1:
+        return _pieces(text, span, level + 1, max_tokens, count)
+
+    result: List[Tuple[Span, int]] = []
+    for unit in units:
+        result.extend(_pieces(text, unit, level + 1, max_tokens, count))
+    return result
+
+
+def split_clause_text(
+    text: str,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+    count: Optional[Callable[[str], int]] = None,
+) -> List[Span]:
+    """
+    조항 본문 → 조각 span 목록 (예산 안이면 [(0, len(text))])
+    작은 단위들을 순서대로 예산까지 채워 묶고, 새 조각은 앞 조각 끝의 단위들을 overlap 만큼 다시 포함한다
+    """
+    count = count or count_tokens
+    if max_tokens <= 0 or not text:
+        return [(0, len(text))]
+
+    pieces = _pieces(text, (0, len(text)), 0, max_tokens, count)
+    if len(pieces) == 1:
+        return [(0, len(text))]
+
+    chunks: List[Span] = []
+    current: List[Tuple[Span, int]] = []
+    used = 0
+    for piece, tokens in pieces:
+        if current and used + tokens > max_tokens:
+            chunks.append((current[0][0][0], current[-1][0][1]))
+            # overlap: 앞 조각 끝에서 예산 안에 드는 단위만 (새 단위와 합쳐 예산을 넘지 않게)
+            tail: List[Tuple[Span, int]] = []
+            tail_tokens = 0
+            for prev in reversed(current[1:]):
+                if tail_tokens + prev[1] > overlap_tokens or tail_tokens + prev[1] + tokens > max_tokens:
+                    break
+                tail.insert(0, prev)
+                tail_tokens += prev[1]
+            current, used = tail, tail_tokens
+        current.append((piece, tokens))
+        used += tokens
+    chunks.append((current[0][0][0], current[-1][0][1]))
+    return chunks
+
+
+def chunk_clause(
+    clause: ClauseRecord,
+    parent_id: str,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> List[ClauseRecord]:
+    """조항 1개 → 조각 레코드 목록 (나눌 필요가 없으면 [clause] 그대로)"""
+    spans = split_clause_text(clause.text, max_tokens, overlap_tokens)
+    if len(spans) == 1:
+        return [clause]
+    return [
+        ClauseRecord(
+            clause.text[start:end],
+            clause.levels,
+            clause.insurance_type,
+            clause.source,
+            chunk=(parent_id, index, start),
+        )
+        for index, (start, end) in enumerate(spans)
+    ]
@@ -0,0 +1,169 @@
+# dedup.py
+"""
+임베딩 전 조항 중복 제거
+
+보험보통약관의 표준 조항(보험금의 지급사유, 계약의 무효, 분쟁의 조정 ...)은
+보험사 파일마다 거의 같은 문장으로 반복된다. 같은 보험유형 안에서
+
+- 내용이 완전히 같은 조항 (내용 해시)
+- 거의 같은 조항 (문자 5-gram MinHash + LSH, 조 제목이 같은 조항끼리만)
+
+을 한 그룹으로 묶어 대표 조항 1개만 임베딩/적재하고,
+그룹에 속한 파일 목록은 대표 포인트의 metadata.sources 에 남긴다.
+긴 조항은 여러 조각 포인트로 나뉘므로(chunking.py) 조항 1개 = 포인트 ID 목록 단위로 다룬다.
+
+보험유형이 다른 조항은 묶지 않는다 → metadata.insurance_type 필터 결과는 그대로다.
+"""
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .preprocessing import ClauseRecord
+from source.config.settings import INGEST_DEDUP_MIN_CHARS, INGEST_DEDUP_THRESHOLD
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+LSH_BANDS = 16  # 16 band x 8 row → 유사도 0.9 쌍은 거의 항상 후보가 된다
+
+# 해시 함수 계수 (값이 바뀌어도 결과만 달라질 뿐 저장되지는 않지만 재현성을 위해 고정)
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+_WHITESPACE = re.compile(r"\s+")
+_ARTICLE_NUMBER = re.compile(r"^제\s*\d+\s*조(?:\s*의\s*\d+)?\s*")
+
+
+def minhash_signature(text: str, min_chars: int = INGEST_DEDUP_MIN_CHARS) -> Optional[np.ndarray]:
+    """
+    공백을 정리한 텍스트의 문자 5-gram 집합 → MinHash 서명 (uint32 x NUM_PERM)
+    짧은 텍스트는 near-duplicate 판정이 불안정하므로 None
+    """
+    normalized = _WHITESPACE.sub(" ", text).strip()
+    if len(normalized) < max(min_chars, SHINGLE_SIZE):
+        return None
+
+    codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    n = len(codes) - SHINGLE_SIZE + 1
+    shingles = np.zeros(n, dtype=np.uint64)
+    for j in range(SHINGLE_SIZE):
+        shingles = shingles * _SHINGLE_BASE + codes[j:j + n]  # uint64 overflow는 의도된 mod 2^64
+    shingles = np.unique(shingles)
+
+    # multiply-shift 해시: ((a * x + b) mod 2^64) >> 32
+    hashed = (shingles[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) >> np.uint64(32)
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def clause_title(levels: Sequence[Optional[str]]) -> str:
+    """가장 하위 level 제목에서 조 번호를 뺀 것 (예: '제3조(보험금의 지급사유)' → '(보험금의 지급사유)')"""
+    for title in reversed(levels):
+        if title:
+            return _WHITESPACE.sub("", _ARTICLE_NUMBER.sub("", title))
+    return ""
+
+
+class ClauseDeduplicator:
+    """
+    적재 중 들어오는 조항을 대표 조항에 배정한다 (파이프라인 메인 스레드 전용)
+
+    대표 조항은 먼저 들어온 조항이며 자기 포인트 ID 목록을 그대로 쓴다.
+    중복 조항은 대표의 포인트 ID 목록을 돌려받고, 출처 파일은 group_sources() / shared_sources()로 모인다.
+    """
+
+    def __init__(self, threshold: float = INGEST_DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        # (insurance_type, 내용 해시) → 대표 조항의 포인트 ID 목록
+        self._exact: Dict[Tuple[str, str], List[str]] = {}
+        self._buckets: Dict[int, List[int]] = {}  # LSH band 해시 → _signatures 인덱스
+        self._signatures: List[np.ndarray] = []
+        self._rep_ids: List[List[str]] = []
+        self._rep_source: Dict[str, str] = {}  # 대표 조항 첫 포인트 ID → 출처 파일
+        # 대표 조항 첫 포인트 ID → (포인트 ID 목록, 출처 파일 목록) (중복이 생긴 그룹만)
+        self._shared: Dict[str, Tuple[List[str], List[str]]] = {}
+
+    def assign(
+        self,
+        point_ids: List[str],
+        clause: ClauseRecord,
+        text_hash: str,
+        signature: Optional[np.ndarray],
+    ) -> List[str]:
+        """
+        조항 1개 (포인트 ID 목록) → 대표 조항의 포인트 ID 목록
+        자기 자신이 대표면 넘겨받은 point_ids 객체를 그대로 돌려준다
+        clause: 조항 (조각으로 나뉜 경우 첫 조각) → 보험유형 / 제목 / 출처
+        """
+        insurance_type = clause.insurance_type
+        source = clause.source
+
+        rep_ids = self._exact.get((insurance_type, text_hash))
+        if rep_ids is not None:
+            self.exact_duplicates += 1
+            self._add_source(rep_ids, source)
+            return rep_ids
+
+        band_keys: List[int] = []
+        if signature is not None:
+            group = (insurance_type, clause_title(clause.levels))
+            rows = NUM_PERM // LSH_BANDS
+            band_keys = [
+                hash((group, b, signature[b * rows:(b + 1) * rows].tobytes()))
+                for b in range(LSH_BANDS)
+            ]
+            rep_ids = self._near_match(signature, band_keys)
+            if rep_ids is not None:
+                self.near_duplicates += 1
+                self._exact[(insurance_type, text_hash)] = rep_ids
+                self._add_source(rep_ids, source)
+                return rep_ids
+
+        # 새 대표 조항
+        self._exact[(insurance_type, text_hash)] = point_ids
+        self._rep_source[point_ids[0]] = source
+        if signature is not None:
+            index = len(self._signatures)
+            self._signatures.append(signature)
+            self._rep_ids.append(point_ids)
+            for key in band_keys:
+                self._buckets.setdefault(key, []).append(index)
+        return point_ids
+
+    def shared_sources(self) -> Dict[str, List[str]]:
+        """중복이 생긴 대표 포인트 ID (조각 포함) → 출처 파일 목록 (대표 조항의 파일이 맨 앞)"""
+        return {
+            point_id: list(sources)
+            for point_ids, sources in self._shared.values()
+            for point_id in point_ids
+        }
+
+    def group_sources(self, rep_ids: List[str]) -> List[str]:
+        """assign() 이 돌려준 대표 포인트 ID 목록 → 지금까지 모인 출처 파일 목록 (복사본)"""
+        group = self._shared.get(rep_ids[0])
+        return list(group[1]) if group is not None else [self._rep_source[rep_ids[0]]]
+
+    @property
+    def duplicates(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+    # ----- 내부 -----
+    def _near_match(self, signature: np.ndarray, band_keys: List[int]) -> Optional[List[str]]:
+        candidates = {i for key in band_keys for i in self._buckets.get(key, ())}
+        best_index, best_score = None, self.threshold
+        for i in candidates:
+            score = float(np.mean(self._signatures[i] == signature))
+            if score >= best_score:
+                best_index, best_score = i, score
+        return None if best_index is None else self._rep_ids[best_index]
+
+    def _add_source(self, rep_ids: List[str], source: str):
+        group = self._shared.get(rep_ids[0])
+        if group is None:
+            group = self._shared[rep_ids[0]] = (rep_ids, [self._rep_source[rep_ids[0]]])
+        sources = group[1]
+        if source not in sources:
+            sources.append(source)
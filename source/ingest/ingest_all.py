@@ -1,25 +1,124 @@
+import argparse
 from pathlib import Path
-from .preprocessing import build_documents_from_xml
-from source.ingest.vertorstore_ingest import get_vectorstore, get_embeddings
+from .manifest import IngestManifest
+from .pipeline import ingest_settings, run_ingest_pipeline
+from source.config.settings import (
+    COLLECTION_NAME,
+    EMBEDDING_MODEL,
+    HIERARCHICAL_RETRIEVAL,
+    INGEST_MANIFEST_PATH,
+    INSURANCE_CLASSIFIER,
+    VECTOR_BACKEND,
+)
+from source.ingest.vertorstore_ingest import (
+    build_faiss_index,
+    build_lexical_index,
+    build_section_index,
+    build_type_centroids,
+    get_vectorstore,
+    migrate_collection,
+)
 
 PROJECT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = PROJECT_DIR / "data_selected"
 
-# 🔥 Qdrant vectorstore 초기화
-vectorstore = get_vectorstore(
-    recreate=True  # 기존 데이터 싹 지우고 새로 만들기
-)
 
-total_docs = 0
+def main(incremental: bool = False):
+    manifest = IngestManifest(
+        INGEST_MANIFEST_PATH,
+        collection_name=COLLECTION_NAME,
+        embedding_model=EMBEDDING_MODEL,
+        settings=ingest_settings(),
+    )
+    if incremental and manifest.invalidated:
+        # 임베딩 모델 / 분할 / 중복 제거 설정이 바뀜 → 옛 포인트를 추적할 수 없으니 전체 적재
+        print("[manifest] 적재 설정이 바뀌어 증분 적재 대신 전체 적재합니다")
+        incremental = False
+
+    # 🔥 Qdrant vectorstore 초기화
+    vectorstore = get_vectorstore(
+        recreate=not incremental  # 전체 모드: 기존 데이터 싹 지우고 새로 만들기
+    )
+
+    if not incremental:
+        manifest.reset()
+    elif manifest.files and vectorstore.client.count(vectorstore.collection_name).count == 0:
+        # 매니페스트는 있는데 컬렉션이 비어 있음 → 기록을 믿을 수 없으니 전부 다시 적재
+        print("[manifest] 컬렉션이 비어 있어 매니페스트를 초기화합니다")
+        manifest.reset()
+
+    # 파싱(프로세스 풀) → 배치 임베딩 → 동시 upsert
+    report = run_ingest_pipeline(
+        sorted(DATA_DIR.glob("*.xml")),
+        client=vectorstore.client,
+        embeddings=vectorstore.embeddings,  # type: ignore
+        collection_name=vectorstore.collection_name,
+        manifest=manifest,
+    )
+
+    print()
+    print(report.format())
+    print(f"\n총 {report.total_docs} documents Qdrant에 적재 완료")
+
+    # 어휘 색인은 적재 결과(중복 제거 / 조각 / 증분 삭제 반영)로 매번 다시 만든다
+    build_lexical_index(vectorstore.client)
+    if VECTOR_BACKEND == "faiss":
+        # 질문 처리가 로컬 FAISS 인덱스를 쓰는 설정이면 같이 다시 만든다
+        build_faiss_index(vectorstore.client)
+    if HIERARCHICAL_RETRIEVAL:
+        build_section_index(vectorstore.client)
+    if INSURANCE_CLASSIFIER == "centroid":
+        build_type_centroids(vectorstore.client)
 
-for xml_file in DATA_DIR.glob("*.xml"):
-    print("Processing:", xml_file.name)
-    try:
-        docs = build_documents_from_xml(str(xml_file))
-        vectorstore.add_documents(docs)
-        total_docs += len(docs)
-        print(f"✅ {len(docs)} documents added for {xml_file.name}")
-    except Exception as e:
-        print(f"❌ Error processing {xml_file.name}: {e}")
 
-print(f"\n총 {total_docs} documents Qdrant에 적재 완료")
+if __name__ == "__main__":
+    # 프로세스 풀(spawn) 워커가 이 모듈을 다시 import 해도 적재가 중복 실행되지 않도록 main 가드 필수
+    parser = argparse.ArgumentParser(description="data_selected/*.xml → Qdrant 적재")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="매니페스트 기준으로 바뀐 조항만 적재/삭제 (중단된 적재 이어하기 포함)",
+    )
+    parser.add_argument(
+        "--migrate-collection",
+        action="store_true",
+        help="적재 없이 기존 컬렉션에 컬렉션 프로필(인덱스/양자화/on-disk/HNSW)만 적용",
+    )
+    parser.add_argument(
+        "--build-lexical-index",
+        action="store_true",
+        help="적재 없이 현재 컬렉션으로 하이브리드 검색용 어휘 색인만 다시 만들기",
+    )
+    parser.add_argument(
+        "--build-faiss-index",
+        action="store_true",
+        help="적재 없이 현재 컬렉션으로 로컬 FAISS 인덱스만 다시 만들기 (VECTOR_BACKEND=\"faiss\" 용)",
+    )
+    parser.add_argument(
+        "--build-section-index",
+        action="store_true",
+        help="적재 없이 현재 컬렉션으로 2단계 검색용 섹션 중심 벡터만 다시 만들기 (HIERARCHICAL_RETRIEVAL 용)",
+    )
+    parser.add_argument(
+        "--build-type-centroids",
+        action="store_true",
+        help="적재 없이 현재 컬렉션으로 보험유형 중심 벡터만 다시 만들기 (INSURANCE_CLASSIFIER=\"centroid\" 용)",
+    )
+    parser.add_argument(
+        "--type-centroids-seed",
+        type=Path,
+        help="--build-type-centroids 를 조항 대신 보험유형을 붙인 질문 JSONL ({\"question\", \"insurance_type\"}) 로",
+    )
+    args = parser.parse_args()
+    if args.migrate_collection:
+        migrate_collection()
+    elif args.build_lexical_index:
+        build_lexical_index()
+    elif args.build_faiss_index:
+        build_faiss_index()
+    elif args.build_section_index:
+        build_section_index()
+    elif args.build_type_centroids:
+        build_type_centroids(seed_path=args.type_centroids_seed)
+    else:
+        main(incremental=args.incremental)
@@ -0,0 +1,222 @@
+# manifest.py
+"""
+증분 적재용 매니페스트
+
+- 파일별 내용 해시 + 조항별 내용 해시를 JSONL 로그로 기록한다
+- 한 줄 = 적재가 끝난 파일 1개 (또는 삭제된 파일 1개), 나중 줄이 앞 줄을 덮어쓴다
+- 파일 단위로 append 되므로 중간에 죽어도 마지막으로 끝난 파일까지는 그대로 남는다
+"""
+import hashlib
+import json
+import os
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+# 포인트 ID 네임스페이스 (값이 바뀌면 모든 ID가 바뀌므로 고정)
+POINT_ID_NAMESPACE = uuid.UUID("6f1c1a4e-3b0e-5d1a-9a57-2f4d1c7be0a1")
+
+
+# ---------- Hash / ID ----------
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def source_key(source: str) -> str:
+    """
+    매니페스트/포인트 ID에 쓰는 파일 키
+    data_selected 위치가 바뀌어도 ID가 유지되도록 파일명만 사용
+    """
+    return Path(source).name
+
+
+def level_path(levels: Sequence[Optional[str]]) -> str:
+    """(level_1, level_2, level_3, level_4) 제목 → "관 > 조 >  > " 형태의 경로"""
+    return " > ".join(title or "" for title in levels)
+
+
+def clause_point_id(source: str, path: str, text_hash: str) -> str:
+    """(source, level path, 내용 해시) → 결정적 포인트 ID (UUIDv5)"""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{source_key(source)}\x1f{path}\x1f{text_hash}"))
+
+
+def chunk_point_id(parent_id: str, index: int, text_hash: str) -> str:
+    """긴 조항을 나눈 조각의 포인트 ID: (부모 조항 ID, 조각 번호, 조각 내용 해시)"""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{parent_id}\x1f{index}\x1f{text_hash}"))
+
+
+# ---------- Manifest ----------
+class IngestManifest:
+    """
+    파일별 적재 상태
+
+    files = {
+        "001_상해보험_가공.xml": {
+            "file_hash": "...",
+            "clauses": {point_id: content_hash, ...},
+            "path": "data_selected/001_상해보험_가공.xml",  # 적재할 때 metadata.source 로 쓴 경로
+        },
+    }
+
+    중복 제거로 여러 파일이 같은 대표 포인트를 가리킬 수 있으므로
+    포인트별 참조 파일 수를 함께 관리한다 (다른 파일이 쓰는 포인트는 지우면 안 됨)
+
+    settings: 포인트 ID / 내용을 바꾸는 적재 설정 (분할 토큰 예산 / overlap / 토크나이저 / 중복 제거, pipeline.ingest_settings)
+    헤더의 컬렉션 / 임베딩 모델 / 적재 설정이 다르면 기록을 버리고 invalidated = True
+    → 컬렉션에 남은 옛 포인트를 추적할 수 없으므로 호출하는 쪽이 컬렉션을 다시 만든다
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        collection_name: str,
+        embedding_model: str,
+        settings: Optional[Mapping[str, Any]] = None,
+    ):
+        self.path = Path(path)
+        self.collection_name = collection_name
+        self.embedding_model = embedding_model
+        self.settings = dict(settings or {})
+        self.invalidated = False
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._refs: Counter = Counter()
+        self._load()
+
+    # ----- 조회 -----
+    def is_current(self, key: str, file_hash: str) -> bool:
+        entry = self.files.get(key)
+        return entry is not None and entry["file_hash"] == file_hash
+
+    def clause_ids(self, key: str) -> Dict[str, str]:
+        entry = self.files.get(key)
+        return dict(entry["clauses"]) if entry else {}
+
+    def sources(self) -> List[str]:
+        return list(self.files.keys())
+
+    def is_shared(self, point_id: str, key: str) -> bool:
+        """key 말고 다른 파일도 이 포인트를 참조하는지"""
+        entry = self.files.get(key)
+        own = 1 if entry is not None and point_id in entry["clauses"] else 0
+        return self._refs[point_id] > own
+
+    def shared_sources(self) -> Dict[str, List[str]]:
+        """여러 파일이 참조하는 포인트 → 참조하는 파일 경로 목록 (지금까지 metadata.sources 에 쓴 목록)"""
+        shared: Dict[str, List[str]] = {}
+        for key, entry in self.files.items():
+            for point_id in entry["clauses"]:
+                if self._refs[point_id] > 1:
+                    shared.setdefault(point_id, []).append(entry.get("path", key))
+        return shared
+
+    # ----- 기록 -----
+    def mark_file_done(self, key: str, file_hash: str, clauses: Mapping[str, str], path: Optional[str] = None):
+        self._drop_refs(key)
+        self.files[key] = {"file_hash": file_hash, "clauses": dict(clauses), "path": path or key}
+        self._refs.update(clauses.keys())
+        self._append({"source": key, **self.files[key]})
+
+    def remove_file(self, key: str):
+        self._drop_refs(key)
+        if self.files.pop(key, None) is not None:
+            self._append({"source": key, "removed": True})
+
+    def reset(self):
+        """전체 재적재 시 호출: 기록을 비우고 헤더만 남긴다"""
+        self.files = {}
+        self._refs.clear()
+        self._rewrite()
+
+    # ----- 내부 -----
+    def _drop_refs(self, key: str):
+        entry = self.files.get(key)
+        if entry is None:
+            return
+        for point_id in entry["clauses"]:
+            self._refs[point_id] -= 1
+            if self._refs[point_id] <= 0:
+                del self._refs[point_id]
+
+    def _header(self) -> Dict[str, Any]:
+        return {
+            "manifest": 1,
+            "collection_name": self.collection_name,
+            "embedding_model": self.embedding_model,
+            "settings": self.settings,
+        }
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        if not lines:
+            return
+
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError:
+            header = {}
+        if (
+            header.get("collection_name") != self.collection_name
+            or header.get("embedding_model") != self.embedding_model
+            or header.get("settings", {}) != self.settings
+        ):
+            # 다른 컬렉션/모델/적재 설정용 기록이면 쓸 수 없으므로 비우고 처음부터 다시
+            print(f"[manifest] 컬렉션/임베딩 모델/적재 설정이 달라 매니페스트를 초기화합니다: {self.path}")
+            self.invalidated = True
+            self._rewrite()
+            return
+
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 기록 도중 죽어서 잘린 마지막 줄 → 해당 파일은 미완료로 간주
+                continue
+            if record.get("removed"):
+                self.files.pop(record["source"], None)
+            else:
+                self.files[record["source"]] = {
+                    "file_hash": record["file_hash"],
+                    "clauses": record["clauses"],
+                    "path": record.get("path", record["source"]),
+                }
+        for entry in self.files.values():
+            self._refs.update(entry["clauses"].keys())
+
+        # 잘린 줄이 남아 있거나 로그가 현재 상태보다 많이 길어졌으면 정리
+        if not lines[-1].endswith("\n") or len(lines) - 1 > 2 * max(len(self.files), 1):
+            self._rewrite()
+
+    def _append(self, record: Dict[str, Any]):
+        if not self.path.exists():
+            self._rewrite()
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self._header(), ensure_ascii=False) + "\n")
+            for key, entry in self.files.items():
+                f.write(json.dumps({"source": key, **entry}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
@@ -0,0 +1,577 @@
+# pipeline.py
+"""
+대용량 적재 파이프라인
+
+[XML 파싱/분할 (프로세스 풀)] → 큐 → [임베딩 (고정 크기 배치)] → 큐 → [Qdrant upsert (스레드 풀)]
+
+- 단계 사이 큐는 크기가 제한되어 있어 뒤 단계가 밀리면 앞 단계가 대기한다 (backpressure)
+- 단계별 처리량은 IngestReport로 집계된다
+- 매니페스트를 넘기면 증분 모드: 바뀐 파일의 새/변경 조항만 임베딩하고, 사라진 조항은 삭제한다
+- 토큰 예산을 넘는 조항은 항/호 경계로 나눠(chunking.py) 조각 단위로 적재한다
+- 중복 제거(dedup.py)를 켜면 같은 보험유형의 동일/거의 동일한 조항은 대표 1개만 임베딩한다
+"""
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointIdsList, PointStruct, SetPayload, SetPayloadOperation
+
+from .chunking import chunk_clause, tokenizer_name
+from .dedup import ClauseDeduplicator, minhash_signature
+from .manifest import (
+    IngestManifest,
+    chunk_point_id,
+    clause_point_id,
+    content_hash,
+    file_sha256,
+    level_path,
+    source_key,
+)
+from .preprocessing import ClauseRecord, iter_clauses_from_xml
+from source.config.settings import (
+    CHUNK_MAX_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+    COLLECTION_NAME,
+    INGEST_DEDUP,
+    INGEST_DEDUP_MIN_CHARS,
+    INGEST_DEDUP_THRESHOLD,
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_PARSE_WORKERS,
+    INGEST_QUEUE_SIZE,
+    INGEST_UPSERT_BATCH_SIZE,
+    INGEST_UPSERT_WORKERS,
+)
+
+_STOP = object()  # 큐 종료 신호
+
+
+# ---------- Report ----------
+class StageStats:
+    """단계별 처리량 집계 (여러 스레드에서 동시에 기록)"""
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.calls = 0
+        self.busy_time = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items: int, elapsed: float):
+        with self._lock:
+            self.items += items
+            self.calls += 1
+            self.busy_time += elapsed
+
+    def summary(self, wall_time: float) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "unit": self.unit,
+            "items": self.items,
+            "calls": self.calls,
+            "busy_time": self.busy_time,
+            "busy_throughput": self.items / self.busy_time if self.busy_time else 0.0,
+            "wall_throughput": self.items / wall_time if wall_time else 0.0,
+        }
+
+
+class IngestReport:
+    """파이프라인 실행 결과"""
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {
+            "parse": StageStats("parse", "docs"),
+            "embed": StageStats("embed", "docs"),
+            "upsert": StageStats("upsert", "points"),
+        }
+        self.succeeded_files: List[str] = []
+        self.skipped_files: List[str] = []  # 증분 모드: 변경 없음
+        self.failed_files: List[Tuple[str, str]] = []
+        self.removed_files: List[str] = []  # 증분 모드: 디렉토리에서 사라진 파일
+        self.deleted_points = 0
+        self.deduplicated = 0  # 대표 조항에 합쳐져 임베딩하지 않은 조항 수
+        self.wall_time = 0.0
+
+    @property
+    def total_docs(self) -> int:
+        return self.stages["upsert"].items
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_time": self.wall_time,
+            "total_docs": self.total_docs,
+            "succeeded_files": len(self.succeeded_files),
+            "skipped_files": len(self.skipped_files),
+            "failed_files": [{"path": p, "error": e} for p, e in self.failed_files],
+            "removed_files": self.removed_files,
+            "deleted_points": self.deleted_points,
+            "deduplicated": self.deduplicated,
+            "stages": [s.summary(self.wall_time) for s in self.stages.values()],
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"[적재 리포트] 총 {self.wall_time:.1f}s | "
+            f"성공 {len(self.succeeded_files)}개 파일 / 실패 {len(self.failed_files)}개 파일 / "
+            f"변경 없음 {len(self.skipped_files)}개 파일 | 삭제 {self.deleted_points:,} points | "
+            f"중복 제거 {self.deduplicated:,}개 조항"
+        ]
+        for s in self.stages.values():
+            info = s.summary(self.wall_time)
+            lines.append(
+                f"  {info['stage']:<6} {info['items']:>8,} {info['unit']} ({info['calls']:,}회) | "
+                f"busy {info['busy_time']:.1f}s | "
+                f"{info['busy_throughput']:.1f} {info['unit']}/s (busy) | "
+                f"{info['wall_throughput']:.1f} {info['unit']}/s (wall)"
+            )
+        return "\n".join(lines)
+
+
+# ---------- Stage 1: Parse (프로세스 풀에서 실행) ----------
+def _parse_file(
+    xml_path: str,
+    with_signatures: bool = False,
+    chunk_max_tokens: int = CHUNK_MAX_TOKENS,
+    chunk_overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> Tuple[List[ClauseRecord], List[str], List[str], List[Tuple[int, int, str, Any]], float]:
+    """
+    XML 1개 파싱 → (포인트 레코드 목록, 포인트 ID 목록, 내용 해시 목록, 조항 목록, 소요 시간)
+
+    토큰 예산을 넘는 조항은 조각 레코드 여러 개로 나뉜다 (짧은 조항의 ID는 그대로).
+    조항 목록 = 원래 조항마다 (첫 레코드 위치, 레코드 수, 조항 내용 해시, MinHash 서명 또는 None)
+    → 중복 제거는 조각이 아니라 조항 단위로 한다 (조각 하나만 대표로 바뀌면 부모 조항을 복원할 수 없음)
+    Document / metadata dict 대신 ClauseRecord 를 돌려줘서 직렬화 비용과 메모리를 줄인다
+    (스트리밍 파서를 써서 XML 트리/전체 텍스트를 통째로 들고 있지 않음)
+    """
+    start = time.perf_counter()
+    clauses, ids, hashes, units = [], [], [], []
+    for clause in iter_clauses_from_xml(xml_path):
+        text_hash = content_hash(clause.text)
+        point_id = clause_point_id(xml_path, level_path(clause.levels), text_hash)
+        pieces = chunk_clause(clause, point_id, chunk_max_tokens, chunk_overlap_tokens)
+        # 서명 계산도 워커 프로세스에서 해서 메인 스레드는 LSH 조회만 한다
+        signature = minhash_signature(clause.text) if with_signatures else None
+        units.append((len(ids), len(pieces), text_hash, signature))
+        if len(pieces) == 1:
+            clauses.append(clause)
+            ids.append(point_id)
+            hashes.append(text_hash)
+            continue
+        for index, piece in enumerate(pieces):
+            piece_hash = content_hash(piece.text)
+            clauses.append(piece)
+            ids.append(chunk_point_id(point_id, index, piece_hash))
+            hashes.append(piece_hash)
+    return clauses, ids, hashes, units, time.perf_counter() - start
+
+
+class _FileTracker:
+    """
+    파일별 남은 포인트 수 추적
+    파일의 모든 포인트가 upsert 되면 사라진 조항을 지우고 매니페스트에 완료로 기록한다
+
+    중복 제거로 다른 파일의 대표 포인트를 쓰는 조항은 그 포인트가 upsert 될 때까지 기다린다
+    그 대표 포인트의 metadata.sources 는 매니페스트에 완료로 기록하기 전에 쓴다
+    → 중간에 죽어도 --incremental 이 건너뛰는 파일은 sources 에 항상 들어가 있다
+
+    증분 모드에서는 이번 실행에서 모은 출처에 매니페스트에 기록된 출처 (건너뛴 파일) 를 합쳐서 쓴다
+    → 바뀌지 않아 파싱하지 않은 파일이 sources 에서 빠지지 않는다
+    바뀐 / 없어진 파일이 더 이상 쓰지 않는 대표 포인트도 그 파일을 뺀 목록으로 다시 쓴다
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        manifest: Optional[IngestManifest],
+        report: IngestReport,
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.manifest = manifest
+        self.report = report
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {}
+        self._owners: Dict[str, List[str]] = {}  # 아직 upsert 안 된 포인트 → 기다리는 파일들
+        self._info: Dict[str, Tuple[Optional[str], Dict[str, str], List[str], List[str], Optional[str]]] = {}
+        self._sources: Dict[str, List[str]] = {}  # 대표 포인트 → 지금까지 배정된 출처 파일 목록
+        self._sources_lock = threading.Lock()  # sources 쓰기 순서 보장 (늦게 쓴 목록이 항상 더 길다)
+        # 이전 실행까지의 대표 포인트 → 출처 파일 목록, 이번 실행에서 다시 파싱했거나 없어진 파일 (키)
+        self._stored = manifest.shared_sources() if manifest is not None else {}
+        self._settled: Set[str] = set()
+
+    def start(
+        self,
+        key: str,
+        file_hash: Optional[str],
+        clauses: Dict[str, str],
+        removed: List[str],
+        fresh_ids: List[str],
+        shared_ids: List[str],
+        shared_sources: Optional[Dict[str, List[str]]] = None,
+        path: Optional[str] = None,
+    ):
+        """
+        fresh_ids: 이 파일이 새로 upsert 할 포인트
+        shared_ids: 다른 (또는 같은) 파일의 대표 포인트를 쓰는 조항 → 아직 upsert 전이면 기다림
+        shared_sources: 그 대표 포인트 → 이 파일까지 포함한 출처 파일 목록 (끝날 때 metadata.sources 로)
+        path: 파일 경로 (metadata.source 와 같은 문자열, 매니페스트에 남겨서 다음 실행의 sources 에 씀)
+        """
+        with self._lock:
+            count = len(fresh_ids)
+            for point_id in fresh_ids:
+                self._owners.setdefault(point_id, []).append(key)
+            for point_id in shared_ids:
+                owners = self._owners.get(point_id)
+                if owners is not None:
+                    owners.append(key)
+                    count += 1
+            self._pending[key] = count
+            self._settled.add(key)
+            # 이전에 다른 파일과 함께 쓰던 대표 포인트 중 이번에 안 쓰게 된 것 → 이 파일을 빼고 다시 씀
+            released = [
+                point_id for point_id in (self.manifest.clause_ids(key) if self.manifest is not None else ())
+                if point_id in self._stored and point_id not in clauses
+            ]
+            self._info[key] = (file_hash, clauses, removed, list(shared_sources or ()) + released, path)
+            # 나중에 시작한 파일의 목록이 더 길다 (중복 제거는 메인 스레드에서 순서대로)
+            self._sources.update(shared_sources or {})
+        if count == 0:
+            self._finish(key)
+
+    def done(self, point_ids: List[str]):
+        counts: Counter = Counter()
+        with self._lock:
+            for point_id in point_ids:
+                counts.update(self._owners.pop(point_id, ()))
+            finished = []
+            for key, n in counts.items():
+                self._pending[key] -= n
+                if self._pending[key] == 0:
+                    finished.append(key)
+        for key in finished:
+            self._finish(key)
+
+    def _finish(self, key: str):
+        with self._lock:
+            self._pending.pop(key, None)
+            file_hash, clauses, removed, shared_ids, path = self._info.pop(key)
+
+        if shared_ids:
+            # 완료 기록 전에 대표 포인트의 출처 목록 갱신 (지금까지 모인 전체 목록 + 건너뛴 파일로 덮어씀)
+            self._write_sources(shared_ids)
+
+        # 새 포인트가 모두 들어간 뒤에 옛 포인트를 지운다 → 중간에 죽어도 검색 공백이 없다
+        if removed:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=removed),  # type: ignore
+                wait=True,
+            )
+        with self._lock:
+            self.report.deleted_points += len(removed)
+            if self.manifest is not None and file_hash is not None:
+                self.manifest.mark_file_done(key, file_hash, clauses, path)
+
+    def release(self, key: str):
+        """xml_files 에 없는 파일 → 그 파일이 함께 쓰던 대표 포인트의 출처 목록에서 뺀다 (매니페스트에서 지우기 전에)"""
+        with self._lock:
+            self._settled.add(key)
+            point_ids = [
+                point_id for point_id in (self.manifest.clause_ids(key) if self.manifest is not None else ())
+                if point_id in self._stored
+            ]
+        if point_ids:
+            self._write_sources(point_ids)
+
+    def _write_sources(self, point_ids: List[str]):
+        with self._sources_lock:
+            with self._lock:
+                sources = {}
+                for point_id in point_ids:
+                    current = self._sources.get(point_id, [])
+                    current_keys = {source_key(source) for source in current}
+                    kept = [
+                        source for source in self._stored.get(point_id, ())
+                        if source_key(source) not in self._settled and source_key(source) not in current_keys
+                    ]
+                    sources[point_id] = current + kept
+            _write_shared_sources(self.client, self.collection_name, sources)
+
+
+# ---------- Pipeline ----------
+def ingest_settings(
+    chunk_max_tokens: int = CHUNK_MAX_TOKENS,
+    chunk_overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+    dedup: bool = INGEST_DEDUP,
+) -> Dict[str, Any]:
+    """
+    포인트 ID / 내용을 바꾸는 적재 설정 → 매니페스트 헤더에 기록 (값이 바뀌면 증분 적재 대신 전체 적재)
+    run_ingest_pipeline 에 넘기는 값과 같게 맞춘다
+    """
+    return {
+        "chunk_max_tokens": chunk_max_tokens,
+        "chunk_overlap_tokens": chunk_overlap_tokens if chunk_max_tokens > 0 else 0,
+        "tokenizer": tokenizer_name() if chunk_max_tokens > 0 else None,
+        "dedup": [INGEST_DEDUP_THRESHOLD, INGEST_DEDUP_MIN_CHARS] if dedup else False,
+    }
+
+
+def run_ingest_pipeline(
+    xml_files: Iterable[Path],
+    client: QdrantClient,
+    embeddings: Embeddings,
+    collection_name: str = COLLECTION_NAME,
+    manifest: Optional[IngestManifest] = None,
+    parse_workers: int = INGEST_PARSE_WORKERS,
+    embed_batch_size: int = INGEST_EMBED_BATCH_SIZE,
+    upsert_batch_size: int = INGEST_UPSERT_BATCH_SIZE,
+    upsert_workers: int = INGEST_UPSERT_WORKERS,
+    queue_size: int = INGEST_QUEUE_SIZE,
+    dedup: bool = INGEST_DEDUP,
+    chunk_max_tokens: int = CHUNK_MAX_TOKENS,
+    chunk_overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> IngestReport:
+    """
+    XML 파일들을 병렬 파싱 → 배치 임베딩 → 동시 upsert 로 적재
+
+    컬렉션은 미리 만들어져 있어야 한다 (get_vectorstore 참고).
+    포인트 ID는 (source, level path, 내용 해시)로 결정되므로 다시 돌려도 중복이 생기지 않는다.
+
+    manifest가 주어지면 증분 모드로 동작한다:
+    - 파일 해시가 같은 파일은 건너뛴다 (이전 실행에서 끝난 파일 → 이어서 적재)
+    - 바뀐 파일은 새/변경 조항만 임베딩하고, 사라진 조항의 포인트는 삭제한다
+    - xml_files에 없는 파일의 포인트는 모두 삭제한다 (다른 파일이 함께 쓰는 대표 포인트는 남김)
+
+    chunk_max_tokens 를 넘는 조항은 조각으로 나눠 적재한다 (0이면 나누지 않음).
+    dedup=True 이면 이번 실행에서 파싱한 조항끼리 중복을 제거한다.
+    증분 모드에서는 바뀐 파일만 파싱하므로, 변경 없는 파일의 조항과는 묶이지 않는다.
+
+    파일 단위 파싱 오류는 리포트에 기록하고 계속 진행하며,
+    임베딩/upsert 오류는 파이프라인을 정리한 뒤 다시 발생시킨다.
+    """
+    report = IngestReport()
+    tracker = _FileTracker(client, collection_name, manifest, report)
+    deduplicator = ClauseDeduplicator() if dedup else None
+    embed_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    upsert_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    errors: List[BaseException] = []
+
+    # ----- Stage 2: Embed -----
+    def embed_worker():
+        pending: List[PointStruct] = []
+        while True:
+            item = embed_queue.get()
+            if item is _STOP:
+                break
+            if errors:
+                continue  # 실패 이후에는 큐만 비워서 앞 단계가 멈추지 않게 한다
+            ids, clauses = item
+            texts = [clause.text for clause in clauses]
+            try:
+                start = time.perf_counter()
+                vectors = embeddings.embed_documents(texts)
+                report.stages["embed"].record(len(texts), time.perf_counter() - start)
+            except BaseException as e:
+                errors.append(e)
+                continue
+
+            pending.extend(
+                PointStruct(
+                    id=point_id,
+                    vector=vector,
+                    # metadata dict는 여기서 처음 만든다 (벡터스토어 경계)
+                    payload={"page_content": clause.text, "metadata": clause.to_metadata()},
+                )
+                for point_id, clause, vector in zip(ids, clauses, vectors)
+            )
+            while len(pending) >= upsert_batch_size:
+                upsert_queue.put(pending[:upsert_batch_size])
+                pending = pending[upsert_batch_size:]
+
+        if pending and not errors:
+            upsert_queue.put(pending)
+        for _ in range(upsert_workers):
+            upsert_queue.put(_STOP)
+
+    # ----- Stage 3: Upsert -----
+    def upsert_worker():
+        while True:
+            batch = upsert_queue.get()
+            if batch is _STOP:
+                break
+            if errors:
+                continue
+            try:
+                start = time.perf_counter()
+                client.upsert(
+                    collection_name=collection_name,
+                    points=batch,
+                    wait=True,
+                )
+                report.stages["upsert"].record(len(batch), time.perf_counter() - start)
+                tracker.done([point.id for point in batch])
+            except BaseException as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=embed_worker, name="ingest-embed", daemon=True)]
+    threads += [
+        threading.Thread(target=upsert_worker, name=f"ingest-upsert-{i}", daemon=True)
+        for i in range(upsert_workers)
+    ]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+
+    # ----- Stage 1: Parse (현재 스레드에서 프로세스 풀 관리) -----
+    buffer: List[Tuple[str, ClauseRecord]] = []  # (id, 조항)
+    seen_keys = set()
+
+    def flush(force: bool = False):
+        nonlocal buffer
+        while len(buffer) >= embed_batch_size or (force and buffer):
+            batch, buffer = buffer[:embed_batch_size], buffer[embed_batch_size:]
+            # 큐가 가득 차면 여기서 대기 → 파싱 결과 수거도 멈춤 (backpressure)
+            embed_queue.put(tuple(list(column) for column in zip(*batch)))
+
+    try:
+        files = iter(xml_files)
+        in_flight: Dict[Any, Tuple[Path, Optional[str]]] = {}
+        with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+
+            def submit_next():
+                for path in files:
+                    path = Path(path)
+                    key = source_key(str(path))
+                    seen_keys.add(key)
+                    file_hash = None
+                    if manifest is not None:
+                        file_hash = file_sha256(str(path))
+                        if manifest.is_current(key, file_hash):
+                            report.skipped_files.append(str(path))
+                            continue
+                    in_flight[pool.submit(
+                        _parse_file, str(path), dedup, chunk_max_tokens, chunk_overlap_tokens
+                    )] = (path, file_hash)
+                    return
+
+            # 동시에 파싱 중인 파일 수를 제한해서 메모리 사용량을 묶어둔다
+            for _ in range(parse_workers * 2):
+                submit_next()
+
+            while in_flight and not errors:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, file_hash = in_flight.pop(future)
+                    try:
+                        clauses, ids, hashes, units, elapsed = future.result()
+                    except Exception as e:
+                        print(f"❌ Error processing {path.name}: {e}")
+                        report.failed_files.append((str(path), str(e)))
+                    else:
+                        report.stages["parse"].record(len(clauses), elapsed)
+                        report.succeeded_files.append(str(path))
+                        key = source_key(str(path))
+                        previous = manifest.clause_ids(key) if manifest is not None else {}
+
+                        # 조항 → 대표 조항의 포인트들 (중복 제거를 끄면 자기 자신)
+                        own = [True] * len(ids)
+                        shared: List[str] = []
+                        shared_sources: Dict[str, List[str]] = {}
+                        current: Dict[str, str] = {}
+                        merged = 0
+                        for first, count, text_hash, signature in units:
+                            members = ids[first:first + count]
+                            if deduplicator is not None:
+                                rep_members = deduplicator.assign(members, clauses[first], text_hash, signature)
+                                if rep_members is not members:
+                                    own[first:first + count] = [False] * count
+                                    shared.extend(rep_members)
+                                    group_sources = deduplicator.group_sources(rep_members)
+                                    shared_sources.update((point_id, group_sources) for point_id in rep_members)
+                                    current.update((point_id, text_hash) for point_id in rep_members)
+                                    merged += 1
+                                    continue
+                            current.update(zip(members, hashes[first:first + count]))
+                        fresh = [i for i, point_id in enumerate(ids) if own[i] and point_id not in previous]
+                        removed = [
+                            point_id for point_id in previous
+                            if point_id not in current
+                            and not (manifest is not None and manifest.is_shared(point_id, key))
+                        ]
+                        report.deduplicated += merged
+                        print(
+                            f"✅ {len(clauses)} documents parsed for {path.name} "
+                            f"(새로 적재 {len(fresh)}개, 중복 조항 {merged}개, 삭제 {len(removed)}개)"
+                        )
+                        tracker.start(
+                            key, file_hash, current, removed, [ids[i] for i in fresh], shared, shared_sources,
+                            str(path),
+                        )
+                        buffer.extend((ids[i], clauses[i]) for i in fresh)
+                        flush()
+                    submit_next()
+
+            for future in in_flight:
+                future.cancel()
+        if not errors:
+            flush(force=True)
+    finally:
+        embed_queue.put(_STOP)
+        for t in threads:
+            t.join()
+        report.wall_time = time.perf_counter() - wall_start
+
+    if errors:
+        raise errors[0]
+
+    # 디렉토리에서 사라진 파일 → 포인트 삭제
+    if manifest is not None:
+        for key in manifest.sources():
+            if key in seen_keys:
+                continue
+            stale_ids = [
+                point_id for point_id in manifest.clause_ids(key)
+                if not manifest.is_shared(point_id, key)
+            ]
+            tracker.release(key)
+            if stale_ids:
+                client.delete(
+                    collection_name=collection_name,
+                    points_selector=PointIdsList(points=stale_ids),  # type: ignore
+                    wait=True,
+                )
+            manifest.remove_file(key)
+            report.removed_files.append(key)
+            report.deleted_points += len(stale_ids)
+            print(f"🗑️ {key}: 파일이 없어져 {len(stale_ids)}개 포인트 삭제")
+        report.wall_time = time.perf_counter() - wall_start
+
+    return report
+
+
+def _write_shared_sources(
+    client: QdrantClient,
+    collection_name: str,
+    shared: Dict[str, List[str]],
+    batch_size: int = 256,
+):
+    """대표 포인트마다 metadata.sources 설정 (요청 수를 줄이려고 batch_update_points로 묶음)"""
+    operations = [
+        SetPayloadOperation(
+            set_payload=SetPayload(payload={"sources": sources}, points=[point_id], key="metadata")
+        )
+        for point_id, sources in shared.items()
+    ]
+    for i in range(0, len(operations), batch_size):
+        client.batch_update_points(
+            collection_name=collection_name,
+            update_operations=operations[i:i + batch_size],
+            wait=True,
+        )
@@ -1,7 +1,9 @@
 # preprocessing.py
 import re
+import sys
+from bisect import bisect_left
 import xml.etree.ElementTree as ET
-from typing import List, Tuple, Optional
+from typing import Any, Dict, Iterator, List, Tuple, Optional
 from pathlib import Path
 from langchain_core.documents import Document
 import unicodedata
@@ -41,6 +43,28 @@ def load_xml_text(xml_path: str) -> str:
     return "\n".join(texts)
 
 
+def iter_xml_lines(xml_path: str) -> Iterator[str]:
+    """
+    iterparse로 <cn> 노드를 하나씩 읽어 정규화된 줄 단위로 반환
+    normalize_text(load_xml_text(...)).splitlines() 와 같은 결과를,
+    트리 전체를 메모리에 올리지 않고 (읽은 노드는 바로 비움) 만든다
+    """
+    root = None
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+
+        if elem.tag == "cn" and elem.text:
+            for line in elem.text.splitlines():
+                line = line.strip()
+                if line:
+                    yield line
+            # 처리 끝난 노드는 루트에서 떼어내서 메모리 해제
+            root.clear()  # type: ignore
+
+
 # ---------- Normalize ----------
 def normalize_text(text: str) -> str:
     lines = [line.strip() for line in text.splitlines()]
@@ -83,121 +107,343 @@ def split_with_pattern(
 
     return result
 
+# ---------- Clause Tokenizer ----------
+LEVEL_KEYS = ("level_1", "level_2", "level_3", "level_4")
+
+# 모든 헤더 패턴의 공통 앞부분 ("제 N")
+# ⚠️ 헤더는 모두 "제"로 시작한다는 전제 (_hides_higher_header 참고)
+_HEADER_PREFIX = r"제\s*\d+\s*"
+
+
+def _combine_level_patterns(patterns) -> re.Pattern:
+    r"""
+    level 패턴들을 공통 앞부분 + 이름 붙은 분기 하나로 합친다
+    "(제\s*\d+\s*편[^\n]*)", "(제\s*\d+\s*장[^\n]*)" → "제\s*\d+\s*(?:(?P<level_1>편[^\n]*)|(?P<level_2>장[^\n]*))"
+    (분기마다 "제"를 다시 시도하는 단순 alternation 보다 훨씬 빠름)
+    """
+    branches = []
+    for level, pattern in patterns.items():
+        head = "(" + _HEADER_PREFIX
+        if not (pattern.pattern.startswith(head) and pattern.pattern.endswith(")")):
+            raise ValueError(f"헤더 패턴 형식이 다릅니다: {level} = {pattern.pattern}")
+        branches.append(f"(?P<{level}>{pattern.pattern[len(head):-1]})")
+    return re.compile(_HEADER_PREFIX + "(?:" + "|".join(branches) + ")")
+
+
+# 모든 level 패턴을 하나로 합친 패턴 (한 번만 훑기 위함)
+COMBINED_PATTERNS = {
+    structure_type: _combine_level_patterns(patterns)
+    for structure_type, patterns in LEVEL_PATTERNS.items()
+}
+
+# (level 깊이, 헤더 start, 헤더 end)
+HeaderToken = Tuple[int, int, int]
+# (level별 제목 또는 None, 본문 start, 본문 end, 최하위 헤더가 있는지)
+ClauseSpan = Tuple[Tuple[Optional[str], ...], int, int, bool]
+
+
+def _hides_higher_header(
+    text: str, start: int, end: int, higher: List[re.Pattern], endpos: int
+) -> bool:
+    """
+    하위 헤더 매치 [start, end) 안에서 상위 헤더가 시작하는지
+    (예: "제3조(제2편 참고)" 처럼 괄호 안에 상위 헤더가 있는 경우)
+    계층별 split 은 상위 헤더로 먼저 자르므로, 이런 경우 한 번에 훑은 결과와 달라진다
+    """
+    q = text.find("제", start + 1, end)
+    while q != -1:
+        if any(p.match(text, q, endpos) for p in higher):
+            return True
+        q = text.find("제", q + 1, end)
+    return False
+
+
+def _tokenize_nested(
+    text: str, level_patterns: List[re.Pattern], pos: int, endpos: int
+) -> List[HeaderToken]:
+    """
+    계층별로 상위 본문 범위 안에서만 하위 헤더를 찾는 방식 (기존 split_with_pattern 중첩과 동일)
+    부분 문자열을 만들지 않고 pos/endpos 로 범위만 지정한다
+    """
+    tokens: List[HeaderToken] = []
+
+    def walk(level: int, start: int, end: int):
+        matches = list(level_patterns[level].finditer(text, start, end))
+        if level == len(level_patterns) - 1:
+            tokens.extend((level, m.start(), m.end()) for m in matches)
+            return
+        if not matches:
+            walk(level + 1, start, end)
+            return
+        for i, m in enumerate(matches):
+            tokens.append((level, m.start(), m.end()))
+            walk(level + 1, m.end(), matches[i + 1].start() if i + 1 < len(matches) else end)
+
+    walk(0, pos, endpos)
+    return tokens
+
+
+def tokenize_headers(
+    text: str, structure_type: str, pos: int = 0, endpos: Optional[int] = None
+) -> List[HeaderToken]:
+    """
+    text[pos:endpos] 에서 모든 level 헤더를 한 번에 찾는다 (합친 패턴으로 1회 스캔)
+
+    하위 헤더 매치 안에 상위 헤더가 숨어 있는 드문 경우에만
+    계층별 스캔(_tokenize_nested)으로 다시 찾아 기존 결과와 똑같이 맞춘다
+    """
+    endpos = len(text) if endpos is None else endpos
+    level_patterns = list(LEVEL_PATTERNS[structure_type].values())
+    level_index = {level: i for i, level in enumerate(LEVEL_PATTERNS[structure_type])}
+
+    tokens: List[HeaderToken] = []
+    for m in COMBINED_PATTERNS[structure_type].finditer(text, pos, endpos):
+        level = level_index[m.lastgroup]  # type: ignore
+        start, end = m.span()
+        # 대부분의 헤더는 안에 "제"가 없으므로 find 한 번으로 끝난다
+        if (
+            level
+            and text.find("제", start + 1, end) != -1
+            and _hides_higher_header(text, start, end, level_patterns[:level], endpos)
+        ):
+            return _tokenize_nested(text, level_patterns, pos, endpos)
+        tokens.append((level, start, end))
+    return tokens
+
+
+def clause_spans(
+    text: str, tokens: List[HeaderToken], depth: int, pos: int, endpos: int
+) -> List[ClauseSpan]:
+    """
+    헤더 토큰 → 조항 span 목록 (level stack 으로 계층을 따라가며 본문은 offset만 계산)
+    제목은 헤더마다 한 번만 잘라서 하위 조항들이 같은 문자열을 공유한다
+
+    split_with_pattern 중첩과 같은 규칙:
+    - 어떤 level 헤더가 하나라도 있으면, 첫 헤더 이전 텍스트는 버림
+    - 하나도 없으면 범위 전체가 제목 없는(None) 한 구간
+    """
+    spans: List[ClauseSpan] = []
+    # level별 토큰 인덱스 (정렬됨) → 범위 안의 헤더를 bisect 로 바로 찾는다
+    level_positions: List[List[int]] = [[] for _ in range(depth)]
+    for i, token in enumerate(tokens):
+        level_positions[token[0]].append(i)
+
+    def walk(level: int, lo: int, hi: int, start: int, end: int, titles: Tuple):
+        # tokens[lo:hi] = [start, end) 안에 있는 level 이상 헤더
+        positions = level_positions[level]
+        heads = positions[bisect_left(positions, lo):bisect_left(positions, hi)]
+        is_leaf = level == depth - 1
+
+        if not heads:
+            if is_leaf:
+                spans.append((titles + (None,), start, end, False))
+            else:
+                walk(level + 1, lo, hi, start, end, titles + (None,))
+            return
+
+        for j, i in enumerate(heads):
+            nxt = heads[j + 1] if j + 1 < len(heads) else hi
+            body_end = tokens[nxt][1] if nxt < hi else end
+            title = text[tokens[i][1]:tokens[i][2]].strip()
+            if is_leaf:
+                spans.append((titles + (title,), tokens[i][2], body_end, True))
+            else:
+                walk(level + 1, i + 1, nxt, tokens[i][2], body_end, titles + (title,))
+
+    walk(0, 0, len(tokens), pos, endpos, ())
+    return spans
+
+
 # =========================================================
 # 5. Document Builder
 # =========================================================
+# ---------- Clause Record ----------
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+class ClauseRecord:
+    """
+    적재용 조항 1개 (Document 대신 쓰는 가벼운 레코드)
+
+    - 조항마다 metadata dict를 만들지 않고 level 제목 tuple 하나만 들고 있는다
+    - 제목 / 보험유형 / source 문자열은 intern 해서 같은 값이면 객체 하나를 공유한다
+      (프로세스 사이로 넘어와 unpickle 될 때도 다시 intern)
+    - Document / metadata dict 는 벡터스토어에 넣기 직전에 to_document() / to_metadata()로 만든다
+    - 긴 조항을 나눈 조각(chunking.py)이면 chunk = (부모 조항 ID, 조각 번호, 부모 본문 내 시작 위치)
+    """
+
+    __slots__ = ("text", "levels", "insurance_type", "source", "chunk")
+
+    def __init__(
+        self,
+        text: str,
+        levels: Tuple[Optional[str], ...],
+        insurance_type: str,
+        source: str,
+        chunk: Optional[Tuple[str, int, int]] = None,
+    ):
+        self.text = text
+        self.levels = tuple(_intern(title) for title in levels)
+        self.insurance_type = sys.intern(insurance_type)
+        self.source = sys.intern(source)
+        self.chunk = chunk
+
+    def __reduce__(self):
+        return ClauseRecord, (self.text, self.levels, self.insurance_type, self.source, self.chunk)
+
+    def to_metadata(self) -> Dict[str, Any]:
+        levels = self.levels
+        metadata = {
+            "insurance_type": self.insurance_type,
+            "level_1": levels[0],
+            "level_2": levels[1],
+            "level_3": levels[2],
+            "level_4": levels[3],
+            "source": self.source,
+        }
+        if self.chunk is not None:
+            metadata["parent_id"], metadata["chunk_index"], metadata["chunk_start"] = self.chunk
+        return metadata
+
+    def to_document(self) -> Document:
+        return Document(page_content=self.text, metadata=self.to_metadata())
+
+
+# ---------- Builder ----------
+def _build_region_clauses(
+    text: str,
+    structure_type: str,
+    insurance_type: str,
+    xml_path: str,
+    pos: int = 0,
+    endpos: Optional[int] = None,
+) -> List[ClauseRecord]:
+    """
+    text[pos:endpos] → 조항 레코드 목록
+    (🚗 자동차보험: 편 / 장 / 절 / 조, 📘 일반 보험: 관 / 조)
+    헤더 토큰화 → span 계산 → 마지막에 한 번만 잘라서 레코드 생성
+    """
+    endpos = len(text) if endpos is None else endpos
+    depth = len(LEVEL_PATTERNS[structure_type])
+    tokens = tokenize_headers(text, structure_type, pos, endpos)
+
+    padding = (None,) * (len(LEVEL_KEYS) - depth)
+
+    clauses: List[ClauseRecord] = []
+    for titles, body_start, body_end, has_leaf_header in clause_spans(text, tokens, depth, pos, endpos):
+        content = text[body_start:body_end].strip()
+        # 최하위(조) 헤더가 있는 조항은 본문이 비어도 유지 (기존 동작과 동일)
+        if not has_leaf_header and not content:
+            continue
+        clauses.append(ClauseRecord(content, titles + padding, insurance_type, xml_path))
+
+    return clauses
+
+
+def _fallback_clause(text: str, insurance_type: str, xml_path: str) -> ClauseRecord:
+    """
+    ❗ 최후 방어: 어떤 패턴으로도 나눠지지 않으면 파일 전체를 1개 조항으로
+    """
+    return ClauseRecord(text, (None,) * len(LEVEL_KEYS), insurance_type, xml_path)
+
+
+def build_clauses_from_text(text: str, insurance_type: str, xml_path: str) -> List[ClauseRecord]:
+    """정규화된 약관 텍스트 → 조항 레코드 목록"""
+    structure_type = resolve_structure_type(insurance_type)
+
+    clauses = _build_region_clauses(text, structure_type, insurance_type, xml_path)
+
+    if not clauses:
+        clauses.append(_fallback_clause(text, insurance_type, xml_path))
+
+    return clauses
+
+
+def build_documents_from_text(text: str, insurance_type: str, xml_path: str) -> List[Document]:
+    """정규화된 약관 텍스트 → 조항 Document 목록"""
+    return [clause.to_document() for clause in build_clauses_from_text(text, insurance_type, xml_path)]
+
+
 def build_documents_from_xml(xml_path: str) -> List[Document]:
     raw_text = load_xml_text(xml_path)
     text = normalize_text(raw_text)
 
+    insurance_type = extract_insurance_type(xml_path)
+
+    return build_documents_from_text(text, insurance_type, xml_path)
+
+
+# ---------- Streaming Builder ----------
+STREAM_SCAN_LINES = 256  # 몇 줄을 모을 때마다 최상위 헤더를 찾을지
+_HEADER_RESCAN = 256     # 줄 경계에 걸친 헤더(예: "제\n1관")를 놓치지 않도록 다시 훑는 길이
+
+
+def iter_clauses_from_xml(xml_path: str) -> Iterator[ClauseRecord]:
+    """
+    build_documents_from_xml 의 스트리밍 + 레코드 버전 (to_document() 결과는 동일)
+
+    - <cn> 노드를 iterparse로 읽으면서 최상위 구간(관 / 편)이 닫힐 때마다 그 구간의 조항을 바로 반환
+    - 메모리에는 아직 닫히지 않은 최상위 구간 1개만 유지
+    - 최상위 헤더가 하나도 없는 파일은 split_with_pattern 과 마찬가지로 전체가 한 구간이 되므로
+      끝까지 모은 뒤 처리한다
+    """
     insurance_type = extract_insurance_type(xml_path)
     structure_type = resolve_structure_type(insurance_type)
-    patterns = LEVEL_PATTERNS[structure_type]
-
-    documents: List[Document] = []
-
-    # -----------------------------------------------------
-    # 🚗 자동차보험: 편 / 장 / 절 / 조
-    # -----------------------------------------------------
-    if structure_type == "automobile":
-        for l1_title, l1_body in split_with_pattern(text, patterns["level_1"]):
-            for l2_title, l2_body in split_with_pattern(l1_body, patterns["level_2"]):
-                for l3_title, l3_body in split_with_pattern(l2_body, patterns["level_3"]):
-                    jo_parts = patterns["level_4"].split(l3_body)
-
-                    if len(jo_parts) > 1:
-                        for i in range(1, len(jo_parts), 2):
-                            l4_title = jo_parts[i].strip()
-                            l4_body = jo_parts[i + 1].strip()
-
-                            documents.append(
-                                Document(
-                                    page_content=l4_body,
-                                    metadata={
-                                        "insurance_type": insurance_type,
-                                        "level_1": l1_title,
-                                        "level_2": l2_title,
-                                        "level_3": l3_title,
-                                        "level_4": l4_title,
-                                        "source": xml_path,
-                                    },
-                                )
-                            )
-                    else:
-                        content = l3_body.strip()
-                        if content:
-                            documents.append(
-                                Document(
-                                    page_content=content,
-                                    metadata={
-                                        "insurance_type": insurance_type,
-                                        "level_1": l1_title,
-                                        "level_2": l2_title,
-                                        "level_3": l3_title,
-                                        "level_4": None,
-                                        "source": xml_path,
-                                    },
-                                )
-                            )
-
-    # -----------------------------------------------------
-    # 📘 일반 보험: 관 / 조
-    # -----------------------------------------------------
-    else:
-        for l1_title, l1_body in split_with_pattern(text, patterns["level_1"]):
-            jo_parts = patterns["level_2"].split(l1_body)
-
-            if len(jo_parts) > 1:
-                for i in range(1, len(jo_parts), 2):
-                    l2_title = jo_parts[i].strip()
-                    l2_body = jo_parts[i + 1].strip()
-
-                    documents.append(
-                        Document(
-                            page_content=l2_body,
-                            metadata={
-                                "insurance_type": insurance_type,
-                                "level_1": l1_title,
-                                "level_2": l2_title,
-                                "level_3": None,
-                                "level_4": None,
-                                "source": xml_path,
-                            },
-                        )
-                    )
-            else:
-                content = l1_body.strip()
-                if content:
-                    documents.append(
-                        Document(
-                            page_content=content,
-                            metadata={
-                                "insurance_type": insurance_type,
-                                "level_1": l1_title,
-                                "level_2": None,
-                                "level_3": None,
-                                "level_4": None,
-                                "source": xml_path,
-                            },
-                        )
-                    )
-
-    # -----------------------------------------------------
-    # ❗ 최후 방어
-    # -----------------------------------------------------
-    if not documents:
-        documents.append(
-            Document(
-                page_content=text,
-                metadata={
-                    "insurance_type": insurance_type,
-                    "level_1": None,
-                    "level_2": None,
-                    "level_3": None,
-                    "level_4": None,
-                    "source": xml_path,
-                },
-            )
-        )
-
-    return documents
\ No newline at end of file
+    top_pattern = LEVEL_PATTERNS[structure_type]["level_1"]
+
+    buffer = ""         # 아직 닫히지 않은 최상위 구간 (첫 헤더 전이면 앞부분 전체)
+    header_end = 0      # buffer 맨 앞 헤더의 끝 위치 (첫 헤더 전이면 0)
+    in_section = False  # buffer가 최상위 헤더로 시작하는지
+    pending: List[str] = []
+    emitted = False
+
+    def close_sections() -> Iterator[ClauseRecord]:
+        """모아 둔 줄을 buffer에 붙이고, 새 헤더가 나타나 닫힌 구간의 조항을 반환"""
+        nonlocal buffer, header_end, in_section
+        scan_from = max(header_end, len(buffer) - _HEADER_RESCAN)
+        pending_text = "\n".join(pending)
+        pending.clear()
+        buffer = f"{buffer}\n{pending_text}" if buffer else pending_text
+
+        while True:
+            match = top_pattern.search(buffer, scan_from)
+            if match is None:
+                return
+            if in_section:
+                yield from _build_region_clauses(
+                    buffer, structure_type, insurance_type, xml_path, 0, match.start()
+                )
+            # 첫 헤더 이전 텍스트는 split_with_pattern 과 동일하게 버림
+            buffer = buffer[match.start():]
+            header_end = match.end() - match.start()
+            in_section = True
+            scan_from = header_end
+
+    for line in iter_xml_lines(xml_path):
+        pending.append(line)
+        if len(pending) >= STREAM_SCAN_LINES:
+            for clause in close_sections():
+                emitted = True
+                yield clause
+
+    if pending:
+        for clause in close_sections():
+            emitted = True
+            yield clause
+
+    # 파일 끝: 마지막 구간 (헤더가 하나도 없었으면 전체가 제목 없는 한 구간)
+    for clause in _build_region_clauses(buffer, structure_type, insurance_type, xml_path):
+        emitted = True
+        yield clause
+
+    if not emitted:
+        # 최후 방어는 파일 전체 텍스트가 필요하므로 (드문 경우) 다시 읽는다
+        text = normalize_text(load_xml_text(xml_path))
+        yield _fallback_clause(text, insurance_type, xml_path)
+
+
+def iter_documents_from_xml(xml_path: str) -> Iterator[Document]:
+    """iter_clauses_from_xml 결과를 Document로 (build_documents_from_xml 과 동일한 Document)"""
+    for clause in iter_clauses_from_xml(xml_path):
+        yield clause.to_document()
@@ -1,24 +1,49 @@
 # source/vectorstore.py
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Optional
+
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
 from langchain_qdrant import QdrantVectorStore
 from langchain_huggingface import HuggingFaceEmbeddings
 
-
-COLLECTION_NAME = "insurance_docs"
+from source.config.settings import (
+    COLLECTION_NAME,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_DIM,
+    EMBEDDING_MODEL,
+    FAISS_HNSW_M,
+    FAISS_INDEX_DIR,
+    FAISS_INDEX_KIND,
+    LEXICAL_INDEX_DIR,
+    QDRANT_COLLECTION_PROFILE,
+    TYPE_CENTROIDS_PATH,
+)
+from source.vectorstore.collection_profile import apply_collection_profile, create_collection
+from source.vectorstore import faiss_index, lexical_index, section_index, type_centroids
+from source.vectorstore.embedding_cache import CachedEmbeddings, EmbeddingCache
 
 
 def get_qdrant_client():
     return QdrantClient(url="http://localhost:6333")
 
 
-def get_embeddings():
-    return HuggingFaceEmbeddings(
-        model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+def get_embeddings(use_cache: bool = True):
+    embeddings = HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL
     )  # type: ignore
+    if not use_cache:
+        return embeddings
+
+    # 같은 텍스트는 다시 계산하지 않음 (재적재, 새 컬렉션 적재 시 대부분 캐시 히트)
+    return CachedEmbeddings(
+        embeddings,
+        EmbeddingCache(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL, EMBEDDING_DIM),
+    )
 
 
-def get_vectorstore(recreate: bool = False) -> QdrantVectorStore:
+def get_vectorstore(recreate: bool = False, profile=QDRANT_COLLECTION_PROFILE) -> QdrantVectorStore:
     client = get_qdrant_client()
     embeddings = get_embeddings()
 
@@ -26,17 +51,61 @@ def get_vectorstore(recreate: bool = False) -> QdrantVectorStore:
     collections = [c.name for c in client.get_collections().collections]
 
     if COLLECTION_NAME not in collections or recreate:
-        # 컬렉션 생성
-        client.recreate_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config=VectorParams(
-                size=384, # 임베딩 차원 수
-                distance=Distance.COSINE,
-            ),
-        )
+        # 컬렉션 생성 (payload 인덱스 / 양자화 / on-disk / HNSW 는 프로필대로)
+        create_collection(client, COLLECTION_NAME, EMBEDDING_DIM, profile)
 
     return QdrantVectorStore(
         client=client,
         collection_name=COLLECTION_NAME,
         embedding=embeddings,
     )
+
+
+def migrate_collection(profile=QDRANT_COLLECTION_PROFILE):
+    """기존 컬렉션을 다시 적재하지 않고 프로필에 맞춤"""
+    client = get_qdrant_client()
+    for change in apply_collection_profile(client, COLLECTION_NAME, profile):
+        print(f"[migrate] {COLLECTION_NAME}: {change}")
+
+
+def build_lexical_index(client=None) -> int:
+    """컬렉션 전체 → 하이브리드 검색용 어휘(BM25) 색인 재생성 → 색인한 문서 수"""
+    client = client or get_qdrant_client()
+    n_docs = lexical_index.build_from_collection(client, COLLECTION_NAME, LEXICAL_INDEX_DIR)
+    print(f"[lexical] {n_docs} documents 어휘 색인 완료 → {LEXICAL_INDEX_DIR}")
+    return n_docs
+
+
+def build_faiss_index(client=None, kind: str = FAISS_INDEX_KIND) -> int:
+    """컬렉션 전체 (벡터 + payload) → 로컬 FAISS 인덱스 재생성 (VECTOR_BACKEND="faiss" 용) → 문서 수"""
+    client = client or get_qdrant_client()
+    n_docs = faiss_index.build_from_collection(client, COLLECTION_NAME, FAISS_INDEX_DIR, kind, FAISS_HNSW_M)
+    print(f"[faiss] {n_docs} documents {kind} 인덱스 완료 → {FAISS_INDEX_DIR}")
+    return n_docs
+
+
+def build_section_index(client=None) -> int:
+    """컬렉션 전체 → 2단계 검색용 섹션(약관 파일별 level_1) 중심 벡터 컬렉션 갱신 → 섹션 수"""
+    client = client or get_qdrant_client()
+    n_sections = section_index.build_from_collection(client, COLLECTION_NAME)
+    print(f"[sections] {n_sections} sections 중심 벡터 완료 → {section_index.section_collection_name(COLLECTION_NAME)}")
+    return n_sections
+
+
+def build_type_centroids(client=None, seed_path: Optional[Path] = None) -> Dict[str, int]:
+    """
+    보험유형 중심 벡터 파일 재생성 (INSURANCE_CLASSIFIER="centroid" 용) → 보험유형별 벡터 수
+    seed_path 가 없으면 컬렉션 전체 조항, 있으면 그 JSONL ({"question", "insurance_type"} 한 줄씩) 의 질문으로
+    """
+    if seed_path is None:
+        counts = type_centroids.build_from_collection(client or get_qdrant_client(), COLLECTION_NAME, TYPE_CENTROIDS_PATH)
+    else:
+        examples = defaultdict(list)
+        with open(seed_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    examples[record["insurance_type"]].append(record["question"])
+        counts = type_centroids.build_from_examples(get_embeddings(), examples, TYPE_CENTROIDS_PATH)
+    print(f"[type_centroids] 보험유형 {len(counts)}개 중심 벡터 완료 ({counts}) → {TYPE_CENTROIDS_PATH}")
+    return counts
@@ -0,0 +1,299 @@
+# vectorstore/async_retriever.py
+"""
+retriever.py 검색의 비동기 버전 (AsyncQdrantClient, 비동기 QA 체인용)
+
+요청 조립 / RRF / 다양화 / 조각 병합 계산은 retriever.py 의 함수를 그대로 쓰고, Qdrant 왕복만 await 한다.
+→ 동기 검색과 결과가 같고, 한 이벤트 루프가 Qdrant 응답을 기다리는 동안 다른 질문을 처리할 수 있다.
+
+- 필터 검색 + 필터 없는 검색은 항상 query_batch_points 한 번 (RETRIEVAL_BATCH_FALLBACK=True 와 같음)
+- 질문 여러 개 (일괄 QA) 도 검색 요청 하나 (asearch_many), 조각 조회도 scroll 한 번 (aexpand_parent_clauses_many)
+- 추측 검색 (aspeculative_search → asearch_with_candidates) 은 분류 LLM 응답을 기다리는 태스크와 동시에
+- VECTOR_BACKEND="faiss" 면 왕복이 없는 프로세스 안 검색이므로 동기 검색을 스레드에서 실행
+- 공용 벡터스토어 / 어휘 색인 / 섹션 인덱스 확인은 동기 경로와 같이 쓴다 (처음 한 번은 동기 호출 → warm_up() 권장)
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from config.settings import DIVERSIFY, SPECULATIVE_CANDIDATES
+from vectorstore.faiss_index import FaissVectorStore
+from vectorstore.lexical_index import InsuranceTypes, LexicalIndex, PointId, type_names
+from vectorstore.registry import get_registry
+from vectorstore.retriever import (
+    _batch_documents,
+    _diversify_with_vectors,
+    _expand_with_chunks,
+    _fetch_ids,
+    _fuse_ids,
+    _fused_documents,
+    _hybrid_index,
+    _parent_filter,
+    _parent_ids,
+    _query_request,
+    _result_sizes,
+    _section_requests,
+    _sections_enabled,
+    _to_documents,
+    filter_candidates,
+    search_with_candidates,
+    search_with_fallback,
+    speculative_search,
+)
+from vectorstore.section_index import Section, section_collection_name, section_of
+
+
+async def _aselect_sections(conditions: List[Tuple[List[float], InsuranceTypes]]) -> List[Optional[List[Section]]]:
+    """retriever._select_sections 의 비동기 버전 ((질문 벡터, 보험유형) 조건 여러 개를 요청 1번에)"""
+    if not _sections_enabled():
+        return [None] * len(conditions)
+    registry = get_registry()
+    responses = await registry.async_client.query_batch_points(
+        collection_name=section_collection_name(registry.collection_name),
+        requests=_section_requests(conditions),
+    )
+    return [[section_of(point.payload or {}) for point in response.points] for response in responses]
+
+
+async def _afinish(
+    docs: List[Document],
+    vector: List[float],
+    question: Optional[str],
+    insurance_type: InsuranceTypes,
+    index: Optional[LexicalIndex],
+    k: int,
+    limit: int,
+    diversify: bool,
+) -> List[Document]:
+    """임베딩 검색 후보 → (하이브리드면 RRF) → (diversify 면 중복 접기 + MMR) → 최종 k개"""
+    registry = get_registry()
+    vectors: Optional[Dict[PointId, np.ndarray]] = None
+    if index is not None:
+        fused, by_id = _fuse_ids(docs, question, insurance_type, index, limit if diversify else k)  # type: ignore[arg-type]
+        # 어휘 전용 조항 본문 + (diversify 면) 다양화용 벡터를 ID 조회 한 번에
+        ids = _fetch_ids(fused, by_id, diversify)
+        records = await registry.async_client.retrieve(
+            collection_name=registry.collection_name,
+            ids=ids,
+            with_payload=True,
+            with_vectors=diversify,
+        ) if ids else []
+        docs, vectors = _fused_documents(fused, by_id, records, diversify)
+    if not diversify:
+        return docs
+    if len(docs) <= 1:
+        return docs[:k]
+    if vectors is not None:
+        return _diversify_with_vectors(docs, vectors, vector, k)
+    records = await registry.async_client.retrieve(
+        collection_name=registry.collection_name,
+        ids=[d.metadata["_id"] for d in docs],
+        with_payload=False,
+        with_vectors=True,
+    )
+    vectors: Dict[PointId, np.ndarray] = {record.id: np.asarray(record.vector, dtype=np.float32) for record in records}
+    return _diversify_with_vectors(docs, vectors, vector, k)
+
+
+async def asearch_with_fallback(
+    vector: List[float],
+    insurance_type: InsuranceTypes,
+    question: Optional[str] = None,
+    diversify: bool = DIVERSIFY,
+) -> Tuple[List[Document], Optional[List[Document]]]:
+    """
+    search_with_fallback(batch=True) 의 비동기 버전
+    → (필터 검색 결과, 필터 검색이 비었을 때만 필터 없는 검색 결과, 아니면 None)
+    """
+    return (await asearch_many([vector], [insurance_type], [question], diversify))[0]
+
+
+async def asearch_many(
+    vectors: List[List[float]],
+    insurance_types: List[InsuranceTypes],
+    questions: Optional[List[Optional[str]]] = None,
+    diversify: bool = DIVERSIFY,
+) -> List[Tuple[List[Document], Optional[List[Document]]]]:
+    """
+    질문 여러 개의 asearch_with_fallback 을 query_batch_points 요청 하나로 (질문 순서대로 결과)
+    요청은 보험유형(필터)별로 모아서 보낸다 → Qdrant 가 같은 필터의 검색을 묶어서 처리
+    필터 없는 검색의 후처리 (ID 조회) 는 필터 검색 결과가 빈 질문만
+    """
+    questions = questions or [None] * len(vectors)
+    registry = get_registry()
+    if isinstance(registry.vectorstore, FaissVectorStore):
+        return await asyncio.to_thread(lambda: [
+            search_with_fallback(vector, insurance_type, True, question, diversify)
+            for vector, insurance_type, question in zip(vectors, insurance_types, questions)
+        ])
+
+    indexes = [_hybrid_index(question) for question in questions]
+    sizes = [_result_sizes(index, diversify) for index in indexes]
+    # 질문별 (필터 검색, 필터 없는 검색) 조건 → 같은 보험유형(들)끼리 (필터 없는 검색은 맨 뒤)
+    conditions = [
+        (i, type_)
+        for i, insurance_type in enumerate(insurance_types)
+        for type_ in ([insurance_type, None] if insurance_type else [None])
+    ]
+    conditions.sort(key=lambda condition: (condition[1] is None, sorted(type_names(condition[1]))))
+    sections = await _aselect_sections([(vectors[i], type_) for i, type_ in conditions])
+    requests = [
+        _query_request(vectors[i], type_, sizes[i][1], selected)
+        for (i, type_), selected in zip(conditions, sections)
+        if selected != []
+    ]
+    responses = (
+        await registry.async_client.query_batch_points(collection_name=registry.collection_name, requests=requests)
+        if requests
+        else []
+    )
+    # (질문 번호, 필터 여부) → 후처리 전 후보
+    candidates = {
+        (i, type_ is not None): docs for (i, type_), docs in zip(conditions, _batch_documents(sections, responses))
+    }
+
+    async def finish_all(keys: List[Tuple[int, bool]]) -> Dict[Tuple[int, bool], List[Document]]:
+        """조건별 후처리 (어휘 전용 ID / 벡터 조회) 를 동시에"""
+        finished = await asyncio.gather(*(
+            _afinish(
+                candidates[(i, filtered)],
+                vectors[i],
+                questions[i],
+                insurance_types[i] if filtered else None,
+                indexes[i],
+                *sizes[i],
+                diversify,
+            )
+            for i, filtered in keys
+        ))
+        return dict(zip(keys, finished))
+
+    # 필터 검색 (보험유형이 없는 질문은 필터 없는 검색) 먼저, 필터 검색이 빈 질문만 필터 없는 검색 후처리
+    results = await finish_all([(i, bool(insurance_type)) for i, insurance_type in enumerate(insurance_types)])
+    results.update(await finish_all([
+        (i, False) for i, insurance_type in enumerate(insurance_types) if insurance_type and not results[(i, True)]
+    ]))
+    return [
+        (results[(i, True)], results.get((i, False))) if insurance_type else (results[(i, False)], None)
+        for i, insurance_type in enumerate(insurance_types)
+    ]
+
+
+async def _asearch_by_vector(vector: List[float], insurance_type: InsuranceTypes, limit: int) -> List[Document]:
+    """retriever.search_by_vector 의 비동기 버전 (Qdrant, 2단계 검색이면 섹션 선택 요청 1번 더)"""
+    registry = get_registry()
+    sections = (await _aselect_sections([(vector, insurance_type)]))[0]
+    if sections == []:
+        return []
+    request = _query_request(vector, insurance_type, limit, sections)
+    response = await registry.async_client.query_points(
+        collection_name=registry.collection_name,
+        query=request.query,
+        query_filter=request.filter,
+        search_params=request.params,
+        limit=request.limit,
+        with_payload=True,
+        with_vectors=False,
+    )
+    return _to_documents(response.points)
+
+
+async def aspeculative_search(vector: List[float], limit: int = SPECULATIVE_CANDIDATES) -> List[Document]:
+    """retriever.speculative_search 의 비동기 버전 (분류 LLM 을 await 하는 동안 태스크로 돌린다)"""
+    if isinstance(get_registry().vectorstore, FaissVectorStore):
+        return await asyncio.to_thread(speculative_search, vector, limit)
+    return await _asearch_by_vector(vector, None, limit)
+
+
+async def asearch_with_candidates(
+    vector: List[float],
+    insurance_type: InsuranceTypes,
+    candidates: List[Document],
+    question: Optional[str] = None,
+    diversify: bool = DIVERSIFY,
+    fetched: int = SPECULATIVE_CANDIDATES,
+) -> Tuple[List[Document], Optional[List[Document]], bool]:
+    """
+    retriever.search_with_candidates 의 비동기 버전
+    → (필터 검색 결과, 필터 검색이 비었을 때만 필터 없는 검색 결과 또는 None, 필터 검색을 다시 보냈는지)
+    """
+    if isinstance(get_registry().vectorstore, FaissVectorStore):
+        return await asyncio.to_thread(
+            search_with_candidates, vector, insurance_type, candidates, question, diversify, fetched
+        )
+    index = _hybrid_index(question)
+    k, limit = _result_sizes(index, diversify)
+    if not insurance_type:
+        return await _afinish(candidates[:limit], vector, question, None, index, k, limit, diversify), None, False
+
+    filtered = filter_candidates(candidates, insurance_type, limit, fetched)
+    searched = filtered is None
+    if filtered is None:
+        filtered = await _asearch_by_vector(vector, insurance_type, limit)
+    docs = await _afinish(filtered, vector, question, insurance_type, index, k, limit, diversify)
+    if docs:
+        return docs, None, searched
+    return docs, await _afinish(candidates[:limit], vector, question, None, index, k, limit, diversify), searched
+
+
+async def asearch_after_speculation(
+    speculation: "Optional[asyncio.Task[List[Document]]]",
+    vector: List[float],
+    insurance_type: InsuranceTypes,
+    question: Optional[str] = None,
+    diversify: bool = DIVERSIFY,
+) -> Tuple[List[Document], Optional[List[Document]], Optional[str]]:
+    """retriever.search_after_speculation 의 비동기 버전 (speculation = aspeculative_search 태스크)"""
+    if speculation is not None:
+        try:
+            candidates = await speculation
+        except Exception as e:
+            print(f"[WARN] 추측 검색 실패 → 일반 검색: {e}")
+        else:
+            docs, unfiltered_docs, searched = await asearch_with_candidates(
+                vector, insurance_type, candidates, question, diversify
+            )
+            return docs, unfiltered_docs, "miss" if searched else "hit"
+    docs, unfiltered_docs = await asearch_with_fallback(vector, insurance_type, question=question, diversify=diversify)
+    return docs, unfiltered_docs, None
+
+
+async def aexpand_parent_clauses(docs: List[Document]) -> List[Document]:
+    """retriever.expand_parent_clauses 의 비동기 버전 (공용 컬렉션)"""
+    return (await aexpand_parent_clauses_many([docs]))[0]
+
+
+async def aexpand_parent_clauses_many(docs_list: List[List[Document]]) -> List[List[Document]]:
+    """검색 결과 여러 개의 조각 → 부모 조항 복원 (조각 조회는 모아서 한 번)"""
+    parent_ids = _parent_ids([d for docs in docs_list for d in docs])
+    if not parent_ids:
+        return docs_list
+
+    vectorstore = get_registry().vectorstore
+    if isinstance(vectorstore, FaissVectorStore):
+        chunks = vectorstore.parent_chunks(parent_ids)
+    else:
+        chunks = await _ascroll_parent_chunks(parent_ids)
+    return [_expand_with_chunks(docs, chunks) for docs in docs_list]
+
+
+async def _ascroll_parent_chunks(parent_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """retriever._scroll_parent_chunks 의 비동기 버전 (공용 컬렉션)"""
+    registry = get_registry()
+    chunks: Dict[str, List[Dict[str, Any]]] = {}
+    offset = None
+    while True:
+        points, offset = await registry.async_client.scroll(
+            collection_name=registry.collection_name,
+            scroll_filter=_parent_filter(parent_ids),
+            limit=256,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        for point in points:
+            chunks.setdefault(point.payload["metadata"]["parent_id"], []).append(point.payload)  # type: ignore
+        if offset is None:
+            break
+    return chunks
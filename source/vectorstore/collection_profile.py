@@ -0,0 +1,157 @@
+# vectorstore/collection_profile.py
+"""
+Qdrant 컬렉션 프로필
+
+settings.QDRANT_COLLECTION_PROFILE 같은 dict 하나로 컬렉션 설정을 선언한다.
+
+{
+    "payload_indexes": {"metadata.insurance_type": "keyword", ...},   # 필터 필드 인덱스
+    "quantization": {"type": "int8", "quantile": 0.99, "always_ram": True},  # None 이면 양자화 안 함
+    "rescore": True, "oversampling": 2.0,  # 양자화 검색 후 원본 벡터로 다시 점수 계산
+    "on_disk": True,                       # 원본 벡터를 디스크(mmap)에
+    "on_disk_payload": True,
+    "hnsw": {"m": 16, "ef_construct": 128},
+}
+
+- create_collection: 새 컬렉션을 프로필대로 생성
+- apply_collection_profile: 이미 있는 컬렉션을 다시 적재하지 않고 프로필에 맞춤 (마이그레이션)
+- search_params: 검색 시 넘길 SearchParams (rescore / oversampling)
+
+⚠️ 로컬 모드(QdrantClient(path=...) / ":memory:")는 payload 인덱스, 양자화, HNSW를 무시한다 (항상 전체 탐색)
+"""
+from typing import Any, Dict, List, Mapping, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# 프로필 키가 없을 때 쓰는 값 = 프로필 도입 전 동작 (인덱스/양자화 없음, 메모리 저장)
+DEFAULT_PROFILE: Dict[str, Any] = {
+    "payload_indexes": {},
+    "quantization": None,
+    "rescore": False,
+    "oversampling": None,
+    "on_disk": False,
+    "on_disk_payload": False,
+    "hnsw": {},
+}
+
+
+def _resolve(profile: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    resolved = dict(DEFAULT_PROFILE)
+    resolved.update(profile or {})
+    unknown = set(resolved) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f"알 수 없는 컬렉션 프로필 키: {sorted(unknown)}")
+    return resolved
+
+
+def _quantization_config(profile: Dict[str, Any]) -> Optional[models.ScalarQuantization]:
+    quantization = profile["quantization"]
+    if not quantization:
+        return None
+    if quantization.get("type", "int8") != "int8":
+        raise ValueError(f"지원하지 않는 양자화 방식: {quantization.get('type')} (int8 만 지원)")
+    return models.ScalarQuantization(
+        scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8,
+            quantile=quantization.get("quantile"),
+            always_ram=quantization.get("always_ram"),
+        )
+    )
+
+
+def _hnsw_config(profile: Dict[str, Any]) -> Optional[models.HnswConfigDiff]:
+    hnsw = profile["hnsw"]
+    return models.HnswConfigDiff(**hnsw) if hnsw else None
+
+
+def create_collection(
+    client: QdrantClient,
+    collection_name: str,
+    dim: int,
+    profile: Optional[Mapping[str, Any]] = None,
+):
+    """프로필대로 컬렉션 생성 (있으면 지우고 새로 만듦) + payload 인덱스"""
+    resolved = _resolve(profile)
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(
+            size=dim,
+            distance=models.Distance.COSINE,
+            on_disk=resolved["on_disk"] or None,
+        ),
+        hnsw_config=_hnsw_config(resolved),
+        quantization_config=_quantization_config(resolved),
+        on_disk_payload=resolved["on_disk_payload"] or None,
+    )
+    _ensure_payload_indexes(client, collection_name, resolved, existing={})
+
+
+def apply_collection_profile(
+    client: QdrantClient,
+    collection_name: str,
+    profile: Optional[Mapping[str, Any]] = None,
+) -> List[str]:
+    """
+    기존 컬렉션 → 프로필에 맞게 설정 변경 (포인트는 그대로, 인덱스/세그먼트는 Qdrant가 백그라운드에서 재구성)
+    반환: 적용한 변경 목록
+    ⚠️ 양자화를 끄는 것 (quantization=None) 은 되돌리지 않는다 → 필요하면 다시 적재
+    """
+    resolved = _resolve(profile)
+    info = client.get_collection(collection_name)
+    changes: List[str] = []
+
+    vectors_diff = models.VectorParamsDiff(on_disk=resolved["on_disk"])
+    hnsw = _hnsw_config(resolved)
+    quantization = _quantization_config(resolved)
+    client.update_collection(
+        collection_name=collection_name,
+        vectors_config={"": vectors_diff},  # 이름 없는 기본 벡터
+        hnsw_config=hnsw,
+        quantization_config=quantization,
+        collection_params=models.CollectionParamsDiff(on_disk_payload=resolved["on_disk_payload"]),
+    )
+    changes.append(f"on_disk={resolved['on_disk']}, on_disk_payload={resolved['on_disk_payload']}")
+    if hnsw is not None:
+        changes.append(f"hnsw={resolved['hnsw']}")
+    if quantization is not None:
+        changes.append(f"quantization={resolved['quantization']}")
+
+    changes += _ensure_payload_indexes(client, collection_name, resolved, existing=info.payload_schema or {})
+    return changes
+
+
+def _ensure_payload_indexes(
+    client: QdrantClient,
+    collection_name: str,
+    profile: Dict[str, Any],
+    existing: Mapping[str, Any],
+) -> List[str]:
+    created = []
+    for field_name, schema in profile["payload_indexes"].items():
+        if field_name in existing:
+            continue
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=models.PayloadSchemaType(schema),
+            wait=True,
+        )
+        created.append(f"payload index {field_name} ({schema})")
+    return created
+
+
+def search_params(profile: Optional[Mapping[str, Any]] = None) -> Optional[models.SearchParams]:
+    """양자화 컬렉션 검색 옵션 (양자화 점수로 후보를 넉넉히 뽑고 원본 벡터로 다시 점수 계산)"""
+    resolved = _resolve(profile)
+    if not resolved["quantization"]:
+        return None
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(
+            rescore=resolved["rescore"],
+            oversampling=resolved["oversampling"],
+        )
+    )
@@ -0,0 +1,84 @@
+# vectorstore/diversify.py
+"""
+검색 후보 다양화: 근접 중복 접기 + MMR (maximal marginal relevance)
+
+여러 보험사 약관 파일에 거의 같은 표준 조항이 들어 있어서, 상위 검색 결과가 같은 조항의 사본으로 채워지곤 한다.
+후보를 넉넉히 가져온 뒤
+1) 앞 순위 후보와 코사인 유사도가 duplicate_similarity 이상인 후보는 앞 후보에 접고
+2) 남은 후보에서 MMR 로 질문 관련도와 서로 다름을 함께 보며 k개를 고른다.
+후보 수(수십 개)만큼의 유사도 행렬을 한 번에 계산하므로 반복문은 선택 개수만큼만 돈다.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def collapse_duplicates(similarity: np.ndarray, threshold: float) -> Tuple[List[int], List[int]]:
+    """
+    후보 간 유사도 행렬 [n,n] (순위 순) → (남길 후보, 후보별 접힌 대상 후보 번호 (-1 = 남김))
+    각 후보는 자기보다 앞 순위에서 남긴 후보 중 가장 비슷한 것과 threshold 이상이면 그 후보에 접힌다
+    """
+    n = len(similarity)
+    kept: List[int] = []
+    merged_into = [-1] * n
+    for j in range(n):
+        if kept:
+            row = similarity[j, kept]
+            best = int(np.argmax(row))
+            if row[best] >= threshold:
+                merged_into[j] = kept[best]
+                continue
+        kept.append(j)
+    return kept, merged_into
+
+
+def mmr_select(relevance: np.ndarray, similarity: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """
+    질문 관련도 [n] + 후보 간 유사도 [n,n] → MMR 로 고른 후보 번호 (선택 순서)
+    점수 = lambda_mult * 관련도 - (1 - lambda_mult) * 이미 고른 후보와의 최대 유사도
+    """
+    n = len(relevance)
+    if n == 0 or k <= 0:
+        return []
+    first = int(np.argmax(relevance))
+    selected = [first]
+    chosen = np.zeros(n, dtype=bool)
+    chosen[first] = True
+    max_similarity = similarity[first].copy()
+    while len(selected) < min(k, n):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[chosen] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        chosen[best] = True
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
+
+
+def select_diverse(
+    query_vector: np.ndarray,
+    vectors: np.ndarray,
+    k: int,
+    lambda_mult: float,
+    duplicate_similarity: float,
+) -> Tuple[List[int], List[int]]:
+    """
+    질문 벡터 + 후보 벡터 [n,d] (검색 순위 순) → (고른 후보 번호 k개 이하, 후보별 접힌 대상 (-1 = 접히지 않음))
+    """
+    if not len(vectors):
+        return [], []
+    vectors = normalize_rows(vectors)
+    # 관련도 순서는 검색 순위(하이브리드면 RRF 순위)를 따르고, 값의 크기는 질문과의 코사인 분포를 쓴다
+    # (임베딩 검색만이면 순위 = 코사인 순서이므로 코사인 그대로)
+    relevance = np.sort(vectors @ normalize_rows(query_vector))[::-1]
+    similarity = vectors @ vectors.T
+    kept, merged_into = collapse_duplicates(similarity, duplicate_similarity)
+    kept_array = np.array(kept)
+    picked = mmr_select(relevance[kept_array], similarity[np.ix_(kept_array, kept_array)], k, lambda_mult)
+    return [kept[i] for i in picked], merged_into
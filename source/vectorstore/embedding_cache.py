@@ -0,0 +1,239 @@
+# vectorstore/embedding_cache.py
+"""
+임베딩 디스크 캐시
+(모델명, 정규화된 텍스트 해시) → 벡터
+
+<cache_dir>/<모델명>/
+    meta.json     {"model_name": ..., "dim": 384}
+    index.bin     16바이트 텍스트 해시를 행 순서대로 이어 붙인 파일 (i번째 해시 = vectors i번째 행)
+    vectors.f32   float32 [capacity, dim] memory-mapped 행렬
+
+- 행은 추가만 된다: 벡터를 먼저 쓰고 flush 한 뒤 index에 해시를 붙이고 fsync 하므로,
+  중간에 죽어도 index에 있는 행은 항상 온전하다
+- 죽거나 디스크가 차서 index 끝에 16바이트가 안 되는 조각이 남으면 읽을 때 무시하고,
+  다음 추가 전에 잘라낸다 (조각 뒤에 붙이면 이후 해시가 전부 엉뚱한 행을 가리킴)
+- 적재(ingest)와 앱이 같은 캐시를 동시에 써도 되도록 쓰기는 파일 잠금(fcntl) 안에서 한다
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None  # type: ignore
+
+HASH_BYTES = 16
+INITIAL_CAPACITY = 1024
+
+
+def normalize_for_cache(text: str) -> str:
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.sha256(normalize_for_cache(text).encode("utf-8")).digest()[:HASH_BYTES]
+
+
+class EmbeddingCache:
+    """모델 1개에 대한 memory-mapped 벡터 캐시"""
+
+    def __init__(self, cache_dir: Path, model_name: str, dim: int):
+        self.model_name = model_name
+        self.dim = dim
+        self.dir = Path(cache_dir) / re.sub(r"[^0-9A-Za-z._-]+", "_", model_name)
+        self.index_path = self.dir / "index.bin"
+        self.vectors_path = self.dir / "vectors.f32"
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._rows: Dict[bytes, int] = {}
+        self._count = 0
+        self._vectors: Optional[np.memmap] = None
+        self._open()
+
+    # ----- 조회 / 저장 -----
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, digests: Sequence[bytes]) -> Tuple[np.ndarray, List[int]]:
+        """
+        digests → (벡터 행렬 [n, dim], 캐시에 없는 위치 목록)
+        없는 위치의 행은 0으로 채워진다
+        """
+        out = np.zeros((len(digests), self.dim), dtype=np.float32)
+        missing: List[int] = []
+        with self._lock:
+            rows = [self._rows.get(d) for d in digests]
+            if None in rows and self._sync():
+                # 다른 프로세스가 그 사이 추가한 행이 있으면 다시 조회
+                rows = [self._rows.get(d) for d in digests]
+            hit_pos = [i for i, row in enumerate(rows) if row is not None]
+            missing = [i for i, row in enumerate(rows) if row is None]
+            if hit_pos:
+                out[hit_pos] = self._vectors[[rows[i] for i in hit_pos]]  # type: ignore
+            self.hits += len(hit_pos)
+            self.misses += len(missing)
+        return out, missing
+
+    def put(self, digests: Sequence[bytes], vectors: np.ndarray):
+        with self._lock, self._file_lock():
+            self._sync()
+            new = [(d, v) for d, v in zip(digests, vectors) if d not in self._rows]
+            # 같은 배치 안의 중복 제거
+            new = list({d: v for d, v in new}.items())
+            if not new:
+                return
+
+            self._ensure_capacity(self._count + len(new))
+            start = self._count
+            self._vectors[start:start + len(new)] = np.asarray([v for _, v in new], dtype=np.float32)  # type: ignore
+            self._vectors.flush()  # type: ignore
+
+            with open(self.index_path, "ab") as f:
+                f.truncate(start * HASH_BYTES)  # 끝에 남은 쓰다 만 조각 제거 → 해시 i = 행 i 유지
+                f.write(b"".join(d for d, _ in new))
+                f.flush()
+                os.fsync(f.fileno())
+            for offset, (d, _) in enumerate(new):
+                self._rows[d] = start + offset
+            self._count = start + len(new)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": self._count, "hits": self.hits, "misses": self.misses}
+
+    # ----- 내부 -----
+    def _open(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        meta_path = self.dir / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("dim") != self.dim:
+                raise ValueError(
+                    f"임베딩 캐시 차원이 다릅니다: {meta_path} (캐시 {meta.get('dim')}, 요청 {self.dim})"
+                )
+        else:
+            meta_path.write_text(
+                json.dumps({"model_name": self.model_name, "dim": self.dim}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+
+        with self._file_lock():
+            if not self.vectors_path.exists():
+                self._resize_file(INITIAL_CAPACITY)
+            self.index_path.touch()
+            self._sync()
+
+    def _sync(self) -> bool:
+        """다른 프로세스가 추가한 행까지 읽어 들인다 → 새 행이 있었는지 (끝의 16바이트 미만 조각은 무시)"""
+        size = self.index_path.stat().st_size
+        count = size // HASH_BYTES
+        grew = False
+        if count > self._count:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._count * HASH_BYTES)
+                data = f.read((count - self._count) * HASH_BYTES)
+            data = data[:len(data) - len(data) % HASH_BYTES]  # 읽는 사이 잘려 나간 조각
+            for i in range(0, len(data), HASH_BYTES):
+                self._rows[data[i:i + HASH_BYTES]] = self._count + i // HASH_BYTES
+            self._count += len(data) // HASH_BYTES
+            grew = len(data) > 0
+        self._map()
+        return grew
+
+    def _map(self):
+        capacity = self.vectors_path.stat().st_size // (self.dim * 4)
+        if self._vectors is None or self._vectors.shape[0] != capacity:
+            self._vectors = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+            )
+
+    def _ensure_capacity(self, rows: int):
+        capacity = self._vectors.shape[0]  # type: ignore
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        self._vectors.flush()  # type: ignore
+        self._vectors = None
+        self._resize_file(capacity)
+        self._map()
+
+    def _resize_file(self, capacity: int):
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+
+    def _file_lock(self):
+        return _FileLock(self.dir / ".lock")
+
+
+class _FileLock:
+    """프로세스 간 쓰기 잠금 (fcntl 이 없는 환경에서는 아무것도 하지 않음)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, "a")
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)  # type: ignore
+            self._file.close()
+            self._file = None
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings 앞단 캐시
+    캐시에 없는 텍스트만 모아서 원래 모델로 한 번에 임베딩한다
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        digests = [text_digest(t) for t in texts]
+        vectors, missing = self.cache.get(digests)
+
+        if missing:
+            # 배치 안에서 같은 텍스트는 한 번만 계산
+            first: Dict[bytes, int] = {}
+            for i in missing:
+                first.setdefault(digests[i], i)
+            computed = np.asarray(
+                self.embeddings.embed_documents([texts[i] for i in first.values()]),
+                dtype=np.float32,
+            )
+            self.cache.put(list(first.keys()), computed)
+            by_digest = dict(zip(first.keys(), computed))
+            for i in missing:
+                vectors[i] = by_digest[digests[i]]
+
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        digest = text_digest(text)
+        vectors, missing = self.cache.get([digest])
+        if not missing:
+            return vectors[0].tolist()
+
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        self.cache.put([digest], vector[None, :])
+        return vector.tolist()
@@ -0,0 +1,325 @@
+# vectorstore/faiss_index.py
+"""
+로컬 FAISS 벡터 인덱스 (Qdrant 서버 없이 프로세스 안에서 검색)
+
+적재가 끝난 Qdrant 컬렉션의 벡터 / payload 를 그대로 옮겨 만든다 (build_from_collection).
+단일 노드 배포나 테스트 / 벤치마크에서 settings.VECTOR_BACKEND = "faiss" 로 쓴다.
+
+<index_dir>/
+    meta.json             {"version", "kind", "dim", "n_docs", "types", "collection_name"}
+    type_<i>.faiss        보험유형 i 의 서브 인덱스 (코사인 = 정규화 벡터 내적)
+    type_<i>_docs.npy     uint32 서브 인덱스 행 → 문서 번호
+    payloads.jsonl        문서 번호 순 {"id": 포인트 ID, "payload": Qdrant payload}
+    payload_offsets.npy   int64 [N+1] payloads.jsonl 의 줄 시작 위치
+    parents.json          {parent_id: [문서 번호]} (긴 조항 조각 → 부모 조항 복원용)
+
+- 보험유형별로 서브 인덱스를 나누므로 필터 검색은 다른 유형 벡터를 전혀 보지 않는다
+- 인덱스는 faiss.IO_FLAG_MMAP 으로, payload 는 필요한 줄만 os.pread 로 읽는다
+- kind: "flat" (정확, 기본) / "ivf" (IVF-Flat, 문서가 적은 유형은 flat) / "hnsw"
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from qdrant_client import QdrantClient
+
+from .lexical_index import InsuranceTypes, type_names
+
+INDEX_VERSION = 2  # 2: ivf 에 direct map 포함 (후보 벡터 복원용)
+INDEX_KINDS = ("flat", "ivf", "hnsw")
+IVF_MIN_POINTS_PER_LIST = 39  # faiss k-means 권장 학습 데이터 수 (리스트당)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _make_index(kind: str, vectors: np.ndarray, hnsw_m: int) -> faiss.Index:
+    dim = vectors.shape[1]
+    if kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+    else:
+        nlist = min(int(4 * np.sqrt(len(vectors))), len(vectors) // IVF_MIN_POINTS_PER_LIST)
+        if kind == "ivf" and nlist > 1:
+            index = faiss.IndexIVFFlat(faiss.IndexFlatIP(dim), dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.make_direct_map()  # 행 번호 → 벡터 복원 (reconstruct)
+        else:
+            index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    return index
+
+
+class FaissIndexBuilder:
+    """포인트를 하나씩 넣고 write() 로 디렉토리에 저장"""
+
+    def __init__(self, dim: int, kind: str = "flat", hnsw_m: int = 32):
+        if kind not in INDEX_KINDS:
+            raise ValueError(f"지원하지 않는 FAISS 인덱스 종류: {kind} (가능: {INDEX_KINDS})")
+        self.dim = dim
+        self.kind = kind
+        self.hnsw_m = hnsw_m
+        self._types: Dict[str, List[int]] = {}
+        self._vectors: List[List[float]] = []
+        self._lines: List[bytes] = []
+        self._parents: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def add(self, point_id: Any, vector: List[float], payload: Dict[str, Any], insurance_type: Optional[str]):
+        if len(vector) != self.dim:
+            raise ValueError(f"벡터 차원이 다릅니다: {len(vector)} != {self.dim}")
+        doc = len(self._lines)
+        self._types.setdefault(insurance_type or "", []).append(doc)
+        self._vectors.append(vector)
+        self._lines.append(json.dumps({"id": point_id, "payload": payload}, ensure_ascii=False).encode("utf-8") + b"\n")
+        parent_id = (payload.get("metadata") or {}).get("parent_id")
+        if parent_id:
+            self._parents.setdefault(parent_id, []).append(doc)
+
+    def write(self, index_dir: Path, collection_name: str = ""):
+        index_dir = Path(index_dir)
+        tmp_dir = index_dir.with_name(index_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        vectors = _normalize(np.array(self._vectors, dtype=np.float32).reshape(-1, self.dim))
+        types = sorted(self._types)
+        for i, name in enumerate(types):
+            docs = np.array(self._types[name], dtype=np.uint32)
+            faiss.write_index(_make_index(self.kind, vectors[docs], self.hnsw_m), str(tmp_dir / f"type_{i}.faiss"))
+            np.save(tmp_dir / f"type_{i}_docs.npy", docs)
+
+        with open(tmp_dir / "payloads.jsonl", "wb") as f:
+            for line in self._lines:
+                f.write(line)
+        offsets = np.zeros(len(self._lines) + 1, dtype=np.int64)
+        np.cumsum([len(line) for line in self._lines], out=offsets[1:])
+        np.save(tmp_dir / "payload_offsets.npy", offsets)
+        (tmp_dir / "parents.json").write_text(json.dumps(self._parents, ensure_ascii=False), encoding="utf-8")
+
+        meta = {
+            "version": INDEX_VERSION,
+            "kind": self.kind,
+            "dim": self.dim,
+            "n_docs": len(self._lines),
+            "types": types,
+            "collection_name": collection_name,
+        }
+        (tmp_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+        # 교체: 이전 인덱스를 옆으로 옮기고 새 인덱스를 제자리에
+        old_dir = index_dir.with_name(index_dir.name + ".old")
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if index_dir.exists():
+            index_dir.rename(old_dir)
+        tmp_dir.rename(index_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class FaissVectorStore(VectorStore):
+    """
+    읽기 전용 LangChain VectorStore (as_retriever / similarity_score_threshold 그대로 사용 가능)
+    보험유형 필터는 filter 대신 insurance_type 인자로 받는다
+    결과 Document 는 QdrantVectorStore 와 같은 형태 (metadata 에 _id, _collection_name)
+    """
+
+    content_payload_key = "page_content"
+    metadata_payload_key = "metadata"
+
+    def __init__(
+        self,
+        index_dir: Path,
+        embedding: Embeddings,
+        collection_name: Optional[str] = None,
+        nprobe: int = 16,
+        ef_search: int = 128,
+    ):
+        self.dir = Path(index_dir)
+        meta = json.loads((self.dir / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"FAISS 인덱스 버전이 다릅니다 ({meta.get('version')} != {INDEX_VERSION}) → 다시 만들어야 합니다")
+        self._embedding = embedding
+        self.kind = meta["kind"]
+        self.dim = meta["dim"]
+        self.n_docs = meta["n_docs"]
+        self.collection_name = collection_name or meta["collection_name"]
+        self.types = {name: i for i, name in enumerate(meta["types"])}
+
+        self._indexes: List[faiss.Index] = []
+        self._type_docs: List[np.ndarray] = []
+        for i in range(len(meta["types"])):
+            index = faiss.read_index(str(self.dir / f"type_{i}.faiss"), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            if hasattr(index, "nprobe"):
+                index.nprobe = nprobe
+            if hasattr(index, "hnsw"):
+                index.hnsw.efSearch = ef_search
+            self._indexes.append(index)
+            self._type_docs.append(np.load(self.dir / f"type_{i}_docs.npy", mmap_mode="r"))
+
+        self._offsets = np.load(self.dir / "payload_offsets.npy", mmap_mode="r")
+        self._parents: Dict[str, List[int]] = json.loads((self.dir / "parents.json").read_text(encoding="utf-8"))
+        self._doc_by_id: Optional[Dict[Any, int]] = None
+        self._doc_rows: Optional[np.ndarray] = None
+        # os.pread 는 파일 위치를 공유하지 않으므로 여러 스레드가 같은 fd 로 읽어도 된다
+        self._fd: Optional[int] = os.open(self.dir / "payloads.jsonl", os.O_RDONLY)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    # ---------- 검색 ----------
+    def search_docs(self, vector: List[float], k: int, insurance_type: InsuranceTypes = None) -> List[Tuple[int, float]]:
+        """질문 벡터 → [(문서 번호, 코사인 유사도)] 상위 k개 (insurance_type 이 주어지면 그 보험유형(들) 서브 인덱스만)"""
+        if insurance_type:
+            targets = [self.types[t] for t in type_names(insurance_type) if t in self.types]
+        else:
+            targets = list(range(len(self._indexes)))
+        query = _normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+        docs, scores = [], []
+        for type_id in targets:
+            index = self._indexes[type_id]
+            if not index.ntotal:
+                continue
+            found_scores, rows = index.search(query, min(k, index.ntotal))
+            valid = rows[0] >= 0
+            docs.append(self._type_docs[type_id][rows[0][valid]])
+            scores.append(found_scores[0][valid])
+        if not docs:
+            return []
+        all_docs, all_scores = np.concatenate(docs), np.concatenate(scores)
+        order = np.argsort(-all_scores, kind="stable")[:k]
+        return [(int(all_docs[i]), float(all_scores[i])) for i in order]
+
+    def search_with_score_by_vector(
+        self, vector: List[float], k: int, insurance_type: InsuranceTypes = None
+    ) -> List[Tuple[Document, float]]:
+        return [(self._document(doc), score) for doc, score in self.search_docs(vector, k, insurance_type)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, insurance_type: InsuranceTypes = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.search_with_score_by_vector(self._embedding.embed_query(query), k, insurance_type)
+
+    def similarity_search(
+        self, query: str, k: int = 4, insurance_type: InsuranceTypes = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, insurance_type)]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, insurance_type: InsuranceTypes = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.search_with_score_by_vector(embedding, k, insurance_type)]
+
+    def _select_relevance_score_fn(self):
+        # QdrantVectorStore 코사인과 같은 기준 (유사도 -1~1 → 0~1) → SCORE_THRESHOLD 를 그대로 쓸 수 있음
+        return lambda score: (score + 1.0) / 2.0
+
+    # ---------- payload ----------
+    def _record(self, doc: int) -> Dict[str, Any]:
+        start, end = int(self._offsets[doc]), int(self._offsets[doc + 1])
+        return json.loads(os.pread(self._fd, end - start, start))  # type: ignore[arg-type]
+
+    def _document(self, doc: int) -> Document:
+        record = self._record(doc)
+        payload = record["payload"] or {}
+        metadata = dict(payload.get(self.metadata_payload_key) or {})
+        metadata["_id"] = record["id"]
+        metadata["_collection_name"] = self.collection_name
+        return Document(page_content=payload.get(self.content_payload_key, ""), metadata=metadata)
+
+    def _doc_numbers(self) -> Dict[Any, int]:
+        """포인트 ID → 문서 번호 (첫 호출 때 payload 파일을 한 번 훑어서 만든다)"""
+        if self._doc_by_id is None:
+            self._doc_by_id = {self._record(doc)["id"]: doc for doc in range(self.n_docs)}
+        return self._doc_by_id
+
+    def get_by_ids(self, ids: Sequence[Any], /) -> List[Document]:
+        """포인트 ID → Document (없는 ID 는 건너뜀)"""
+        doc_by_id = self._doc_numbers()
+        return [self._document(doc_by_id[i]) for i in ids if i in doc_by_id]
+
+    def get_vectors(self, ids: Sequence[Any]) -> Dict[Any, np.ndarray]:
+        """포인트 ID → 정규화 벡터 (없는 ID 는 빠짐)"""
+        doc_by_id = self._doc_numbers()
+        if self._doc_rows is None:
+            # 문서 번호 → (서브 인덱스, 행 번호)
+            doc_rows = np.zeros((self.n_docs, 2), dtype=np.int64)
+            for type_id, docs in enumerate(self._type_docs):
+                doc_rows[docs, 0] = type_id
+                doc_rows[docs, 1] = np.arange(len(docs))
+            self._doc_rows = doc_rows
+        vectors = {}
+        for point_id in ids:
+            doc = doc_by_id.get(point_id)
+            if doc is not None:
+                type_id, row = self._doc_rows[doc]
+                vectors[point_id] = self._indexes[type_id].reconstruct(int(row))
+        return vectors
+
+    def count(self, insurance_type: InsuranceTypes = None) -> int:
+        if not insurance_type:
+            return self.n_docs
+        return sum(len(self._type_docs[self.types[t]]) for t in type_names(insurance_type) if t in self.types)
+
+    def parent_chunks(self, parent_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """parent_id → 조각 payload 목록 (Qdrant scroll(metadata.parent_id) 와 같은 결과)"""
+        return {
+            parent_id: [self._record(doc)["payload"] for doc in self._parents[parent_id]]
+            for parent_id in parent_ids
+            if parent_id in self._parents
+        }
+
+    # ---------- 읽기 전용 ----------
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs: Any) -> List[str]:
+        raise NotImplementedError("FAISS 인덱스는 읽기 전용입니다 → Qdrant 에 적재한 뒤 build_from_collection 으로 다시 만드세요")
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, **kwargs: Any):
+        raise NotImplementedError("FAISS 인덱스는 build_from_collection 으로 만듭니다")
+
+
+def build_from_collection(
+    client: QdrantClient,
+    collection_name: str,
+    index_dir: Path,
+    kind: str = "flat",
+    hnsw_m: int = 32,
+    batch_size: int = 1024,
+) -> int:
+    """컬렉션의 모든 포인트(벡터 + payload)로 인덱스를 새로 만든다 → 문서 수"""
+    dim = client.get_collection(collection_name).config.params.vectors.size  # type: ignore[union-attr]
+    builder = FaissIndexBuilder(dim, kind, hnsw_m)
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        for point in points:
+            payload = point.payload or {}
+            insurance_type = (payload.get("metadata") or {}).get("insurance_type")
+            builder.add(point.id, point.vector, payload, insurance_type)  # type: ignore[arg-type]
+        if offset is None:
+            break
+    builder.write(index_dir, collection_name)
+    return len(builder)
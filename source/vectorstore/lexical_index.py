@@ -0,0 +1,262 @@
+# vectorstore/lexical_index.py
+"""
+조항 어휘 검색용 문자 n-gram 역색인 (BM25)
+
+MiniLM 임베딩 검색은 "면책", "보험금 청구권 소멸시효", "제N조" 같은 약관 용어를 정확히 집어내지 못할 때가 있다.
+공백 / 문장부호를 뺀 텍스트의 문자 2-gram 으로 역색인을 만들어 BM25 점수로 보완한다
+(형태소 분석기 없이도 한국어 복합명사 / 띄어쓰기 차이에 강함).
+
+<index_dir>/
+    meta.json          {"version", "ngram", "n_docs", "avgdl", "types", "id_type"}
+    vocab.npy          uint64 [V]    정렬된 n-gram ID (코드포인트를 21비트씩 이어 붙인 값 → 충돌 없음)
+    offsets.npy        int64  [V+1]  n-gram i 의 posting = postings_*[offsets[i]:offsets[i+1]]
+    postings_doc.npy   uint32 [P]    문서 번호
+    postings_tf.npy    uint16 [P]    문서 안 등장 횟수
+    doc_len.npy        uint32 [N]    문서 길이 (n-gram 수)
+    doc_type.npy       uint16 [N]    보험유형 번호 (meta.types 의 위치)
+    doc_ids.npy        uint64 [N,2]  Qdrant 포인트 ID (UUID 128비트 또는 정수)
+
+- 적재가 끝난 뒤 컬렉션 전체를 훑어서 만든다 (build_from_collection) → 중복 제거 / 조각 / 증분 적재 결과와 항상 일치
+- 검색 시에는 np.load(mmap_mode="r") 로 열어서 필요한 posting 만 읽는다
+- 새 인덱스는 임시 디렉토리에 다 쓴 뒤 교체하므로, 만드는 중에도 이전 인덱스로 검색할 수 있다
+"""
+import json
+import math
+import re
+import shutil
+import unicodedata
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+INDEX_VERSION = 1
+NGRAM = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+_CODE_BITS = 21  # 유니코드 코드포인트 < 2^21 → 3-gram 까지 uint64 에 그대로 들어감
+_NON_WORD = re.compile(r"[\W_]+")
+
+PointId = Union[str, int]
+# 검색 조건의 보험유형: 하나 / 여러 개 (그중 하나면 됨) / None (필터 없음)
+InsuranceTypes = Union[str, Sequence[str], None]
+
+
+def type_names(insurance_types: InsuranceTypes) -> List[str]:
+    """검색 조건 → 보험유형 목록 (필터 없음이면 빈 목록)"""
+    if not insurance_types:
+        return []
+    return [insurance_types] if isinstance(insurance_types, str) else list(insurance_types)
+
+
+def normalize_for_index(text: str) -> str:
+    """NFC + 소문자 + 글자/숫자만 남김 ("보험금 청구권" == "보험금청구권")"""
+    return _NON_WORD.sub("", unicodedata.normalize("NFC", text)).lower()
+
+
+def ngram_terms(text: str, ngram: int = NGRAM) -> np.ndarray:
+    """텍스트 → n-gram ID 배열 (중복 포함, 등장 순서)"""
+    normalized = normalize_for_index(text)
+    if len(normalized) < ngram:
+        return np.zeros(0, dtype=np.uint64)
+    codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    n = len(codes) - ngram + 1
+    terms = np.zeros(n, dtype=np.uint64)
+    for j in range(ngram):
+        terms = (terms << np.uint64(_CODE_BITS)) | codes[j:j + n]
+    return terms
+
+
+def _encode_id(point_id: PointId) -> Tuple[int, str]:
+    if isinstance(point_id, int):
+        return point_id, "int"
+    return uuid.UUID(str(point_id)).int, "uuid"
+
+
+class LexicalIndexBuilder:
+    """문서를 하나씩 넣고 write() 로 디렉토리에 저장"""
+
+    def __init__(self, ngram: int = NGRAM):
+        if not 1 <= ngram <= 3:
+            raise ValueError(f"ngram 은 1~3 만 지원합니다: {ngram}")
+        self.ngram = ngram
+        self._terms: List[np.ndarray] = []
+        self._tfs: List[np.ndarray] = []
+        self._doc_len: List[int] = []
+        self._doc_type: List[int] = []
+        self._ids: List[int] = []
+        self._id_type: Optional[str] = None
+        self._types: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, point_id: PointId, text: str, insurance_type: Optional[str]):
+        value, id_type = _encode_id(point_id)
+        if self._id_type is not None and id_type != self._id_type:
+            raise ValueError("포인트 ID 형식(UUID / 정수)이 섞여 있습니다")
+        self._id_type = id_type
+
+        terms = ngram_terms(text, self.ngram)
+        unique, counts = np.unique(terms, return_counts=True)
+        self._terms.append(unique)
+        self._tfs.append(np.minimum(counts, np.iinfo(np.uint16).max).astype(np.uint16))
+        self._doc_len.append(len(terms))
+        self._doc_type.append(self._types.setdefault(insurance_type or "", len(self._types)))
+        self._ids.append(value)
+
+    def write(self, index_dir: Path):
+        index_dir = Path(index_dir)
+        n_docs = len(self._ids)
+        lengths = np.fromiter((len(t) for t in self._terms), dtype=np.int64, count=n_docs)
+        terms = np.concatenate(self._terms) if n_docs else np.zeros(0, dtype=np.uint64)
+        tfs = np.concatenate(self._tfs) if n_docs else np.zeros(0, dtype=np.uint16)
+        docs = np.repeat(np.arange(n_docs, dtype=np.uint32), lengths)
+
+        # n-gram → 문서 번호 순으로 정렬 (문서별로 이미 n-gram 이 정렬되어 있으므로 안정 정렬 한 번)
+        order = np.argsort(terms, kind="stable")
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+        vocab, starts = np.unique(terms, return_index=True)
+        offsets = np.append(starts, len(terms)).astype(np.int64)
+
+        ids = np.array([[value >> 64, value & (2**64 - 1)] for value in self._ids], dtype=np.uint64).reshape(-1, 2)
+        doc_len = np.array(self._doc_len, dtype=np.uint32)
+        meta = {
+            "version": INDEX_VERSION,
+            "ngram": self.ngram,
+            "n_docs": n_docs,
+            "avgdl": float(doc_len.mean()) if n_docs else 0.0,
+            "types": sorted(self._types, key=self._types.__getitem__),
+            "id_type": self._id_type or "uuid",
+        }
+
+        tmp_dir = index_dir.with_name(index_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        np.save(tmp_dir / "vocab.npy", vocab)
+        np.save(tmp_dir / "offsets.npy", offsets)
+        np.save(tmp_dir / "postings_doc.npy", docs)
+        np.save(tmp_dir / "postings_tf.npy", tfs)
+        np.save(tmp_dir / "doc_len.npy", doc_len)
+        np.save(tmp_dir / "doc_type.npy", np.array(self._doc_type, dtype=np.uint16))
+        np.save(tmp_dir / "doc_ids.npy", ids)
+        (tmp_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+        # 교체: 이전 인덱스를 옆으로 옮기고 새 인덱스를 제자리에
+        old_dir = index_dir.with_name(index_dir.name + ".old")
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if index_dir.exists():
+            index_dir.rename(old_dir)
+        tmp_dir.rename(index_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class LexicalIndex:
+    """memory-mapped BM25 검색 (읽기 전용, 여러 스레드에서 동시에 써도 됨)"""
+
+    def __init__(self, index_dir: Path, k1: float = BM25_K1, b: float = BM25_B):
+        self.dir = Path(index_dir)
+        meta = json.loads((self.dir / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"어휘 색인 버전이 다릅니다 ({meta.get('version')} != {INDEX_VERSION}) → 다시 만들어야 합니다")
+        self.ngram = meta["ngram"]
+        self.n_docs = meta["n_docs"]
+        self.types = {name: i for i, name in enumerate(meta["types"])}
+        self.id_type = meta["id_type"]
+
+        def load(name: str) -> np.ndarray:
+            return np.load(self.dir / name, mmap_mode="r")
+
+        self.vocab = load("vocab.npy")
+        self.offsets = load("offsets.npy")
+        self.postings_doc = load("postings_doc.npy")
+        self.postings_tf = load("postings_tf.npy")
+        self.doc_type = load("doc_type.npy")
+        self.doc_ids = load("doc_ids.npy")
+        # 문서 길이 정규화 항은 검색마다 쓰므로 미리 계산 (문서당 float32 1개)
+        doc_len = load("doc_len.npy").astype(np.float32)
+        avgdl = meta["avgdl"] or 1.0
+        self.k1 = k1
+        self._length_norm = k1 * (1 - b + b * doc_len / avgdl)
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def search(self, query: str, k: int, insurance_type: InsuranceTypes = None) -> List[Tuple[PointId, float]]:
+        """질문 → BM25 상위 k개 [(포인트 ID, 점수)] (insurance_type 이 주어지면 그 보험유형(들) 문서만)"""
+        type_ids = None
+        if insurance_type:
+            type_ids = [self.types[t] for t in type_names(insurance_type) if t in self.types]
+            if not type_ids:
+                return []
+        terms, query_tf = np.unique(ngram_terms(query, self.ngram), return_counts=True)
+        if not len(terms) or not self.n_docs:
+            return []
+        positions = np.searchsorted(self.vocab, terms)
+        positions = np.minimum(positions, len(self.vocab) - 1)
+        found = self.vocab[positions] == terms
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for position, qtf in zip(positions[found], query_tf[found]):
+            start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+            docs = self.postings_doc[start:end]
+            tf = self.postings_tf[start:end].astype(np.float32)
+            df = end - start
+            idf = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+            # 한 문서는 n-gram 당 posting 이 1개이므로 fancy-index 덧셈으로 충분
+            scores[docs] += qtf * idf * tf * (self.k1 + 1) / (tf + self._length_norm[docs])
+
+        candidates = np.flatnonzero(scores)
+        if type_ids is not None:
+            candidates = candidates[np.isin(self.doc_type[candidates], type_ids)]
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._point_id(i), float(scores[i])) for i in candidates]
+
+    def _point_id(self, doc: int) -> PointId:
+        high, low = (int(v) for v in self.doc_ids[doc])
+        if self.id_type == "int":
+            return low
+        return str(uuid.UUID(int=(high << 64) | low))
+
+
+def _index_text(payload: Dict[str, Any], content_key: str, metadata_key: str) -> Tuple[str, Optional[str]]:
+    """payload → (색인할 텍스트, 보험유형). 가장 하위 level 제목(예: 제3조(보험금의 지급사유))도 함께 색인"""
+    metadata = payload.get(metadata_key) or {}
+    title = next(
+        (metadata[key] for key in ("level_4", "level_3", "level_2", "level_1") if metadata.get(key)),
+        "",
+    )
+    return f"{title}\n{payload.get(content_key, '')}", metadata.get("insurance_type")
+
+
+def build_from_collection(
+    client: QdrantClient,
+    collection_name: str,
+    index_dir: Path,
+    ngram: int = NGRAM,
+    content_key: str = "page_content",
+    metadata_key: str = "metadata",
+    batch_size: int = 1024,
+) -> int:
+    """컬렉션의 모든 포인트로 색인을 새로 만든다 → 문서 수"""
+    builder = LexicalIndexBuilder(ngram)
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        for point in points:
+            text, insurance_type = _index_text(point.payload or {}, content_key, metadata_key)
+            builder.add(point.id, text, insurance_type)
+        if offset is None:
+            break
+    builder.write(index_dir)
+    return len(builder)
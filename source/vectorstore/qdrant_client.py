@@ -0,0 +1,72 @@
+# vectorstore/qdrant_client.py
+import httpx
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from config.settings import (
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_DIM,
+    EMBEDDING_MODEL,
+    QDRANT_GRPC_PORT,
+    QDRANT_HOST,
+    QDRANT_POOL_SIZE,
+    QDRANT_PORT,
+    QDRANT_PREFER_GRPC,
+    QDRANT_TIMEOUT,
+)
+from vectorstore.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+def get_qdrant_client() -> QdrantClient:
+    """
+    새 클라이언트 생성 (질문 처리 경로에서는 vectorstore.registry 의 공용 클라이언트를 쓸 것)
+    qdrant_client 는 localhost 접속이면 keep-alive를 끄므로 연결 풀 크기를 직접 지정한다
+    """
+    if QDRANT_PREFER_GRPC:
+        return QdrantClient(
+            host=QDRANT_HOST,
+            port=QDRANT_PORT,
+            grpc_port=QDRANT_GRPC_PORT,
+            prefer_grpc=True,
+            pool_size=QDRANT_POOL_SIZE,
+            timeout=QDRANT_TIMEOUT,
+        )
+    return QdrantClient(
+        host=QDRANT_HOST,
+        port=QDRANT_PORT,
+        timeout=QDRANT_TIMEOUT,
+        limits=httpx.Limits(max_connections=QDRANT_POOL_SIZE, max_keepalive_connections=QDRANT_POOL_SIZE),
+    )
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """
+    get_qdrant_client 와 같은 설정의 비동기 클라이언트 (비동기 QA 체인용)
+    연결 풀 / gRPC 채널이 만든 이벤트 루프에 묶이므로 한 이벤트 루프 안에서만 쓴다
+    """
+    if QDRANT_PREFER_GRPC:
+        return AsyncQdrantClient(
+            host=QDRANT_HOST,
+            port=QDRANT_PORT,
+            grpc_port=QDRANT_GRPC_PORT,
+            prefer_grpc=True,
+            pool_size=QDRANT_POOL_SIZE,
+            timeout=QDRANT_TIMEOUT,
+        )
+    return AsyncQdrantClient(
+        host=QDRANT_HOST,
+        port=QDRANT_PORT,
+        timeout=QDRANT_TIMEOUT,
+        limits=httpx.Limits(max_connections=QDRANT_POOL_SIZE, max_keepalive_connections=QDRANT_POOL_SIZE),
+    )
+
+
+def get_embeddings(use_cache: bool = True):
+    # 적재 때와 같은 모델 (디스크 캐시는 적재용, 앱의 ResourceRegistry 는 use_cache=False 로 씀)
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)  # type: ignore
+    if not use_cache:
+        return embeddings
+    return CachedEmbeddings(
+        embeddings,
+        EmbeddingCache(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL, EMBEDDING_DIM),
+    )
@@ -0,0 +1,110 @@
+# vectorstore/query_cache.py
+"""
+질문 → 임베딩 벡터 메모리 캐시 (LRU + TTL)
+
+같은 질문(공백 / 유니코드 정규화 후 같은 문자열)이 다시 들어오면 모델을 돌리지 않고 벡터를 재사용한다.
+히트/미스 수는 프로세스 누적값으로 세고, 요청별 결과는 MetricsCollector.record_query_cache 로 기록한다.
+"""
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """NFC + 연속 공백 1칸 + 앞뒤 공백 제거 (의미가 바뀌지 않는 차이만 없앰)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", question)).strip()
+
+
+class QueryVectorCache:
+    """
+    maxsize 를 넘으면 가장 오래 안 쓴 질문부터, ttl 초가 지난 질문은 조회 시점에 버린다
+    여러 스레드에서 동시에 써도 된다 (임베딩 계산은 잠금 밖에서)
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+
+    def get_or_embed(self, question: str, embed: Callable[[str], List[float]]) -> Tuple[List[float], bool]:
+        """질문 → (벡터, 캐시 히트 여부). 정규화한 질문을 임베딩한다"""
+        key = normalize_question(question)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], True
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+
+        vector = embed(key)
+        self._put(now, {key: vector})
+        return vector, False
+
+    def get_or_embed_many(
+        self, questions: List[str], embed_many: Callable[[List[str]], List[List[float]]]
+    ) -> List[Tuple[List[float], bool]]:
+        """
+        질문 여러 개 → (벡터, 캐시 히트 여부) 목록 (일괄 QA 용)
+        캐시에 없는 질문만 모아 embed_many 를 한 번 부른다 (묶음 안의 같은 질문은 한 번만, 두 번째부터 히트)
+        """
+        keys = [normalize_question(question) for question in questions]
+        now = time.monotonic()
+        found: List[Optional[Tuple[List[float], bool]]] = []
+        missing: Dict[str, None] = {}
+        with self._lock:
+            for key in keys:
+                if key in missing:
+                    self.hits += 1
+                    found.append(None)
+                    continue
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found.append((entry[1], True))
+                    continue
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                missing[key] = None
+                found.append(None)
+
+        computed = dict(zip(missing, embed_many(list(missing)))) if missing else {}
+        self._put(now, computed)
+        results = []
+        for key, cached in zip(keys, found):
+            if cached is None:
+                cached = (computed[key], key not in missing)
+                missing.pop(key, None)  # 같은 질문의 두 번째부터는 히트
+            results.append(cached)
+        return results
+
+    def _put(self, now: float, vectors: Dict[str, List[float]]):
+        if self.maxsize <= 0 or not vectors:
+            return
+        with self._lock:
+            for key, vector in vectors.items():
+                self._entries[key] = (now, vector)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
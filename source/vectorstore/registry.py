@@ -0,0 +1,264 @@
+# vectorstore/registry.py
+"""
+프로세스 공용 검색 리소스
+
+QdrantClient (keep-alive 연결 풀 / gRPC 채널) 와 임베딩 모델은 프로세스에 하나씩만 만들고,
+get_retriever() 는 공용 벡터스토어 위에 검색 조건(필터)만 다른 가벼운 retriever 를 돌려준다.
+벡터스토어는 QdrantVectorStore, VECTOR_BACKEND="faiss" 면 로컬 FaissVectorStore (Qdrant 접속 없음).
+
+비동기 QA 체인은 AsyncQdrantClient (async_client) 를 쓴다. 연결이 이벤트 루프에 묶이므로
+처음 쓴 이벤트 루프 하나에서만 쓰고, 그 루프를 닫기 전에 ashutdown() 으로 정리한다.
+
+- warm_up(): 앱 시작 시 호출 → 모델 로딩 / 첫 임베딩 / Qdrant 연결을 요청 전에 끝냄
+- shutdown(): 종료 시 연결 정리 (atexit 에도 등록되어 있음)
+"""
+import atexit
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from langchain_core.embeddings import Embeddings
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from config.settings import (
+    COLLECTION_NAME,
+    FAISS_HNSW_EF_SEARCH,
+    FAISS_INDEX_DIR,
+    FAISS_IVF_NPROBE,
+    LEXICAL_INDEX_DIR,
+    QUERY_VECTOR_CACHE_SIZE,
+    QUERY_VECTOR_CACHE_TTL,
+    TYPE_CENTROIDS_PATH,
+    VECTOR_BACKEND,
+)
+from vectorstore.faiss_index import FaissVectorStore
+from vectorstore.lexical_index import LexicalIndex
+from vectorstore.qdrant_client import get_async_qdrant_client, get_embeddings, get_qdrant_client
+from vectorstore.query_cache import QueryVectorCache
+from vectorstore.section_index import section_collection_name
+from vectorstore.type_centroids import TypeCentroids
+
+
+class ResourceRegistry:
+    """
+    클라이언트 / 임베딩 / 벡터스토어를 처음 쓸 때 한 번만 만든다 (여러 스레드에서 동시에 불러도 하나)
+    만들어진 객체는 읽기 전용으로 공유한다 (QdrantClient, HuggingFaceEmbeddings 모두 동시 호출 가능)
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], QdrantClient] = get_qdrant_client,
+        # 질문은 디스크 임베딩 캐시에 안 남김 (자유 입력이라 끝없이 쌓임, 반복 질문은 QueryVectorCache 가 처리)
+        embeddings_factory: Callable[[], Embeddings] = partial(get_embeddings, use_cache=False),
+        collection_name: str = COLLECTION_NAME,
+        lexical_index_dir: Optional[Path] = LEXICAL_INDEX_DIR,
+        backend: str = VECTOR_BACKEND,
+        faiss_index_dir: Path = FAISS_INDEX_DIR,
+        async_client_factory: Callable[[], AsyncQdrantClient] = get_async_qdrant_client,
+        type_centroids_path: Optional[Path] = TYPE_CENTROIDS_PATH,
+    ):
+        if backend not in ("qdrant", "faiss"):
+            raise ValueError(f"지원하지 않는 벡터 검색 백엔드: {backend} (가능: qdrant, faiss)")
+        self._client_factory = client_factory
+        self._embeddings_factory = embeddings_factory
+        self._async_client_factory = async_client_factory
+        self.collection_name = collection_name
+        self.backend = backend
+        self.faiss_index_dir = Path(faiss_index_dir)
+        self.lexical_index_dir = Path(lexical_index_dir) if lexical_index_dir else None
+        self.type_centroids_path = Path(type_centroids_path) if type_centroids_path else None
+        self._lock = threading.Lock()
+        self._client: Optional[QdrantClient] = None
+        self._async_client: Optional[AsyncQdrantClient] = None
+        self._embeddings: Optional[Embeddings] = None
+        self._vectorstore: Optional[Union[QdrantVectorStore, FaissVectorStore]] = None
+        self._lexical_index: Optional[LexicalIndex] = None
+        # 마지막으로 확인한 색인 meta.json 수정 시각 (None = 색인 없음, -1 = 아직 확인 전)
+        self._lexical_mtime: Optional[float] = -1.0
+        self._sections_available: Optional[bool] = None
+        self._type_centroids: Optional[TypeCentroids] = None
+        self._type_centroids_mtime: Optional[float] = -1.0
+        self.query_cache = QueryVectorCache(QUERY_VECTOR_CACHE_SIZE, QUERY_VECTOR_CACHE_TTL)
+
+    @property
+    def client(self) -> QdrantClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._client_factory()
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        """비동기 클라이언트 (처음 쓴 이벤트 루프에 묶임 → 그 루프에서만 쓸 것)"""
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = self._async_client_factory()
+        return self._async_client
+
+    @property
+    def embeddings(self) -> Embeddings:
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = self._embeddings_factory()
+        return self._embeddings
+
+    @property
+    def vectorstore(self) -> Union[QdrantVectorStore, FaissVectorStore]:
+        if self._vectorstore is None and self.backend == "faiss":
+            embeddings = self.embeddings
+            with self._lock:
+                if self._vectorstore is None:
+                    # Qdrant 에 접속하지 않는다 (인덱스 / payload 는 memory-mapped)
+                    self._vectorstore = FaissVectorStore(
+                        self.faiss_index_dir,
+                        embeddings,
+                        collection_name=self.collection_name,
+                        nprobe=FAISS_IVF_NPROBE,
+                        ef_search=FAISS_HNSW_EF_SEARCH,
+                    )
+        if self._vectorstore is None:
+            client, embeddings = self.client, self.embeddings
+            with self._lock:
+                if self._vectorstore is None:
+                    # 생성 시 컬렉션 설정 검증 요청이 한 번 나간다
+                    self._vectorstore = QdrantVectorStore(
+                        client=client,
+                        collection_name=self.collection_name,
+                        embedding=embeddings,
+                    )
+        return self._vectorstore
+
+    @property
+    def lexical_index(self) -> Optional[LexicalIndex]:
+        """
+        어휘 색인 (없으면 None → 하이브리드 검색은 dense 로 동작)
+        적재가 색인을 다시 만들면 (meta.json 수정 시각이 바뀌면) 다음 조회 때 새로 연다
+        """
+        if self.lexical_index_dir is None:
+            return None
+        try:
+            mtime = (self.lexical_index_dir / "meta.json").stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._lexical_mtime:
+            with self._lock:
+                if mtime != self._lexical_mtime:
+                    self._lexical_index = LexicalIndex(self.lexical_index_dir) if mtime is not None else None
+                    self._lexical_mtime = mtime
+                    if mtime is None:
+                        print(f"[registry] 어휘 색인 없음 ({self.lexical_index_dir}) → 임베딩 검색만 사용")
+        return self._lexical_index
+
+    @property
+    def type_centroids(self) -> Optional[TypeCentroids]:
+        """
+        보험유형 중심 벡터 (없으면 None → 보험유형 분류는 LLM 으로)
+        적재가 파일을 다시 만들면 (수정 시각이 바뀌면) 다음 조회 때 새로 읽는다
+        """
+        if self.type_centroids_path is None:
+            return None
+        try:
+            mtime = self.type_centroids_path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._type_centroids_mtime:
+            with self._lock:
+                if mtime != self._type_centroids_mtime:
+                    self._type_centroids = TypeCentroids(self.type_centroids_path) if mtime is not None else None
+                    self._type_centroids_mtime = mtime
+                    if mtime is None:
+                        print(f"[registry] 보험유형 중심 벡터 없음 ({self.type_centroids_path}) → 보험유형 분류는 LLM 으로")
+        return self._type_centroids
+
+    @property
+    def sections_available(self) -> bool:
+        """2단계 검색용 섹션 컬렉션이 있는지 (처음 한 번만 확인, 없으면 조항 전체 검색)"""
+        if self._sections_available is None:
+            available = self.client.collection_exists(section_collection_name(self.collection_name))
+            if not available:
+                print(f"[registry] 섹션 인덱스 없음 ({section_collection_name(self.collection_name)}) → 조항 전체에서 검색")
+            self._sections_available = available
+        return self._sections_available
+
+    def embed_question(self, question: str) -> Tuple[List[float], bool]:
+        """질문 → (벡터, 캐시 히트 여부). 한 요청 안의 모든 검색이 이 벡터 하나를 같이 쓴다"""
+        return self.query_cache.get_or_embed(question, self.embeddings.embed_query)
+
+    def embed_questions(self, questions: List[str]) -> List[Tuple[List[float], bool]]:
+        """질문 여러 개 → (벡터, 캐시 히트 여부) 목록. 캐시에 없는 질문은 모델 호출 1번으로 (일괄 QA)"""
+        return self.query_cache.get_or_embed_many(questions, self.embeddings.embed_documents)
+
+    def warm_up(self) -> float:
+        """모델 로딩 + 첫 임베딩 + Qdrant 연결 (컬렉션 확인) 또는 FAISS 인덱스 열기 → 걸린 시간(초)"""
+        start = time.perf_counter()
+        embeddings = self.embeddings
+        # 캐시 앞단(CachedEmbeddings)을 건너뛰고 모델을 직접 한 번 돌려 첫 호출 초기화 비용까지 미리 지불
+        getattr(embeddings, "embeddings", embeddings).embed_query("보험금 지급")
+        self.vectorstore
+        self.lexical_index
+        self.type_centroids
+        elapsed = time.perf_counter() - start
+        print(f"[registry] warm-up 완료 ({elapsed:.1f}s)")
+        return elapsed
+
+    async def ashutdown(self):
+        """비동기 클라이언트 연결 정리 (클라이언트를 쓴 이벤트 루프 안에서 호출)"""
+        with self._lock:
+            async_client, self._async_client = self._async_client, None
+        if async_client is not None:
+            await async_client.close()
+
+    def shutdown(self):
+        """
+        연결 정리. 이후에 다시 쓰면 새로 만든다
+        비동기 클라이언트는 참조만 끊는다 (닫으려면 그 이벤트 루프에서 ashutdown())
+        """
+        with self._lock:
+            client, vectorstore = self._client, self._vectorstore
+            self._client = None
+            self._async_client = None
+            self._embeddings = None
+            self._vectorstore = None
+            self._lexical_index = None
+            self._lexical_mtime = -1.0
+            self._sections_available = None
+            self._type_centroids = None
+            self._type_centroids_mtime = -1.0
+        self.query_cache.clear()
+        if isinstance(vectorstore, FaissVectorStore):
+            vectorstore.close()
+        if client is not None:
+            client.close()
+
+
+_registry = ResourceRegistry()
+atexit.register(lambda: _registry.shutdown())
+
+
+def get_registry() -> ResourceRegistry:
+    return _registry
+
+
+def use_registry(registry: ResourceRegistry) -> ResourceRegistry:
+    """공용 레지스트리 교체 (벤치마크 / 다른 컬렉션 점검용) → 이전 레지스트리 반환"""
+    global _registry
+    previous, _registry = _registry, registry
+    return previous
+
+
+def warm_up() -> float:
+    return _registry.warm_up()
+
+
+def shutdown():
+    _registry.shutdown()
+
+
+async def ashutdown():
+    await _registry.ashutdown()
@@ -0,0 +1,640 @@
+# vectorstore/retriever.py
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStoreRetriever
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from config.settings import (
+    COLLECTION_NAME,
+    DIVERSIFY,
+    DUPLICATE_SIMILARITY,
+    HIERARCHICAL_RETRIEVAL,
+    HYBRID_CANDIDATES,
+    HYBRID_TOP_K,
+    MMR_LAMBDA,
+    POINT_COUNT_CACHE_TTL,
+    QDRANT_COLLECTION_PROFILE,
+    RETRIEVAL_BATCH_FALLBACK,
+    RETRIEVAL_MODE,
+    RRF_K,
+    SCORE_THRESHOLD,
+    SECTION_TOP_K,
+    SPECULATIVE_CANDIDATES,
+    SPECULATIVE_WORKERS,
+    TOP_K,
+)
+from vectorstore.collection_profile import search_params
+from vectorstore.diversify import select_diverse
+from vectorstore.faiss_index import FaissVectorStore
+from vectorstore.lexical_index import InsuranceTypes, LexicalIndex, PointId, type_names
+from vectorstore.registry import get_registry
+from vectorstore.section_index import Section, clause_filter, section_collection_name, section_of, section_request
+
+
+def _type_filter(insurance_type: InsuranceTypes) -> Optional[models.Filter]:
+    names = type_names(insurance_type)
+    if not names:
+        return None
+    # payload 구조: {"page_content": ..., "metadata": {"insurance_type": ...}}
+    # 보험유형이 여러 개면 MatchAny (그중 하나) → 검색은 여전히 요청 1번
+    return models.Filter(
+        must=[
+            models.FieldCondition(
+                key="metadata.insurance_type",
+                match=models.MatchValue(value=names[0]) if len(names) == 1 else models.MatchAny(any=names),
+            )
+        ]
+    )
+
+
+def _search_kwargs(insurance_type: InsuranceTypes, backend: str = "qdrant") -> Dict[str, Any]:
+    search_kwargs: Dict[str, Any] = {"k": TOP_K, "score_threshold": SCORE_THRESHOLD}
+    if backend == "faiss":
+        # 보험유형별 서브 인덱스에서만 검색
+        search_kwargs["insurance_type"] = insurance_type
+        return search_kwargs
+    params = search_params(QDRANT_COLLECTION_PROFILE)
+    if params is not None:
+        search_kwargs["search_params"] = params  # 양자화 점수 → 원본 벡터로 rescore
+    if insurance_type:
+        search_kwargs["filter"] = _type_filter(insurance_type)
+    return search_kwargs
+
+
+def get_retriever(insurance_type: InsuranceTypes = None) -> VectorStoreRetriever:
+    """
+    공용 벡터스토어(vectorstore.registry) 위의 retriever → 검색 조건만 다른 가벼운 객체라 매번 만들어도 된다
+    settings.VECTOR_BACKEND 에 따라 Qdrant 또는 로컬 FAISS 인덱스에서 검색한다
+    """
+    registry = get_registry()
+    return registry.vectorstore.as_retriever(
+        search_type="similarity_score_threshold",
+        search_kwargs=_search_kwargs(insurance_type, registry.backend),
+    )
+
+
+def embed_question(question: str) -> Tuple[List[float], bool]:
+    """질문 → (벡터, 질문 벡터 캐시 히트 여부)"""
+    return get_registry().embed_question(question)
+
+
+def embed_questions(questions: List[str]) -> List[Tuple[List[float], bool]]:
+    """질문 여러 개 → (벡터, 캐시 히트 여부) 목록 (모델 호출 1번)"""
+    return get_registry().embed_questions(questions)
+
+
+# ---------- 질문 벡터로 직접 검색 ----------
+# QdrantVectorStore 의 검색 메서드는 검색마다 컬렉션 설정 확인 요청(get_collection)을 한 번 더 보낸다.
+# 설정 확인은 공용 벡터스토어를 만들 때 한 번 했으므로 여기서는 클라이언트로 바로 검색한다.
+def _query_request(
+    vector: List[float],
+    insurance_type: InsuranceTypes,
+    limit: int = TOP_K,
+    sections: Optional[List[Section]] = None,
+) -> models.QueryRequest:
+    query_filter = _type_filter(insurance_type)
+    if sections is not None:
+        # 2단계 검색: 고른 섹션 안의 조항만
+        query_filter = models.Filter(must=[f for f in (query_filter, clause_filter(sections)) if f is not None])
+    return models.QueryRequest(
+        query=vector,
+        filter=query_filter,
+        params=search_params(QDRANT_COLLECTION_PROFILE),
+        limit=limit,
+        with_payload=True,
+        with_vector=False,
+    )
+
+
+def _to_documents(points: List[models.ScoredPoint]) -> List[Document]:
+    """검색 결과 → Document (retriever 결과와 같은 형태, SCORE_THRESHOLD 미만은 버림)"""
+    vectorstore = get_registry().vectorstore
+    # retriever 의 similarity_score_threshold 와 같은 기준 (거리 → 0~1 relevance 점수)
+    relevance = vectorstore._select_relevance_score_fn()
+    return [_point_document(point) for point in points if relevance(point.score) >= SCORE_THRESHOLD]
+
+
+def _point_document(point) -> Document:
+    """ScoredPoint / Record → Document (metadata 에 _id, _collection_name 추가)"""
+    vectorstore = get_registry().vectorstore
+    payload = point.payload or {}
+    metadata = dict(payload.get(vectorstore.metadata_payload_key) or {})
+    metadata["_id"] = point.id
+    metadata["_collection_name"] = vectorstore.collection_name
+    return Document(page_content=payload.get(vectorstore.content_payload_key, ""), metadata=metadata)
+
+
+def _select_sections(vector: List[float], insurance_types: List[InsuranceTypes]) -> List[Optional[List[Section]]]:
+    """
+    2단계 검색의 1단계: 보험유형 조건별로 질문과 가까운 섹션 SECTION_TOP_K개 (요청 1번)
+    2단계 검색을 안 쓰면 (꺼짐 / FAISS 백엔드 / 섹션 인덱스 없음) 조건마다 None
+    """
+    registry = get_registry()
+    if not _sections_enabled():
+        return [None] * len(insurance_types)
+    responses = registry.client.query_batch_points(
+        collection_name=section_collection_name(registry.collection_name),
+        requests=_section_requests([(vector, insurance_type) for insurance_type in insurance_types]),
+    )
+    return [[section_of(point.payload or {}) for point in response.points] for response in responses]
+
+
+def _sections_enabled() -> bool:
+    registry = get_registry()
+    return HIERARCHICAL_RETRIEVAL and not isinstance(registry.vectorstore, FaissVectorStore) and registry.sections_available
+
+
+def _section_requests(conditions: List[Tuple[List[float], InsuranceTypes]]) -> List[models.QueryRequest]:
+    """(질문 벡터, 보험유형) 조건별 섹션 검색 요청"""
+    return [section_request(vector, insurance_type, SECTION_TOP_K) for vector, insurance_type in conditions]
+
+
+def search_by_vector(vector: List[float], insurance_type: InsuranceTypes = None, limit: int = TOP_K) -> List[Document]:
+    """
+    get_retriever(insurance_type).invoke(질문) 과 같은 검색을 미리 계산한 질문 벡터로
+    (한 요청 안에서 필터 검색 / fallback 검색이 임베딩을 다시 계산하지 않게)
+    HIERARCHICAL_RETRIEVAL 이면 가까운 섹션을 먼저 고르고 그 안에서만 검색한다
+    """
+    registry = get_registry()
+    vectorstore = registry.vectorstore
+    if isinstance(vectorstore, FaissVectorStore):
+        relevance = vectorstore._select_relevance_score_fn()
+        return [
+            doc
+            for doc, score in vectorstore.search_with_score_by_vector(vector, limit, insurance_type)
+            if relevance(score) >= SCORE_THRESHOLD
+        ]
+    sections = _select_sections(vector, [insurance_type])[0]
+    if sections == []:
+        return []  # 이 보험유형의 섹션이 없음 = 조항도 없음
+    request = _query_request(vector, insurance_type, limit, sections)
+    response = registry.client.query_points(
+        collection_name=registry.collection_name,
+        query=request.query,
+        query_filter=request.filter,
+        search_params=request.params,
+        limit=request.limit,
+        with_payload=True,
+        with_vectors=False,
+    )
+    return _to_documents(response.points)
+
+
+# ---------- 하이브리드 검색 (임베딩 + 어휘 BM25 → RRF) ----------
+def reciprocal_rank_fusion(rankings: List[List[PointId]], k: int = RRF_K) -> List[PointId]:
+    """순위 목록 여러 개 → 점수 Σ 1 / (k + 순위) 내림차순 ID 목록 (동점이면 먼저 나온 ID 우선)"""
+    scores: Dict[PointId, float] = {}
+    for ranking in rankings:
+        for rank, point_id in enumerate(ranking, start=1):
+            scores[point_id] = scores.get(point_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda point_id: -scores[point_id])
+
+
+def _hybrid_index(question: Optional[str]) -> Optional[LexicalIndex]:
+    """하이브리드 검색에 쓸 어휘 색인 (dense 모드 / 질문 없음 / 색인 없음이면 None)"""
+    if RETRIEVAL_MODE != "hybrid" or not question:
+        return None
+    return get_registry().lexical_index
+
+
+def _fuse_ids(
+    dense_docs: List[Document],
+    question: str,
+    insurance_type: InsuranceTypes,
+    index: LexicalIndex,
+    k: int,
+) -> Tuple[List[PointId], Dict[PointId, Document]]:
+    """임베딩 검색 후보 + 어휘 검색 후보 → (RRF 상위 k개 ID, 이미 본문이 있는 문서)"""
+    lexical_ids = [point_id for point_id, _ in index.search(question, HYBRID_CANDIDATES, insurance_type)]
+    by_id: Dict[PointId, Document] = {d.metadata["_id"]: d for d in dense_docs}
+    return reciprocal_rank_fusion([list(by_id), lexical_ids])[:k], by_id
+
+
+def _fetch_ids(fused: List[PointId], by_id: Dict[PointId, Document], with_vectors: bool) -> List[PointId]:
+    """RRF 결과 중 ID 로 조회할 포인트 (어휘 검색에만 나온 조항, with_vectors 면 다양화용 벡터까지 받으려고 전부)"""
+    return list(fused) if with_vectors else [point_id for point_id in fused if point_id not in by_id]
+
+
+def _fused_documents(
+    fused: List[PointId],
+    by_id: Dict[PointId, Document],
+    records,
+    with_vectors: bool,
+) -> Tuple[List[Document], Optional[Dict[PointId, np.ndarray]]]:
+    """ID 조회 결과를 합쳐서 → (RRF 순서 문서 (색인 이후 삭제된 ID 는 건너뜀), with_vectors 면 포인트 벡터)"""
+    vectors: Optional[Dict[PointId, np.ndarray]] = {} if with_vectors else None
+    for record in records:
+        if record.id not in by_id:
+            by_id[record.id] = _point_document(record)
+        if vectors is not None:
+            vectors[record.id] = np.asarray(record.vector, dtype=np.float32)
+    return [by_id[point_id] for point_id in fused if point_id in by_id], vectors
+
+
+def _fuse(
+    dense_docs: List[Document],
+    question: str,
+    insurance_type: InsuranceTypes,
+    index: LexicalIndex,
+    k: int = HYBRID_TOP_K,
+    with_vectors: bool = False,
+) -> Tuple[List[Document], Optional[Dict[PointId, np.ndarray]]]:
+    """
+    임베딩 검색 후보 + 어휘 검색 후보 → (RRF 상위 k개, with_vectors 면 그 포인트 벡터)
+    어휘 검색에만 나온 조항의 본문과 다양화용 벡터는 ID 조회 한 번에 가져온다
+    """
+    fused, by_id = _fuse_ids(dense_docs, question, insurance_type, index, k)
+    registry = get_registry()
+    vectorstore = registry.vectorstore
+    if isinstance(vectorstore, FaissVectorStore):
+        missing = [point_id for point_id in fused if point_id not in by_id]
+        if missing:
+            by_id.update((d.metadata["_id"], d) for d in vectorstore.get_by_ids(missing))
+        docs = [by_id[point_id] for point_id in fused if point_id in by_id]
+        return docs, (vectorstore.get_vectors(fused) if with_vectors else None)
+
+    ids = _fetch_ids(fused, by_id, with_vectors)
+    records = registry.client.retrieve(
+        collection_name=registry.collection_name,
+        ids=ids,
+        with_payload=True,
+        with_vectors=with_vectors,
+    ) if ids else []
+    return _fused_documents(fused, by_id, records, with_vectors)
+
+
+# ---------- 검색 후 다양화 (근접 중복 접기 + MMR) ----------
+def _point_vectors(point_ids: List[PointId]) -> Dict[PointId, np.ndarray]:
+    """포인트 ID → 벡터 (Qdrant 는 ID 조회 요청 1번, FAISS 는 인덱스에서 복원)"""
+    registry = get_registry()
+    vectorstore = registry.vectorstore
+    if isinstance(vectorstore, FaissVectorStore):
+        return vectorstore.get_vectors(point_ids)
+    records = registry.client.retrieve(
+        collection_name=registry.collection_name,
+        ids=point_ids,
+        with_payload=False,
+        with_vectors=True,
+    )
+    return {record.id: np.asarray(record.vector, dtype=np.float32) for record in records}
+
+
+def diversify_documents(
+    docs: List[Document],
+    question_vector: List[float],
+    k: int,
+    lambda_mult: float = MMR_LAMBDA,
+    duplicate_similarity: float = DUPLICATE_SIMILARITY,
+) -> List[Document]:
+    """
+    검색 후보 (순위 순) → 근접 중복을 앞 순위 하나로 접고 MMR 로 고른 k개
+    접힌 사본의 약관 파일은 남긴 문서의 metadata["duplicate_sources"] 에 모은다
+    """
+    if len(docs) <= 1:
+        return docs[:k]
+    vectors = _point_vectors([d.metadata["_id"] for d in docs])
+    return _diversify_with_vectors(docs, vectors, question_vector, k, lambda_mult, duplicate_similarity)
+
+
+def _diversify_with_vectors(
+    docs: List[Document],
+    vectors: Dict[PointId, np.ndarray],
+    question_vector: List[float],
+    k: int,
+    lambda_mult: float = MMR_LAMBDA,
+    duplicate_similarity: float = DUPLICATE_SIMILARITY,
+) -> List[Document]:
+    """diversify_documents 의 계산 부분 (후보 벡터를 이미 가져온 뒤)"""
+    candidates = [d for d in docs if d.metadata["_id"] in vectors]  # 검색 이후 삭제된 포인트는 뺌
+    picked, merged_into = select_diverse(
+        np.asarray(question_vector, dtype=np.float32),
+        np.stack([vectors[d.metadata["_id"]] for d in candidates]) if candidates else np.zeros((0, 0)),
+        k,
+        lambda_mult,
+        duplicate_similarity,
+    )
+
+    result = []
+    for i in picked:
+        doc = candidates[i]
+        sources = {candidates[j].metadata.get("source") for j, target in enumerate(merged_into) if target == i}
+        sources -= {None, doc.metadata.get("source")}
+        if sources:
+            doc = Document(page_content=doc.page_content, metadata={**doc.metadata, "duplicate_sources": sorted(sources)})
+        result.append(doc)
+    return result
+
+
+def search_with_fallback(
+    vector: List[float],
+    insurance_type: InsuranceTypes,
+    batch: bool = RETRIEVAL_BATCH_FALLBACK,
+    question: Optional[str] = None,
+    diversify: bool = DIVERSIFY,
+) -> Tuple[List[Document], Optional[List[Document]]]:
+    """
+    보험유형 필터 검색 + 필터 없는 검색 → (필터 검색 결과, 필터 검색이 비었을 때만 필터 없는 검색 결과, 아니면 None)
+    insurance_type 은 보험유형 하나 또는 여러 개 (여러 개면 그중 하나인 조항을 한 번에 검색, MatchAny)
+
+    batch=True: 두 검색을 query_batch_points 요청 하나로 보내고 결과는 여기서 고른다
+                (필터 검색이 비어서 fallback 하더라도 왕복은 1번)
+    batch=False: 필터 검색 → 비어 있을 때만 필터 없는 검색 (순차)
+    필터가 없으면 (insurance_type=None) 검색 1번, 두 번째 값은 None
+
+    question 이 주어지고 RETRIEVAL_MODE="hybrid" + 어휘 색인이 있으면
+    각 검색을 HYBRID_CANDIDATES개 임베딩 후보 + 같은 조건의 BM25 후보로 RRF 해서 HYBRID_TOP_K개로 줄인다
+    diversify=True 면 HYBRID_CANDIDATES개 후보에서 근접 중복을 접고 MMR 로 최종 개수(TOP_K / HYBRID_TOP_K)를 고른다
+    RRF / 다양화 후처리 (ID 조회 요청)는 필터 없는 검색 결과를 실제로 쓸 때만 (필터 검색이 비었을 때) 한다
+    """
+    index = _hybrid_index(question)
+    k, limit = _result_sizes(index, diversify)
+    finish = _finisher(vector, question, index, k, limit, diversify)
+
+    if not insurance_type:
+        return finish(search_by_vector(vector, None, limit), None), None
+    if not batch:
+        docs = finish(search_by_vector(vector, insurance_type, limit), insurance_type)
+        return docs, (None if docs else finish(search_by_vector(vector, None, limit), None))
+
+    registry = get_registry()
+    if isinstance(registry.vectorstore, FaissVectorStore):
+        # 프로세스 안 검색이라 왕복이 없음 → 순차 검색과 같다
+        docs = finish(search_by_vector(vector, insurance_type, limit), insurance_type)
+        return docs, (None if docs else finish(search_by_vector(vector, None, limit), None))
+    # 2단계 검색이면 섹션 선택 1번 + 조항 검색 1번 (고른 섹션이 없는 조건은 결과가 비므로 보내지 않음)
+    types = [insurance_type, None]
+    sections = _select_sections(vector, types)
+    requests = _batch_requests(vector, types, sections, limit)
+    responses = (
+        registry.client.query_batch_points(collection_name=registry.collection_name, requests=requests)
+        if requests
+        else []
+    )
+    filtered, unfiltered = _batch_documents(sections, responses)
+    docs = finish(filtered, insurance_type)
+    return docs, (None if docs else finish(unfiltered, None))
+
+
+def _finisher(
+    vector: List[float],
+    question: Optional[str],
+    index: Optional[LexicalIndex],
+    k: int,
+    limit: int,
+    diversify: bool,
+) -> Callable[[List[Document], InsuranceTypes], List[Document]]:
+    """임베딩 검색 후보 → (하이브리드면 RRF) → (diversify 면 중복 접기 + MMR) → 최종 k개 로 만드는 함수"""
+
+    def finish(docs: List[Document], type_: InsuranceTypes) -> List[Document]:
+        vectors = None
+        if index is not None:
+            # 다양화할 거면 어휘 전용 조항 본문을 가져오는 요청에서 벡터도 같이 받는다
+            docs, vectors = _fuse(docs, question, type_, index, limit if diversify else k, diversify)  # type: ignore[arg-type]
+        if not diversify:
+            return docs
+        if vectors is None:
+            return diversify_documents(docs, vector, k)
+        return _diversify_with_vectors(docs, vectors, vector, k) if len(docs) > 1 else docs[:k]
+
+    return finish
+
+
+def _result_sizes(index: Optional[LexicalIndex], diversify: bool) -> Tuple[int, int]:
+    """(최종 문서 수 k, 임베딩 검색 후보 수 limit)"""
+    k = HYBRID_TOP_K if index is not None else TOP_K
+    limit = HYBRID_CANDIDATES if index is not None or diversify else TOP_K
+    return k, limit
+
+
+def _batch_requests(
+    vector: List[float],
+    insurance_types: List[InsuranceTypes],
+    sections: List[Optional[List[Section]]],
+    limit: int,
+) -> List[models.QueryRequest]:
+    """조건별 검색 요청 (고른 섹션이 없는 조건은 뺌)"""
+    return [
+        _query_request(vector, insurance_type, limit, selected)
+        for insurance_type, selected in zip(insurance_types, sections)
+        if selected != []
+    ]
+
+
+def _batch_documents(sections: List[Optional[List[Section]]], responses) -> List[List[Document]]:
+    """query_batch_points 결과 → 조건별 문서 목록 (요청을 보내지 않은 조건은 빈 목록)"""
+    responses = iter(responses)
+    return [_to_documents(next(responses).points) if selected != [] else [] for selected in sections]
+
+
+# ---------- 추측 검색 (분류 LLM 응답을 기다리는 동안) ----------
+_speculation_pool: Optional[ThreadPoolExecutor] = None
+_speculation_lock = threading.Lock()
+
+
+def speculative_search(vector: List[float], limit: int = SPECULATIVE_CANDIDATES) -> List[Document]:
+    """보험유형이 정해지기 전에 보내는 필터 없는 검색 (payload 포함 limit개) → search_with_candidates 에 넘긴다"""
+    return search_by_vector(vector, None, limit)
+
+
+def submit_speculative_search(vector: List[float], limit: int = SPECULATIVE_CANDIDATES) -> "Future[List[Document]]":
+    """speculative_search 를 공용 스레드 풀(SPECULATIVE_WORKERS개)에서 시작 (동기 체인이 분류하는 동안)"""
+    global _speculation_pool
+    if _speculation_pool is None:
+        with _speculation_lock:
+            if _speculation_pool is None:
+                _speculation_pool = ThreadPoolExecutor(SPECULATIVE_WORKERS, thread_name_prefix="speculative-search")
+    return _speculation_pool.submit(speculative_search, vector, limit)
+
+
+def filter_candidates(
+    candidates: List[Document],
+    insurance_type: InsuranceTypes,
+    limit: int,
+    fetched: int = SPECULATIVE_CANDIDATES,
+) -> Optional[List[Document]]:
+    """
+    필터 없는 검색 상위 fetched개 → 같은 보험유형 필터 검색의 상위 limit개 (후보만으로 확정할 수 없으면 None)
+    - 후보 안에 그 보험유형 조항이 limit개 이상: 필터 검색 상위 limit개와 같다 (점수 순서는 필터와 무관)
+    - 후보가 fetched개보다 적음: SCORE_THRESHOLD 를 넘는 조항을 모두 받은 것 → 거른 결과가 곧 필터 검색 결과
+    2단계 검색은 섹션 선택이 보험유형마다 달라서 항상 None
+    """
+    if _sections_enabled():
+        return None
+    names = set(type_names(insurance_type))
+    kept = [d for d in candidates if not names or d.metadata.get("insurance_type") in names]
+    if len(kept) >= limit or len(candidates) < fetched:
+        return kept[:limit]
+    return None
+
+
+def search_with_candidates(
+    vector: List[float],
+    insurance_type: InsuranceTypes,
+    candidates: List[Document],
+    question: Optional[str] = None,
+    diversify: bool = DIVERSIFY,
+    fetched: int = SPECULATIVE_CANDIDATES,
+) -> Tuple[List[Document], Optional[List[Document]], bool]:
+    """
+    search_with_fallback 과 같은 결과를 추측 검색 후보(speculative_search 결과)로
+    → (필터 검색 결과, 필터 검색이 비었을 때만 필터 없는 검색 결과 또는 None, 필터 검색을 다시 보냈는지)
+    필터 없는 검색은 후보 앞부분 그대로, 필터 검색은 후보를 로컬에서 거르고 모자랄 때만 다시 보낸다
+    """
+    index = _hybrid_index(question)
+    k, limit = _result_sizes(index, diversify)
+    finish = _finisher(vector, question, index, k, limit, diversify)
+
+    if not insurance_type:
+        return finish(candidates[:limit], None), None, False
+    filtered = filter_candidates(candidates, insurance_type, limit, fetched)
+    searched = filtered is None
+    if filtered is None:
+        filtered = search_by_vector(vector, insurance_type, limit)
+    docs = finish(filtered, insurance_type)
+    return docs, (None if docs else finish(candidates[:limit], None)), searched
+
+
+def search_after_speculation(
+    speculation: "Optional[Future[List[Document]]]",
+    vector: List[float],
+    insurance_type: InsuranceTypes,
+    question: Optional[str] = None,
+    diversify: bool = DIVERSIFY,
+) -> Tuple[List[Document], Optional[List[Document]], Optional[str]]:
+    """
+    분류가 끝난 뒤 검색: 추측 검색(submit_speculative_search)이 있으면 그 후보로, 없거나 실패했으면 search_with_fallback
+    → (필터 검색 결과, 필터 없는 검색 결과 또는 None, 추측 검색 "hit" (필터 검색 생략) / "miss" (다시 보냄) / None)
+    """
+    if speculation is not None:
+        try:
+            candidates = speculation.result()
+        except Exception as e:
+            print(f"[WARN] 추측 검색 실패 → 일반 검색: {e}")
+        else:
+            docs, unfiltered_docs, searched = search_with_candidates(vector, insurance_type, candidates, question, diversify)
+            return docs, unfiltered_docs, "miss" if searched else "hit"
+    docs, unfiltered_docs = search_with_fallback(vector, insurance_type, question=question, diversify=diversify)
+    return docs, unfiltered_docs, None
+
+
+_count_cache: Dict[Tuple[str, ...], Tuple[float, int]] = {}
+_count_lock = threading.Lock()
+
+
+def count_documents(insurance_type: InsuranceTypes = None, ttl: float = POINT_COUNT_CACHE_TTL) -> int:
+    """보험유형(들)의 포인트 수 (디버깅 출력용 통계 → ttl 초 동안 캐시, 요청마다 count 를 보내지 않음)"""
+    now = time.monotonic()
+    key = tuple(sorted(type_names(insurance_type)))
+    with _count_lock:
+        cached = _count_cache.get(key)
+    if cached is not None and now - cached[0] < ttl:
+        return cached[1]
+
+    registry = get_registry()
+    vectorstore = registry.vectorstore
+    if isinstance(vectorstore, FaissVectorStore):
+        count = vectorstore.count(insurance_type)
+    else:
+        count = registry.client.count(
+            collection_name=registry.collection_name,
+            count_filter=_type_filter(insurance_type),
+            exact=True,
+        ).count
+    with _count_lock:
+        _count_cache[key] = (now, count)
+    return count
+
+
+def _merge_chunks(chunks: List[Dict[str, Any]]) -> str:
+    """조각 payload 목록 → 부모 조항 본문 (chunk_start 로 겹친 부분을 걷어냄)"""
+    text, end = "", 0
+    for payload in sorted(chunks, key=lambda p: p["metadata"]["chunk_index"]):
+        content = payload["page_content"]
+        start = payload["metadata"]["chunk_start"]
+        if not text:
+            text = content
+        elif start == end:  # 줄/문장 경계 없이 강제로 나눈 자리
+            text += content
+        elif start > end:  # 겹침 없음 (사이의 줄바꿈/공백 1자)
+            text += "\n" + content
+        else:
+            text += content[end - start:]
+        end = start + len(content)
+    return text
+
+
+def _parent_filter(parent_ids: List[str]) -> models.Filter:
+    return models.Filter(
+        must=[models.FieldCondition(key="metadata.parent_id", match=models.MatchAny(any=parent_ids))]
+    )
+
+
+def _scroll_parent_chunks(
+    parent_ids: List[str], client: QdrantClient, collection_name: str
+) -> Dict[str, List[Dict[str, Any]]]:
+    """parent_id → 조각 payload 목록 (Qdrant scroll)"""
+    chunks: Dict[str, List[Dict[str, Any]]] = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=_parent_filter(parent_ids),
+            limit=256,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        for point in points:
+            chunks.setdefault(point.payload["metadata"]["parent_id"], []).append(point.payload)  # type: ignore
+        if offset is None:
+            break
+    return chunks
+
+
+def expand_parent_clauses(
+    docs: List[Document],
+    client: Optional[QdrantClient] = None,
+    collection_name: str = COLLECTION_NAME,
+) -> List[Document]:
+    """
+    긴 조항을 나눈 조각(metadata.parent_id)으로 검색된 문서 → 부모 조항 전체로 복원
+    같은 부모의 조각이 여러 개 검색되면 하나로 합치고, 순서는 처음 검색된 위치를 따른다
+    조각이 아닌 문서는 그대로 둔다
+    """
+    parent_ids = _parent_ids(docs)
+    if not parent_ids:
+        return docs
+
+    vectorstore = get_registry().vectorstore if client is None else None
+    if isinstance(vectorstore, FaissVectorStore):
+        chunks = vectorstore.parent_chunks(parent_ids)
+    else:
+        chunks = _scroll_parent_chunks(parent_ids, client or get_registry().client, collection_name)
+    return _expand_with_chunks(docs, chunks)
+
+
+def _parent_ids(docs: List[Document]) -> List[str]:
+    return list(dict.fromkeys(d.metadata["parent_id"] for d in docs if d.metadata.get("parent_id")))
+
+
+def _expand_with_chunks(docs: List[Document], chunks: Dict[str, List[Dict[str, Any]]]) -> List[Document]:
+    """검색 문서 + parent_id → 조각 payload → 부모 조항으로 바꾼 문서 목록"""
+    expanded: List[Document] = []
+    seen = set()
+    for d in docs:
+        parent_id = d.metadata.get("parent_id")
+        if not parent_id or parent_id not in chunks:
+            expanded.append(d)
+            continue
+        if parent_id in seen:
+            continue
+        seen.add(parent_id)
+        metadata = {k: v for k, v in d.metadata.items() if k not in ("chunk_index", "chunk_start")}
+        expanded.append(Document(page_content=_merge_chunks(chunks[parent_id]), metadata=metadata))
+    return expanded
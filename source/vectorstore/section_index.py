@@ -0,0 +1,156 @@
+# vectorstore/section_index.py
+"""
+섹션 중심 벡터 인덱스 (2단계 검색용)
+
+섹션 = 약관 파일(metadata.source) 하나의 level_1 (관 / 편) 하나.
+섹션에 속한 조항 벡터(정규화)의 평균을 작은 보조 컬렉션 `<컬렉션>_sections` 에 넣어 두고,
+검색 시 1) 질문과 가까운 섹션을 고른 뒤 2) 그 섹션들의 조항만 payload 필터(source + level_1)로 검색한다.
+→ 질문당 비용이 전체 조항 수가 아니라 섹션 수 + 고른 섹션의 조항 수에 비례
+
+- 적재가 끝난 뒤 컬렉션 전체를 훑어서 만든다 (build_from_collection) → 중복 제거 / 조각 / 증분 적재 결과와 항상 일치
+- 다시 만들 때는 섹션 ID(source + level_1 의 UUID5)로 덮어쓰고 사라진 섹션만 지운다 (만드는 중에도 검색 가능)
+- level_1 이 없는 조항(구조를 못 찾은 파일)은 파일 하나가 섹션 하나
+- 중복 제거로 여러 파일이 함께 쓰는 대표 조항은 metadata.sources 의 모든 파일 섹션에 들어간다
+  → 조항 필터도 source 또는 sources 로 찾으므로, 사본만 가진 파일의 섹션을 골라도 그 조항이 검색된다
+"""
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from .collection_profile import create_collection
+from .lexical_index import InsuranceTypes, type_names
+
+Section = Tuple[str, Optional[str]]  # (source, level_1)
+
+SECTION_PROFILE = {"payload_indexes": {"insurance_type": "keyword"}}
+_SECTION_NAMESPACE = uuid.UUID("6f1c7f4e-2d0a-4f57-9a43-2b1d5f0c8e11")
+
+
+def section_collection_name(collection_name: str) -> str:
+    return f"{collection_name}_sections"
+
+
+def section_id(section: Section) -> str:
+    source, level_1 = section
+    return str(uuid.uuid5(_SECTION_NAMESPACE, f"{source}\x00{level_1 or ''}"))
+
+
+def section_of(payload: Dict[str, Any]) -> Section:
+    return payload.get("source", ""), payload.get("level_1")
+
+
+def section_request(vector: List[float], insurance_type: InsuranceTypes, limit: int) -> models.QueryRequest:
+    """1단계: 질문 벡터와 가까운 섹션 (insurance_type 이 주어지면 그 보험유형(들) 섹션만)"""
+    section_filter = None
+    names = type_names(insurance_type)
+    if names:
+        match = models.MatchValue(value=names[0]) if len(names) == 1 else models.MatchAny(any=names)
+        section_filter = models.Filter(must=[models.FieldCondition(key="insurance_type", match=match)])
+    return models.QueryRequest(query=vector, filter=section_filter, limit=limit, with_payload=True, with_vector=False)
+
+
+def clause_sections(metadata: Dict[str, Any]) -> List[Section]:
+    """조항 → 속한 섹션들 (중복 제거된 대표 조항은 metadata.sources 의 파일마다)"""
+    sources = metadata.get("sources") or [metadata.get("source", "")]
+    return [(source, metadata.get("level_1")) for source in sources]
+
+
+def clause_filter(sections: List[Section]) -> models.Filter:
+    """2단계: 고른 섹션들 중 하나에 속한 조항 (source / sources 는 payload 인덱스로 좁혀짐)"""
+    return models.Filter(
+        should=[
+            models.Filter(
+                must=[
+                    models.Filter(
+                        should=[
+                            models.FieldCondition(key="metadata.source", match=models.MatchValue(value=source)),
+                            models.FieldCondition(key="metadata.sources", match=models.MatchValue(value=source)),
+                        ]
+                    ),
+                    models.FieldCondition(key="metadata.level_1", match=models.MatchValue(value=level_1))
+                    if level_1
+                    else models.IsNullCondition(is_null=models.PayloadField(key="metadata.level_1")),
+                ]
+            )
+            for source, level_1 in sections
+        ]
+    )
+
+
+def build_from_collection(
+    client: QdrantClient,
+    collection_name: str,
+    content_key: str = "page_content",
+    metadata_key: str = "metadata",
+    batch_size: int = 1024,
+) -> int:
+    """컬렉션의 모든 조항 벡터 → 섹션 중심 벡터 컬렉션 갱신 → 섹션 수"""
+    sums: Dict[Section, np.ndarray] = {}
+    counts: Dict[Section, int] = {}
+    types: Dict[Section, Optional[str]] = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=[metadata_key],
+            with_vectors=True,
+        )
+        for point in points:
+            metadata = (point.payload or {}).get(metadata_key) or {}
+            vector = np.asarray(point.vector, dtype=np.float32)
+            vector /= max(float(np.linalg.norm(vector)), 1e-12)
+            for section in clause_sections(metadata):
+                if section in sums:
+                    sums[section] += vector
+                    counts[section] += 1
+                else:
+                    sums[section], counts[section] = vector.copy(), 1
+                    types[section] = metadata.get("insurance_type")
+        if offset is None:
+            break
+
+    target = section_collection_name(collection_name)
+    dim = client.get_collection(collection_name).config.params.vectors.size  # type: ignore[union-attr]
+    if not client.collection_exists(target):
+        create_collection(client, target, dim, SECTION_PROFILE)
+
+    new_ids = set()
+    sections = list(sums)
+    for i in range(0, len(sections), batch_size):
+        batch = sections[i:i + batch_size]
+        client.upsert(
+            collection_name=target,
+            points=[
+                models.PointStruct(
+                    id=section_id(section),
+                    vector=(sums[section] / counts[section]).tolist(),
+                    payload={
+                        "source": section[0],
+                        "level_1": section[1],
+                        "insurance_type": types[section],
+                        "n_clauses": counts[section],
+                    },
+                )
+                for section in batch
+            ],
+            wait=True,
+        )
+        new_ids.update(section_id(section) for section in batch)
+
+    # 이번에 없는 섹션 (삭제된 파일 / 바뀐 관 제목) 정리
+    stale, offset = [], None
+    while True:
+        points, offset = client.scroll(
+            collection_name=target, limit=batch_size, offset=offset, with_payload=False, with_vectors=False
+        )
+        stale.extend(point.id for point in points if str(point.id) not in new_ids)
+        if offset is None:
+            break
+    if stale:
+        client.delete(collection_name=target, points_selector=models.PointIdsList(points=stale), wait=True)
+    return len(sections)
@@ -0,0 +1,122 @@
+# vectorstore/type_centroids.py
+"""
+보험유형 중심 벡터 (로컬 보험유형 분류용)
+
+보험유형마다 조항 벡터(정규화)의 평균을 .npz 파일 하나에 넣어 두고,
+질문 벡터(검색에 쓰는 그 벡터)와 비교해 보험유형을 고른다 → 분류에 LLM 왕복이 필요 없음.
+
+- 약관 조항은 유형이 달라도 공통 문구(보험금 지급 / 청구 / 해지 …)가 많아서 중심 벡터끼리 매우 가깝다
+  → 중심 벡터들의 평균을 빼고(공통 성분 제거) 코사인을 비교한다
+- 1위와 2위 점수 차(margin)가 작으면 확신이 없는 것 → 호출하는 쪽에서 LLM 분류로 넘긴다
+- 적재가 끝난 뒤 컬렉션 전체로 만들거나 (build_from_collection),
+  보험유형을 붙인 질문 몇 개(seed set)로 만든다 (build_from_examples, 질문과 조항의 문체 차이가 클 때)
+"""
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
+
+
+class TypeCentroids:
+    """보험유형 중심 벡터 파일 (읽기 전용, 여러 스레드에서 동시에 써도 됨)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with np.load(self.path) as data:
+            self.types: List[str] = [str(t) for t in data["types"]]
+            self.counts: Dict[str, int] = dict(zip(self.types, (int(c) for c in data["counts"])))
+            centroids = data["centroids"].astype(np.float32)
+        self._mean = centroids.mean(axis=0)
+        self._matrix = _normalize(centroids - self._mean)  # (보험유형 수, 차원)
+
+    def scores(self, vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        """질문 벡터 여러 개 → (질문 수, 보험유형 수) 점수 (공통 성분을 뺀 코사인)"""
+        queries = _normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self._matrix.shape[1]))
+        return _normalize(queries - self._mean) @ self._matrix.T
+
+    def classify_many(self, vectors: Sequence[Sequence[float]]) -> List[Tuple[str, float]]:
+        """질문 벡터 여러 개 → (1위 보험유형, 1위 - 2위 점수 차) 목록"""
+        scores = self.scores(vectors)
+        if len(self.types) == 1:
+            return [(self.types[0], 1.0)] * len(scores)
+        top2 = np.argsort(-scores, axis=1)[:, :2]
+        rows = np.arange(len(scores))
+        margins = scores[rows, top2[:, 0]] - scores[rows, top2[:, 1]]
+        return [(self.types[best], float(margin)) for best, margin in zip(top2[:, 0], margins)]
+
+    def classify(self, vector: Sequence[float]) -> Tuple[str, float]:
+        return self.classify_many([vector])[0]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12)
+
+
+def _save(path: Path, sums: Dict[str, np.ndarray], counts: Dict[str, int]) -> Dict[str, int]:
+    """보험유형별 벡터 합 → 중심 벡터 파일 (임시 파일에 쓰고 교체 → 읽는 중인 프로세스는 영향 없음)"""
+    if not sums:
+        raise ValueError("보험유형이 붙은 벡터가 없어 중심 벡터를 만들 수 없습니다")
+    types = sorted(sums)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            types=np.array(types),
+            centroids=np.stack([sums[t] / counts[t] for t in types]).astype(np.float32),
+            counts=np.array([counts[t] for t in types]),
+        )
+    os.replace(tmp, path)
+    return {t: counts[t] for t in types}
+
+
+def _add(sums: Dict[str, np.ndarray], counts: Dict[str, int], insurance_type: Optional[str], vector) -> None:
+    if not insurance_type:
+        return
+    vector = _normalize(np.asarray(vector, dtype=np.float32))
+    if insurance_type in sums:
+        sums[insurance_type] += vector
+        counts[insurance_type] += 1
+    else:
+        sums[insurance_type], counts[insurance_type] = vector, 1
+
+
+def build_from_collection(
+    client: QdrantClient,
+    collection_name: str,
+    path: Path,
+    metadata_key: str = "metadata",
+    batch_size: int = 1024,
+) -> Dict[str, int]:
+    """컬렉션의 모든 조항 벡터 → 보험유형 중심 벡터 파일 → 보험유형별 조항 수"""
+    sums: Dict[str, np.ndarray] = {}
+    counts: Dict[str, int] = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=[metadata_key],
+            with_vectors=True,
+        )
+        for point in points:
+            metadata = (point.payload or {}).get(metadata_key) or {}
+            _add(sums, counts, metadata.get("insurance_type"), point.vector)
+        if offset is None:
+            break
+    return _save(path, sums, counts)
+
+
+def build_from_examples(embeddings: Embeddings, examples: Dict[str, List[str]], path: Path) -> Dict[str, int]:
+    """보험유형 → 예시 질문 목록 (seed set) → 보험유형 중심 벡터 파일 → 보험유형별 질문 수"""
+    sums: Dict[str, np.ndarray] = {}
+    counts: Dict[str, int] = {}
+    for insurance_type, questions in examples.items():
+        for vector in embeddings.embed_documents(list(questions)):
+            _add(sums, counts, insurance_type, vector)
+    return _save(path, sums, counts)
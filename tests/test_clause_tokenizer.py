@@ -0,0 +1,60 @@
+"""
+단일 패스 조항 토크나이저 (build_documents_from_text) 가 기존 split_with_pattern 중첩 분할과
+같은 Document 를 만드는지 두 구조 (관/조, 편/장/절/조) 모두 검사
+
+실행 (프로젝트 루트):
+    python -m pytest tests/test_clause_tokenizer.py
+"""
+import pytest
+
+from benchmarks.bench_clause_tokenizer import (
+    LAYOUT_INSURANCE_TYPE,
+    _as_tuples,
+    _edge_case_texts,
+    legacy_build_documents,
+)
+from benchmarks.synthetic import generate_terms_text
+from source.ingest.preprocessing import build_documents_from_text
+
+LAYOUTS = sorted(LAYOUT_INSURANCE_TYPE)
+
+
+def assert_same_documents(layout: str, text: str):
+    insurance_type = LAYOUT_INSURANCE_TYPE[layout]
+    expected = _as_tuples(legacy_build_documents(text, insurance_type, "test.xml"))
+    actual = _as_tuples(build_documents_from_text(text, insurance_type, "test.xml"))
+    assert actual == expected, f"입력 앞부분: {text[:200]!r}"
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+@pytest.mark.parametrize("n_clauses", [0, 1, 7, 300])
+def test_synthetic_terms(layout: str, n_clauses: int):
+    """합성 약관 (목차 / 머리말 + 여러 단계 헤더)"""
+    assert_same_documents(layout, generate_terms_text(layout, n_clauses, seed=n_clauses))
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+@pytest.mark.parametrize("seed", range(5))
+def test_edge_cases(layout: str, seed: int):
+    """헤더가 줄을 넘거나 괄호 안에 상위 헤더가 있는 등 까다로운 입력"""
+    for text in _edge_case_texts(60, seed):
+        assert_same_documents(layout, text)
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "헤더 없는 본문만 있는 약관",
+        "제1관 총칙",
+        "제1편 자동차\n제1장 배상책임",
+        "제1조(목적)\n본문",
+        "제1관 총칙\n제1조(목적)\n이 약관은\n제2조(정의)\n① 항목\n제2관 보상\n제3조(보상하는 손해)\n본문",
+        "제1편 배상책임\n제1장 대인\n제1절 보상\n제1조(보상하는 손해)\n본문\n제2조 (보상하지 않는 손해)\n본문",
+    ],
+    ids=["empty", "no_header", "gwan_only", "pyeon_jang_only", "jo_only", "gwan_jo", "pyeon_jang_jeol_jo"],
+)
+def test_small_inputs(layout: str, text: str):
+    """빈 입력 / 헤더 없음 (파일 전체 1개 fallback) / 본문 없는 헤더"""
+    assert_same_documents(layout, text)